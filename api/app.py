@@ -1,10 +1,115 @@
 # 在api/app.py中
-from fastapi import FastAPI
+import os
+from typing import List
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from src.core import classification
+from src.core.online_scoring import OnlineScorer, UnknownJurisdiction, DEFAULT_JURISDICTION
+from src.core.serialization import negotiate, encode_frame, UnsupportedFormat, JSON
+from api.executor import ExecutorLayer, BatchCoalescer, Overloaded
 
 app = FastAPI()
 
+# 在线评分：启动时加载冻结快照，源文件变化时自动热加载
+scorer = OnlineScorer()
+
+@app.on_event("startup")
+def load_scoring_snapshot():
+    try:
+        scorer.reload()
+    except FileNotFoundError as e:
+        print(f"在线评分快照未加载: {e}")
+
+@app.on_event("startup")
+def start_executors():
+    # 重计算走进程池，轻量查询走线程池；并发的小分类请求合并为一次批处理
+    app.state.executors = ExecutorLayer.from_env()
+    app.state.classify_batcher = BatchCoalescer(
+        classification.process_batch,
+        app.state.executors.run_heavy,
+        max_batch=int(os.getenv("API_BATCH_SIZE", 256)),
+        max_delay=float(os.getenv("API_BATCH_DELAY_MS", 2)) / 1000,
+    )
+
+@app.on_event("shutdown")
+def stop_executors():
+    app.state.executors.shutdown()
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc):
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(UnknownJurisdiction)
+async def unknown_jurisdiction_handler(request, exc):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 @app.post("/classify")
 async def classify_data(data: dict):
-    result = classification.process_request(data)
+    try:
+        result = await app.state.classify_batcher.submit(data)
+    except TypeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     return {"result": result}
+
+@app.get("/score/{attribute_code}")
+async def score_attribute(attribute_code: str, jurisdiction: str = DEFAULT_JURISDICTION):
+    snapshot = await _current_snapshot()
+    try:
+        return snapshot.score(attribute_code, jurisdiction)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"未知属性: {attribute_code}")
+
+def _score_items(snapshot, items):
+    results = []
+    for item in items:
+        code = item.get("attribute_code")
+        try:
+            results.append(snapshot.score(code, item.get("jurisdiction", DEFAULT_JURISDICTION)))
+        except KeyError:
+            results.append({"attribute_code": code, "error": "未知属性"})
+    return results
+
+def _score_items_frame(snapshot, items):
+    groups = {}
+    for item in items:
+        groups.setdefault(item.get("jurisdiction", DEFAULT_JURISDICTION), []).append(item.get("attribute_code"))
+    frames = [snapshot.score_frame(codes, j).assign(jurisdiction=j) for j, codes in groups.items()]
+    return pd.concat(frames, ignore_index=True) if frames else snapshot.score_frame([])
+
+async def _current_snapshot():
+    # 源文件变化时在后台线程重建快照，重建完成前继续使用旧快照，事件循环不做 CSV 读取
+    try:
+        snapshot = scorer.refresh(wait=False)
+        if snapshot is None:  # 启动时未能加载：在线程池中加载
+            snapshot = await app.state.executors.run_light(scorer.refresh)
+        return snapshot
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="评分快照不可用")
+
+def _negotiate(request):
+    try:
+        return negotiate(request.headers.get("accept"))
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+@app.post("/score")
+async def score_batch(items: List[dict], request: Request):
+    snapshot = await _current_snapshot()
+    media_type = _negotiate(request)
+    if media_type == JSON:
+        results = await app.state.executors.run_light(_score_items, snapshot, items)
+        return {"results": results}
+    # 二进制格式：列式输出，数值列直接来自评分数组
+    df = await app.state.executors.run_light(_score_items_frame, snapshot, items)
+    body = await app.state.executors.run_light(encode_frame, df, media_type)
+    return Response(content=body, media_type=media_type)
+
+@app.get("/scores")
+async def export_scores(request: Request, jurisdiction: str = DEFAULT_JURISDICTION):
+    """导出全部属性在某司法管辖区下的评分（支持 JSON / CSV / Arrow / MessagePack）"""
+    snapshot = await _current_snapshot()
+    media_type = _negotiate(request)
+    df = snapshot.score_frame(None, jurisdiction)
+    body = await app.state.executors.run_light(encode_frame, df, media_type)
+    return Response(content=body, media_type=media_type)
@@ -0,0 +1,108 @@
+# api/executor.py
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class Overloaded(Exception):
+    """执行队列已满，调用方应返回 429"""
+
+
+class ExecutorLayer:
+    """将 CPU 密集任务移出事件循环：进程池处理重计算，线程池处理轻量查询"""
+
+    def __init__(self, process_workers=None, thread_workers=8, max_pending_heavy=None, max_pending_light=64):
+        process_workers = os.cpu_count() if process_workers is None else process_workers
+        self.thread_pool = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="api-light")
+        # process_workers=0 时重计算也走线程池（便于调试）
+        self.process_pool = ProcessPoolExecutor(max_workers=process_workers) if process_workers > 0 else None
+        self.max_pending_heavy = max_pending_heavy or 4 * max(process_workers, 1)
+        self.max_pending_light = max_pending_light
+        self._pending = {"heavy": 0, "light": 0}
+
+    @classmethod
+    def from_env(cls):
+        """从环境变量读取池大小与队列上限"""
+        def env_int(name):
+            value = os.getenv(name)
+            return int(value) if value else None
+        kwargs = {
+            "process_workers": env_int("API_PROCESS_WORKERS"),
+            "thread_workers": env_int("API_THREAD_WORKERS"),
+            "max_pending_heavy": env_int("API_MAX_PENDING_HEAVY"),
+            "max_pending_light": env_int("API_MAX_PENDING_LIGHT"),
+        }
+        return cls(**{k: v for k, v in kwargs.items() if v is not None})
+
+    async def _run(self, kind, pool, limit, fn, *args):
+        # 有界队列：超出上限直接拒绝，而不是无限排队拉长尾延迟
+        if self._pending[kind] >= limit:
+            raise Overloaded(f"{kind} 队列已满 ({limit})")
+        self._pending[kind] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, fn, *args)
+        finally:
+            self._pending[kind] -= 1
+
+    async def run_heavy(self, fn, *args):
+        pool = self.process_pool or self.thread_pool
+        return await self._run("heavy", pool, self.max_pending_heavy, fn, *args)
+
+    async def run_light(self, fn, *args):
+        return await self._run("light", self.thread_pool, self.max_pending_light, fn, *args)
+
+    def shutdown(self):
+        self.thread_pool.shutdown(wait=False)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False)
+
+
+class BatchCoalescer:
+    """将并发的小请求合并为一次向量化调用"""
+
+    def __init__(self, batch_fn, runner, max_batch=256, max_delay=0.002):
+        self.batch_fn = batch_fn      # 接收列表、返回等长结果列表的函数
+        self.runner = runner          # 例如 ExecutorLayer.run_heavy
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self._tasks = set()  # 持有批处理任务的引用，避免执行中被垃圾回收
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            results = await self.runner(self.batch_fn, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # batch_fn 可在单条结果位置返回异常实例，只让对应的请求失败
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,336 @@
+# benchmarks/run_benchmarks.py
+"""全流程性能基准：记录各热点函数在不同数据规模下的耗时、峰值内存和吞吐量
+
+运行方式：
+    python benchmarks/run_benchmarks.py --sizes 1e3 1e4 1e5
+    python benchmarks/run_benchmarks.py --sizes 1e3 1e4 --compare benchmarks/results/bench_20250301_1200.json
+
+每个 (用例, 规模) 在独立子进程中执行：准备数据后先做一次不计时的预热调用（加载延迟导入的依赖），
+再计时；内存记录计时区间内相对计时开始时的峰值 RSS 增量，不含进程启动和数据准备。
+"""
+import argparse
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+# 管理后台脚本使用同目录裸导入，风险量化模块使用包内相对导入，两种路径都需要
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "src" / "core")]
+
+CASES = {}
+NO_WARMUP = set()
+
+
+def case(name, warmup=True):
+    """注册基准用例：函数接收 (数据目录, 行数)，完成准备工作后返回待计时的无参函数
+
+    warmup=False 用于调用有副作用、重复调用不再等价的用例（准备阶段需自行完成预热）。
+    """
+    def decorator(fn):
+        CASES[name] = fn
+        if not warmup:
+            NO_WARMUP.add(name)
+        return fn
+    return decorator
+
+
+def _risk_frame(data_dir, rows):
+    """在分级数据上附加随机 P_risk / R / H，模拟 risk_analysis.csv"""
+    import numpy as np
+    import pandas as pd
+    df = pd.read_csv(data_dir / "grading/inital_grading.csv")
+    rng = np.random.default_rng(0)
+    df["P_risk"] = rng.random(len(df))
+    df["R"] = rng.random(len(df))
+    df["H"] = rng.random(len(df))
+    return df
+
+
+@case("quantify")
+def bench_quantify(data_dir, rows):
+    from src.core.risk_quantifier import PrivacyRiskQuantifier
+    input_path = data_dir / "grading/risk_analysis.csv"
+    _risk_frame(data_dir, rows).to_csv(input_path, index=False)
+    quantifier = PrivacyRiskQuantifier(data_dir / "grading/config/risk_parameters.yaml", data_dir)
+    return lambda: quantifier.quantify(input_path, data_dir / "grading/risk_quantification.csv")
+
+
+def _patch_risk_analysis_paths(module, data_dir):
+    module.BASE_DIR = data_dir
+    module.GRADING_DIR = data_dir / "grading"
+    module.CONFIG_DIR = data_dir / "grading/config"
+    module.RISK_PARAMS_PATH = module.CONFIG_DIR / "risk_parameters.yaml"
+
+
+@case("risk_analysis")
+def bench_risk_analysis(data_dir, rows):
+    import sync_risk_analysis_admin_app as module
+    _patch_risk_analysis_paths(module, data_dir)
+    return module.risk_analysis
+
+
+@case("build_bayesian_network")
+def bench_build_bayesian_network(data_dir, rows):
+    import pandas as pd
+    import sync_risk_analysis_admin_app as module
+    data = pd.read_csv(data_dir / "grading/inital_grading.csv")[['attribute_code', 'category_id', 'sensitivity_level']]
+    return lambda: module.build_bayesian_network(data)
+
+
+@case("calculate_conditional_entropy")
+def bench_conditional_entropy(data_dir, rows):
+    import sync_risk_analysis_admin_app as module
+    df = _risk_frame(data_dir, rows)
+    return lambda: module.calculate_conditional_entropy(df, 'sensitivity_level')
+
+
+@case("map_protection")
+def bench_map_protection(data_dir, rows):
+    import numpy as np
+    from protection_mapper import ProtectionEngine
+    df = _risk_frame(data_dir, rows)
+    df["L"] = np.random.default_rng(1).random(len(df)) * 1.5
+    params = ProtectionEngine.calculate_thresholds(df)
+    return lambda: ProtectionEngine.map_protection(df.copy(), params)
+
+
+@case("sync_classification")
+def bench_sync_classification(data_dir, rows):
+    import sync_classification as module
+    module.BASE_DIR = data_dir
+    module.ORIGINAL_DATA_DIR = data_dir / "original_data"
+    module.CLASSIFICATION_DIR = data_dir / "classification"
+    module.HISTORY_DIR = module.CLASSIFICATION_DIR / "history"
+    module.REPORT_DIR = module.CLASSIFICATION_DIR / "reports"
+    _ensure_detail(data_dir)
+    return module.sync_classification
+
+
+@case("generate_grading")
+def bench_generate_grading(data_dir, rows):
+    import grading_generator as module
+    module.BASE_DIR = data_dir
+    module.GRADING_DIR = data_dir / "grading"
+    module.CONFIG_DIR = module.GRADING_DIR / "config"
+    rules = PROJECT_ROOT / "data/grading/config/grading_rules.yaml"
+    shutil.copy2(rules, module.CONFIG_DIR / "grading_rules.yaml")
+    _ensure_detail(data_dir)
+    return module.generate_grading
+
+
+@case("generate_grading_incremental", warmup=False)
+def bench_generate_grading_incremental(data_dir, rows):
+    """全量分级一次（兼作预热）后修改 1% 属性的名称，计时增量分级"""
+    import numpy as np
+    import pandas as pd
+    generate_grading = bench_generate_grading(data_dir, rows)
+    generate_grading()
+    cross_path = data_dir / "original_data/cross_attributes.csv"
+    cross = pd.read_csv(cross_path)
+    touched = np.random.default_rng(2).choice(len(cross), max(len(cross) // 100, 1), replace=False)
+    cross.loc[touched, "attribute_chinese"] = cross.loc[touched, "attribute_chinese"] + "_v2"
+    cross.to_csv(cross_path, index=False)
+    return lambda: generate_grading(incremental=True)
+
+
+def _ensure_detail(data_dir):
+    """分类明细表：由模拟分级数据中的 category_id 派生"""
+    import pandas as pd
+    detail_path = data_dir / "classification/attribute_category_detail.csv"
+    if not detail_path.exists():
+        grading = pd.read_csv(data_dir / "grading/inital_grading.csv")
+        grading[["attribute_code", "category_id"]].to_csv(detail_path, index=False)
+
+
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """重置进程的峰值 RSS（Linux 4.0+ 向 clear_refs 写 5），不支持时返回 False"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _max_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+class RssMeter:
+    """计时区间内的峰值 RSS 增量（MB）
+
+    Linux 上在区间开始时重置峰值，结束时读取 VmHWM 减去开始时的 RSS；
+    其他平台只能得到进程峰值的增长量（区间内峰值未超过此前峰值时为 0，是下界）。
+    """
+
+    def __enter__(self):
+        self.reset = _reset_peak_rss()
+        self.start_rss = _status_kb("VmRSS") if self.reset else None
+        self.start_peak = _max_rss_mb()
+        return self
+
+    def __exit__(self, *exc):
+        peak = _status_kb("VmHWM") if self.reset else None
+        if peak is not None and self.start_rss is not None:
+            self.delta_mb = max(peak - self.start_rss, 0) / 1024
+        else:
+            self.delta_mb = max(_max_rss_mb() - self.start_peak, 0.0)
+        return False
+
+
+def _missing_dependency(exc):
+    """异常链中的 ImportError（被业务代码包装成其他异常时也能识别）"""
+    while exc is not None:
+        if isinstance(exc, ImportError):
+            return exc
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def run_worker(name, rows, data_dir, repeat):
+    """子进程入口：准备数据、预热、计时并以 JSON 输出结果"""
+    data_dir = Path(data_dir)
+    timings = []
+    try:
+        fn = CASES[name](data_dir, rows)
+        if name not in NO_WARMUP:
+            fn()  # 预热：延迟导入的 scipy / pgmpy 等在这里加载，不计入耗时
+        with RssMeter() as rss:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+    except Exception as e:
+        # 可选依赖（如 pgmpy）缺失：准备阶段或函数内部延迟导入失败都视为跳过
+        missing = _missing_dependency(e)
+        if missing is None:
+            raise
+        return {"status": "skipped", "reason": f"缺少依赖: {missing}"}
+    wall = min(timings)
+    return {
+        "status": "ok",
+        "wall_s": wall,
+        "rss_delta_mb": rss.delta_mb,
+        "throughput_rows_s": rows / wall if wall > 0 else None,
+    }
+
+
+def run_case(name, rows, data_dir, repeat, timeout):
+    # 每次运行复制一份数据，避免用例之间相互修改输入
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+        work_dir = Path(tmp) / "data"
+        shutil.copytree(data_dir, work_dir)
+        cmd = [sys.executable, __file__, "--worker", name, str(rows), str(work_dir), "--repeat", str(repeat)]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"status": "timeout", "reason": f"超过 {timeout}s"}
+    if proc.returncode != 0:
+        return {"status": "error", "reason": proc.stderr.strip().splitlines()[-1:] or ["未知错误"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, baseline, threshold):
+    """对比两次结果，返回耗时退化超过阈值的用例"""
+    base = {(r["case"], r["rows"]): r for r in baseline["results"] if r["status"] == "ok"}
+    regressions = []
+    print(f"\n{'用例':<32}{'行数':>12}{'基线(s)':>12}{'本次(s)':>12}{'比值':>8}")
+    for r in current["results"]:
+        old = base.get((r["case"], r["rows"]))
+        if r["status"] != "ok" or old is None:
+            continue
+        ratio = r["wall_s"] / old["wall_s"] if old["wall_s"] else float("inf")
+        flag = " <-- 退化" if ratio > 1 + threshold else ""
+        print(f"{r['case']:<32}{r['rows']:>12}{old['wall_s']:>12.4f}{r['wall_s']:>12.4f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跨境属性分类分级流程性能基准")
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5], help="数据规模（1e3 ~ 1e7）")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=sorted(CASES))
+    parser.add_argument("--repeat", type=int, default=1, help="每个用例重复次数，取最小耗时")
+    parser.add_argument("--timeout", type=float, default=1800, help="单个用例超时（秒）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="结果文件路径，默认 benchmarks/results/bench_<时间>.json")
+    parser.add_argument("--compare", help="与之前的结果文件对比")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定退化的耗时增幅")
+    parser.add_argument("--worker", nargs=3, metavar=("CASE", "ROWS", "DATA_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        name, rows, data_dir = args.worker
+        print(json.dumps(run_worker(name, int(rows), data_dir, args.repeat)))
+        return 0
+
+    from src.core.generate_synthetic_data import generate
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_data_") as tmp:
+        for size in args.sizes:
+            rows = int(size)
+            data_dir = Path(tmp) / str(rows)
+            generate(rows, data_dir, seed=args.seed)
+            (data_dir / "classification/config").mkdir(parents=True, exist_ok=True)
+            for name in args.cases:
+                result = {"case": name, "rows": rows, **run_case(name, rows, data_dir, args.repeat, args.timeout)}
+                results.append(result)
+                if result["status"] == "ok":
+                    print(f"{name:<32}{rows:>12} {result['wall_s']:>10.4f}s "
+                          f"{result['rss_delta_mb']:>+9.1f}MB {result['throughput_rows_s']:>14.0f} rows/s")
+                else:
+                    print(f"{name:<32}{rows:>12} {result['status']}: {result.get('reason')}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n结果已保存：{output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
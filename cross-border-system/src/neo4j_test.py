@@ -1,21 +1,14 @@
-from neo4j import GraphDatabase
 import os
-from dotenv import load_dotenv
+from ucap.driver_manager import get_driver, close_all
 
-# 加载环境变量
-load_dotenv()
-
-# 获取配置
-uri = os.getenv("NEO4J_URI")
-user = os.getenv("NEO4J_USER")
-password = os.getenv("NEO4J_PASSWORD")
+# 获取配置（driver_manager 导入时已加载 .env）
 print(os.getenv("NEO4J_URI"))
 print(os.getenv("NEO4J_USER"))
 print(os.getenv("NEO4J_PASSWORD"))
 
 try:
-    # 创建驱动
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    # 使用共享驱动（连接池）
+    driver = get_driver()
     
     # 测试连接
     with driver.session() as session:
@@ -25,4 +18,4 @@ except Exception as e:
     print(f"❌ 连接失败: {e}")
 finally:
     # 关闭驱动
-    driver.close()
+    close_all()
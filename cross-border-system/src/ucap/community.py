@@ -0,0 +1,175 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+MAX_ITER = 20  # 每层局部移动的最大轮数
+MAX_LEVELS = 10
+MIN_CHANGE = 1e-3  # 一轮中改变社区的节点比例低于该值即进入聚合
+GROUPS = 4  # 每轮的随机分组数（组内同步移动，组间依次进行，避免相邻节点互换社区）
+CHUNK_SIZE = 65536  # 每个任务处理的节点数
+
+
+def symmetric_adjacency(indptr, indices, strength, n):
+    """把有向 LINKED 关联转为无向加权邻接（A = W + Wᵀ，去掉自环，重复边权重相加）"""
+    matrix = sp.csr_matrix((np.asarray(strength, dtype=float), indices, indptr), shape=(n, n))
+    adjacency = (matrix + matrix.T).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.sort_indices()
+    return adjacency
+
+
+def _one_hot(labels, n_labels):
+    n = len(labels)
+    return sp.csr_matrix((np.ones(n), labels, np.arange(n + 1)), shape=(n, n_labels))
+
+
+def _best_moves(adjacency, one_hot, labels, degree, totals, two_m, rows):
+    """rows 中每个节点模块度增益最大的社区（增益不超过留在原社区时保持不动）
+
+    A[rows] @ onehot(labels) 在 scipy 的 C 实现中按 (节点, 社区) 累加邻居权重 k_i,c，
+    移入社区 c 的增益正比于 k_i,c − k_i·tot_c / 2m（tot_c 不含节点自身）。
+    """
+    votes = (adjacency[rows] @ one_hot).tocsr()
+    votes.sort_indices()
+    current = labels[rows]
+    result = current.copy()
+    counts = np.diff(votes.indptr)
+    if not counts.any():
+        return result
+    owner = np.repeat(np.arange(len(rows)), counts)
+    k = degree[rows]
+    own = votes.indices == current[owner]
+    tot = totals[votes.indices] - np.where(own, k[owner], 0.0)
+    gain = votes.data - k[owner] * tot / two_m
+    stay = -(totals[current] - k) * k / two_m
+    np.add.at(stay, owner[own], votes.data[own])
+
+    nonempty = counts > 0
+    row_max = np.full(len(rows), -np.inf)
+    row_max[nonempty] = np.maximum.reduceat(gain, votes.indptr[:-1][nonempty])
+    hits = np.flatnonzero(gain == row_max[owner])
+    first = hits[np.concatenate([[True], owner[hits][1:] != owner[hits][:-1]])]
+    move = row_max[owner[first]] > stay[owner[first]] + 1e-12
+    result[owner[first][move]] = votes.indices[first][move]
+    return result
+
+
+def modularity(adjacency, labels):
+    """加权无向图的模块度 Q = Σ_c [in_c / 2m − (tot_c / 2m)²]"""
+    total = adjacency.data.sum()
+    if total == 0:
+        return 0.0
+    coo = adjacency.tocoo()
+    inside = coo.data[labels[coo.row] == labels[coo.col]].sum()
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    tot = np.bincount(labels, weights=degree)
+    return float(inside / total - np.sum((tot / total) ** 2))
+
+
+def _local_moves(adjacency, rng, pool, max_iter, min_change, groups, chunk_size):
+    """一层局部移动：每轮把节点随机分为 groups 组，组内并行决定移动，组间更新社区总度数"""
+    n = adjacency.shape[0]
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    two_m = degree.sum()
+    off_diagonal = adjacency - sp.diags(adjacency.diagonal())  # 聚合后的自环不参与投票
+    off_diagonal.eliminate_zeros()
+    labels = np.arange(n, dtype=np.int64)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        changed = 0
+        part = rng.integers(groups, size=n)
+        for g in range(groups):
+            group = np.flatnonzero(part == g)
+            totals = np.bincount(labels, weights=degree, minlength=n)
+            one_hot = _one_hot(labels, n)
+            chunks = [group[i:i + chunk_size] for i in range(0, len(group), chunk_size)]
+            updates = pool.map(
+                lambda rows: _best_moves(off_diagonal, one_hot, labels, degree, totals, two_m, rows), chunks,
+            )
+            for rows, new in zip(chunks, list(updates)):
+                changed += int(np.count_nonzero(labels[rows] != new))
+                labels[rows] = new
+        if changed <= min_change * n:
+            break
+    return pd.factorize(labels)[0], iterations
+
+
+def louvain(adjacency, max_iter=MAX_ITER, min_change=MIN_CHANGE, seed=None, workers=None,
+            groups=GROUPS, chunk_size=CHUNK_SIZE, max_levels=MAX_LEVELS):
+    """并行 Louvain：局部移动 + 社区聚合（A' = PᵀAP）逐层进行，直到社区不再合并
+
+    局部移动按 chunk_size 切块交给线程池，块内为 scipy 稀疏矩阵乘法与 numpy 分段归约。
+    返回 (从 0 连续编号的社区标签, 每层信息列表)。
+    """
+    rng = np.random.default_rng(seed)
+    membership = np.arange(adjacency.shape[0], dtype=np.int64)
+    levels = []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for _ in range(max_levels):
+            n = adjacency.shape[0]
+            labels, iterations = _local_moves(adjacency, rng, pool, max_iter, min_change, groups, chunk_size)
+            n_communities = labels.max() + 1 if n else 0
+            levels.append({"nodes": int(n), "communities": int(n_communities), "iterations": iterations})
+            membership = labels[membership]
+            if n_communities == n:
+                break
+            projection = _one_hot(labels, n_communities)
+            adjacency = (projection.T @ adjacency @ projection).tocsr()
+    return membership, levels
+
+
+class CommunityDetector:
+    """在 LINKED 关联图上做社区发现，结果可作为聚类特征或建议类别"""
+
+    def __init__(self, max_iter=MAX_ITER, min_change=MIN_CHANGE, seed=None, workers=None):
+        self.max_iter = max_iter
+        self.min_change = min_change
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+
+    def detect(self, graph):
+        """对 InMemoryGraph 做社区发现，返回每个属性的社区（DataFrame）与模块度报告"""
+        start = time.perf_counter()
+        adjacency = symmetric_adjacency(graph.indptr, graph.indices, graph.strength, graph.n_nodes)
+        labels, levels = louvain(adjacency, self.max_iter, self.min_change, self.seed, self.workers)
+        sizes = np.bincount(labels, minlength=labels.max() + 1 if len(labels) else 0)
+        communities = pd.DataFrame({
+            "code": graph.codes,
+            "category": graph.category,
+            "risk": graph.risk,
+            "community": labels,
+            "community_size": sizes[labels],
+        })
+        communities["community_risk"] = communities.groupby("community")["risk"].transform("mean")
+        report = {
+            "nodes": int(graph.n_nodes),
+            "edges": int(adjacency.nnz // 2),
+            "communities": int(len(sizes)),
+            "singletons": int(np.count_nonzero(sizes == 1)),
+            "largest": np.sort(sizes)[::-1][:10].tolist(),
+            "modularity": modularity(adjacency, labels),
+            "levels": levels,
+            "workers": self.workers,
+            "seconds": time.perf_counter() - start,
+        }
+        return communities, report
+
+    @staticmethod
+    def suggest_categories(communities, min_share=0.5):
+        """按社区内已有类别的多数给出建议类别（占比低于 min_share 或无类别的社区不给建议）
+
+        返回属性代码、当前类别、建议类别，仅包含建议与当前类别不同的属性。
+        """
+        known = communities[communities["category"].notna()]
+        counts = known.groupby(["community", "category"]).size().rename("count").reset_index()
+        counts["share"] = counts["count"] / counts.groupby("community")["count"].transform("sum")
+        majority = counts.sort_values("share", ascending=False).drop_duplicates("community")
+        majority = majority[majority["share"] >= min_share].set_index("community")["category"]
+        suggested = communities.assign(suggested_category=communities["community"].map(majority))
+        differs = suggested["suggested_category"].notna() & (suggested["suggested_category"] != suggested["category"])
+        return suggested.loc[differs, ["code", "category", "suggested_category"]].reset_index(drop=True)
@@ -0,0 +1,141 @@
+import asyncio
+import atexit
+import os
+import threading
+
+try:
+    from neo4j import AsyncGraphDatabase, GraphDatabase
+except ImportError:  # 只使用内存图后端时不需要 neo4j
+    AsyncGraphDatabase = GraphDatabase = None
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+if load_dotenv:
+    load_dotenv()
+
+# 连接池配置（环境变量可覆盖）
+MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+
+_drivers = {}
+_async_drivers = {}
+_lock = threading.Lock()
+_loop = None  # read_concurrently 使用的常驻事件循环（后台线程），其异步驱动与连接池跨调用复用
+_loop_thread = None
+
+
+def _settings(uri=None, user=None, password=None):
+    return (uri or os.getenv("NEO4J_URI"),
+            (user or os.getenv("NEO4J_USER"), password or os.getenv("NEO4J_PASSWORD")))
+
+
+def _require(factory):
+    if factory is None:
+        raise ImportError("Neo4j 后端需要安装 neo4j")
+
+
+def get_driver(uri=None, user=None, password=None, max_pool_size=MAX_POOL_SIZE):
+    """进程内共享的同步驱动（同一连接参数只创建一个，内部维护连接池）"""
+    _require(GraphDatabase)
+    uri, auth = _settings(uri, user, password)
+    key = (uri, auth[0])
+    with _lock:
+        if key not in _drivers:
+            _drivers[key] = GraphDatabase.driver(
+                uri, auth=auth, max_connection_pool_size=max_pool_size,
+                connection_acquisition_timeout=ACQUISITION_TIMEOUT,
+            )
+        return _drivers[key]
+
+
+def get_async_driver(uri=None, user=None, password=None, max_pool_size=MAX_POOL_SIZE):
+    """共享的异步驱动，供长期运行的事件循环（如 FastAPI）使用；异步驱动不能跨事件循环共享"""
+    _require(AsyncGraphDatabase)
+    uri, auth = _settings(uri, user, password)
+    loop = asyncio.get_running_loop()
+    key = (uri, auth[0], id(loop))
+    with _lock:
+        if key not in _async_drivers:
+            _async_drivers[key] = AsyncGraphDatabase.driver(
+                uri, auth=auth, max_connection_pool_size=max_pool_size,
+                connection_acquisition_timeout=ACQUISITION_TIMEOUT,
+            )
+        return _async_drivers[key]
+
+
+async def _read(driver, query, params, database):
+    async with driver.session(database=database) as session:
+        result = await session.run(query, **params)
+        return await result.data()
+
+
+async def run_read_queries(queries, driver=None, database=None):
+    """并发执行相互独立的只读查询，queries 为 [(语句, 参数字典), ...]，按顺序返回各自的记录列表
+
+    每个查询使用独立会话，从连接池取各自的连接，总耗时约为最慢的一个而不是逐个相加。
+    """
+    driver = driver or get_async_driver()
+    return await asyncio.gather(*(_read(driver, query, params or {}, database) for query, params in queries))
+
+
+def _background_loop():
+    """惰性启动常驻事件循环线程（进程内只有一个）"""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="neo4j-async", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def read_concurrently(queries, database=None, uri=None, user=None, password=None):
+    """同步代码（Flask 视图、脚本）中并发执行只读查询；在事件循环内请直接 await run_read_queries
+
+    查询提交到常驻事件循环，使用该循环上缓存的异步驱动（get_async_driver），连接池跨调用复用。
+    """
+    _require(AsyncGraphDatabase)
+    loop = _background_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("不能在常驻事件循环内同步等待查询，请直接 await run_read_queries")
+
+    async def main():
+        driver = get_async_driver(uri, user, password)
+        return await run_read_queries(queries, driver=driver, database=database)
+
+    return asyncio.run_coroutine_threadsafe(main(), loop).result()
+
+
+async def close_async():
+    """关闭当前事件循环的异步驱动（在应用关闭钩子中 await）"""
+    loop_id = id(asyncio.get_running_loop())
+    with _lock:
+        keys = [k for k in _async_drivers if k[2] == loop_id]
+        drivers = [_async_drivers.pop(k) for k in keys]
+    for driver in drivers:
+        await driver.close()
+
+
+def close_all():
+    """关闭所有共享的同步驱动，以及常驻事件循环上的异步驱动并停止该循环（进程退出时自动调用）"""
+    global _loop, _loop_thread
+    with _lock:
+        drivers = list(_drivers.values())
+        _drivers.clear()
+        loop, thread = _loop, _loop_thread
+        _loop = _loop_thread = None
+    for driver in drivers:
+        driver.close()
+    if loop is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(close_async(), loop).result(timeout=ACQUISITION_TIMEOUT)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+atexit.register(close_all)
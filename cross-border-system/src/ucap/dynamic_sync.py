@@ -1,21 +1,54 @@
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+import sys
 import time
-from .graph_builder import KnowledgeGraph
+from pathlib import Path
+
+if __package__ in (None, ""):  # 直接以脚本运行（python dynamic_sync.py）时补全包上下文，使包内相对导入可用
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "ucap"
+
+from .graph_builder import create_knowledge_graph
+from .graph_sync import Debouncer, GraphSynchronizer
+
+DEBOUNCE_SECONDS = 1.0  # 最后一次文件事件后静默多久才同步
 
 class DataWatcher(FileSystemEventHandler):
-    def __init__(self):
-        self.kg = KnowledgeGraph()
-    
+    def __init__(self, kg=None, csv_path="src/data/risk_data.csv", debounce=DEBOUNCE_SECONDS):
+        # 默认按环境变量选择图后端（Neo4j 或内存图）
+        self.kg = kg or create_knowledge_graph()
+        self.csv_path = Path(csv_path)
+        self.synchronizer = GraphSynchronizer(self.kg, self.csv_path)
+        # 编辑器一次保存会产生多个事件，合并为一次增量同步
+        self.debouncer = Debouncer(debounce, self.sync)
+
+    def sync(self):
+        print("\n🔄 检测到数据变化，触发图谱增量更新...")
+        summary = self.synchronizer.sync()
+        print(f"✅ 知识图谱已更新：{summary}")
+
+    def _is_target(self, path):
+        return Path(path).name == self.csv_path.name
+
     def on_modified(self, event):
-        if event.src_path.endswith("risk_data.csv"):
-            print("\n🔄 检测到数据变化，触发图谱更新...")
-            self.kg.build_graph("src/data/risk_data.csv")
-            print("✅ 知识图谱已更新")
+        if self._is_target(event.src_path):
+            self.debouncer.trigger()
+
+    def on_created(self, event):
+        if self._is_target(event.src_path):
+            self.debouncer.trigger()
+
+    def on_moved(self, event):
+        # 部分编辑器先写临时文件再重命名覆盖
+        if self._is_target(event.dest_path):
+            self.debouncer.trigger()
 
 def start_monitoring():
+    watcher = DataWatcher()
+    if watcher.csv_path.exists():
+        watcher.sync()  # 启动时完整构建一次，作为后续增量比对的基准
     observer = Observer()
-    observer.schedule(DataWatcher(), path="src/data")
+    observer.schedule(watcher, path=str(watcher.csv_path.parent))
     observer.start()
     print("👀 启动监控：正在监听 data/ 目录变化...")
     try:
@@ -23,6 +56,7 @@ def start_monitoring():
             time.sleep(1)
     except KeyboardInterrupt:
         observer.stop()
+        watcher.debouncer.cancel()
     observer.join()
 
 if __name__ == "__main__":
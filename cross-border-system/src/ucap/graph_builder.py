@@ -1,128 +1,222 @@
-from neo4j import GraphDatabase
 import pandas as pd
 import numpy as np
 import os
-from dotenv import load_dotenv
+import sys
 from pathlib import Path
 
-# 加载环境变量
-load_dotenv()
+if __package__ in (None, ""):  # 直接以脚本运行（python graph_builder.py）时补全包上下文，使包内相对导入可用
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "ucap"
+
+from .driver_manager import get_driver
 
 # 定义项目根目录
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-class KnowledgeGraph:
-    def __init__(self):
-        """初始化Neo4j驱动"""
-        self.driver = GraphDatabase.driver(
-            os.getenv("NEO4J_URI"),
-            auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
+# 批量导入参数
+NODE_BATCH_SIZE = 10_000   # 每个 UNWIND 事务的行数
+CSV_CHUNK_SIZE = 100_000   # 每次从 CSV 读取的行数
+LINK_DROP_PROB = 0.2       # 差分隐私：随机删除关联的概率
+
+UNWIND_NODES = """
+UNWIND $rows AS row
+MERGE (a:Attribute {code: row.code})
+SET a.category = row.category, a.risk = row.risk
+"""
+# 增量同步
+DELETE_NODES = """
+UNWIND $rows AS code
+MATCH (a:Attribute {code: code})
+DETACH DELETE a
+"""
+DELETE_OUTGOING = """
+UNWIND $rows AS code
+MATCH (a:Attribute {code: code})-[r:LINKED]->()
+DELETE r
+"""
+
+# 按内部 id 排序，seed 相同时每条边得到相同的扰动决策
+EDGE_IDS = "MATCH ()-[r]->() RETURN elementId(r) AS id ORDER BY id"
+DELETE_EDGES = """
+UNWIND $rows AS id
+MATCH ()-[r]->() WHERE elementId(r) = id
+DELETE r
+"""
+UPDATE_EDGE_STRENGTH = """
+UNWIND $rows AS row
+MATCH ()-[r]->() WHERE elementId(r) = row.id
+SET r.strength = row.strength
+"""
+
+EDGE_WEIGHT_COEFFICIENT = 0.1  # 动态权重中出边关联强度的系数
+
+UPDATE_DYNAMIC_WEIGHTS = """
+MATCH (a:Attribute)
+CALL {
+    WITH a
+    OPTIONAL MATCH (a)-[r]->()
+    WITH a, coalesce(sum(r.strength), 0.0) AS total
+    SET a.dynamic_weight = a.risk + total * $coefficient
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+UNWIND_EDGES = """
+UNWIND $rows AS row
+MATCH (a:Attribute {code: row.source})
+MATCH (b:Attribute {code: row.target})
+CREATE (a)-[r:LINKED {strength: row.strength}]->(b)
+"""
+
+
+def node_records(chunk):
+    """CSV 块转为节点参数（Python 原生类型，缺失值为 None）"""
+    categories = chunk["类别"].astype(object).where(chunk["类别"].notna(), None)
+    return [
+        {"code": code, "category": category, "risk": risk}
+        for code, category, risk in zip(
+            chunk["属性代码"].tolist(), categories.tolist(), chunk["隐私风险L"].astype(float).tolist()
         )
+    ]
+
+
+def link_pairs(chunk, rng, drop_prob=LINK_DROP_PROB):
+    """展开关联属性列并一次性生成扰动决策：按 drop_prob 随机删除关联，保留的关联强度取 U(0.5, 1.0)
+
+    返回 (源代码, 目标代码, 关联强度) 三个数组；各图后端共用，相同 seed 得到相同的图。
+    """
+    links = chunk.loc[chunk["关联属性"].notna(), ["属性代码", "关联属性"]]
+    pairs = links.assign(target=links["关联属性"].astype(str).str.split(";")).explode("target")
+    keep = rng.random(len(pairs)) >= drop_prob
+    pairs = pairs[keep]
+    strength = rng.uniform(0.5, 1.0, len(pairs))
+    return pairs["属性代码"].to_numpy(dtype=object), pairs["target"].to_numpy(dtype=object), strength
+
+
+def edge_records(chunk, rng, drop_prob=LINK_DROP_PROB):
+    """CSV 块转为边参数"""
+    sources, targets, strength = link_pairs(chunk, rng, drop_prob)
+    return [
+        {"source": source, "target": target, "strength": value}
+        for source, target, value in zip(sources.tolist(), targets.tolist(), strength.tolist())
+    ]
+
+
+def draw_perturbation(n_edges, epsilon, rng):
+    """一次性抽取全部边的扰动决策：每条边以 epsilon 概率被扰动，其中一半删除、一半重置强度为 U(0.1, 1.0)
+
+    返回 (删除掩码, 更新掩码, 更新边的新强度)。
+    """
+    perturbed = rng.random(n_edges) < epsilon
+    delete = perturbed & (rng.random(n_edges) < 0.5)
+    update = perturbed & ~delete
+    return delete, update, rng.uniform(0.1, 1.0, int(update.sum()))
+
 
-    def build_graph(self, csv_path):
-        """构建带差分隐私的知识图谱"""
-        # 从CSV加载数据
-        df = pd.read_csv(csv_path)
-        
+def perturbation_report(n_edges, delete, update, epsilon, seed):
+    return {
+        "edges": int(n_edges),
+        "perturbed": int(delete.sum() + update.sum()),
+        "deleted": int(delete.sum()),
+        "updated": int(update.sum()),
+        "epsilon": epsilon,
+        "seed": seed,
+    }
+
+
+def _batches(records, size):
+    for start in range(0, len(records), size):
+        yield records[start:start + size]
+
+
+def _run_batch(tx, query, rows):
+    tx.run(query, rows=rows).consume()
+
+def create_knowledge_graph(backend=None):
+    """按名称创建图后端：memory（进程内 CSR 图）或 neo4j
+
+    未指定时读取环境变量 UCAP_GRAPH_BACKEND；也未设置时，配置了 NEO4J_URI 则使用 Neo4j，否则使用内存图。
+    """
+    backend = backend or os.getenv("UCAP_GRAPH_BACKEND") or ("neo4j" if os.getenv("NEO4J_URI") else "memory")
+    if backend == "memory":
+        from .memory_graph import InMemoryGraph
+        return InMemoryGraph()
+    if backend == "neo4j":
+        return KnowledgeGraph()
+    raise ValueError(f"未知的图后端: {backend}")
+
+class KnowledgeGraph:
+    def __init__(self, driver=None):
+        """使用共享的 Neo4j 驱动（连接池由 driver_manager 统一管理，不在这里关闭）"""
+        self.driver = driver or get_driver()
+
+    def build_graph(self, csv_path, batch_size=NODE_BATCH_SIZE, chunk_size=CSV_CHUNK_SIZE,
+                    drop_prob=LINK_DROP_PROB, seed=None):
+        """构建带差分隐私的知识图谱（批量导入）
+
+        先为 Attribute.code 建唯一约束，再分块流式读取 CSV，节点和边各以参数化 UNWIND
+        分批在显式事务中写入；扰动决策（随机删除关联、关联强度）按块向量化生成，seed 固定时可复现。
+        """
+        rng = np.random.default_rng(seed)
+        node_chunks = (node_records(chunk) for chunk in pd.read_csv(csv_path, chunksize=chunk_size))
+        edge_chunks = (edge_records(chunk, rng, drop_prob) for chunk in pd.read_csv(csv_path, chunksize=chunk_size))
+        self.load_graph(node_chunks, edge_chunks, batch_size)
+
+    def load_graph(self, node_chunks, edge_chunks, batch_size=NODE_BATCH_SIZE):
+        """清空后批量写入；node_chunks / edge_chunks 为节点、边参数列表的可迭代对象"""
+        with self.driver.session() as session:
+            # 清空现有数据（分批提交，避免单个大事务）
+            session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+            session.run(
+                "CREATE CONSTRAINT attribute_code IF NOT EXISTS FOR (a:Attribute) REQUIRE a.code IS UNIQUE"
+            ).consume()
+
+            # 先写入全部节点，边的两端才都能通过唯一索引找到
+            for records in node_chunks:
+                for batch in _batches(records, batch_size):
+                    session.execute_write(_run_batch, UNWIND_NODES, batch)
+            for records in edge_chunks:
+                for batch in _batches(records, batch_size):
+                    session.execute_write(_run_batch, UNWIND_EDGES, batch)
+
+    def apply_delta(self, node_rows, deleted_codes, relinked_codes, edge_rows, batch_size=NODE_BATCH_SIZE):
+        """增量更新：删除属性、MERGE 新增/变更属性、重建 relinked_codes 的出边（均为分批事务）"""
+        steps = [
+            (DELETE_NODES, list(deleted_codes)),
+            (UNWIND_NODES, node_rows),
+            (DELETE_OUTGOING, list(relinked_codes)),
+            (UNWIND_EDGES, edge_rows),
+        ]
         with self.driver.session() as session:
-            # 清空现有数据
-            session.run("MATCH (n) DETACH DELETE n")
-            
-            # 创建属性节点
-            for _, row in df.iterrows():
-                session.run("""
-                    CREATE (a:Attribute {
-                        code: $code, 
-                        category: $cat,
-                        risk: $risk
-                    })
-                    """, 
-                    code=row["属性代码"], 
-                    cat=row["类别"], 
-                    risk=float(row["隐私风险L"])
-                )
-            
-            # 添加关联边（带差分隐私）
-            for _, row in df.iterrows():
-                if pd.notna(row["关联属性"]):
-                    targets = row["关联属性"].split(";")
-                    for target in targets:
-                        # 应用差分隐私：20%概率扰动
-                        if np.random.rand() < 0.2:
-                            continue  # 随机删除部分关联
-                        session.run("""
-                            MATCH (a {code: $source}), (b {code: $target})
-                            CREATE (a)-[r:LINKED]->(b)
-                            SET r.strength = $strength
-                            """, 
-                            source=row["属性代码"], 
-                            target=target,
-                            strength=np.random.uniform(0.5, 1.0)
-                        )
+            for query, rows in steps:
+                for batch in _batches(rows, batch_size):
+                    session.execute_write(_run_batch, query, batch)
 
     def visualize(self):
         """生成可视化图谱（需安装Graphviz）"""
         os.system("neo4j-admin store dump --to=src/data/graph.dump")
         print("🔍 可视化图谱已生成：src/data/graph.png")
     
-    def apply_differential_privacy(self, epsilon=0.1):
-        """应用差分隐私扰动"""
+    def apply_differential_privacy(self, epsilon=0.1, seed=None, batch_size=NODE_BATCH_SIZE):
+        """应用差分隐私扰动（批量）：一次读出全部边的内部 id，向量化抽取扰动决策，
+        删除与强度更新按 elementId 分批 UNWIND 写回，返回扰动报告"""
         with self.driver.session() as session:
-            # 获取所有边
-            edges = session.run("MATCH (a)-[r]->(b) RETURN a.code as source, b.code as target, r.strength as strength")
-            edges = [dict(record) for record in edges]
-            
-            # 对边进行扰动
-            for edge in edges:
-                if np.random.rand() < epsilon:
-                    # 随机删除或修改权重
-                    if np.random.rand() < 0.5:
-                        session.run("""
-                            MATCH (a {code: $source})-[r]->(b {code: $target})
-                            DELETE r
-                            """, 
-                            source=edge["source"], 
-                            target=edge["target"]
-                        )
-                    else:
-                        new_strength = np.random.uniform(0.1, 1.0)
-                        session.run("""
-                            MATCH (a {code: $source})-[r]->(b {code: $target})
-                            SET r.strength = $strength
-                            """, 
-                            source=edge["source"], 
-                            target=edge["target"],
-                            strength=new_strength
-                        )
-    
-    def calculate_risk_scores(self):
-        """计算动态风险评分"""
+            ids = [record["id"] for record in session.run(EDGE_IDS)]
+            delete, update, strength = draw_perturbation(len(ids), epsilon, np.random.default_rng(seed))
+            ids = np.asarray(ids, dtype=object)
+            for batch in _batches(ids[delete].tolist(), batch_size):
+                session.execute_write(_run_batch, DELETE_EDGES, batch)
+            rows = [{"id": i, "strength": v} for i, v in zip(ids[update].tolist(), strength.tolist())]
+            for batch in _batches(rows, batch_size):
+                session.execute_write(_run_batch, UPDATE_EDGE_STRENGTH, batch)
+        return perturbation_report(len(ids), delete, update, epsilon, seed)
+
+    def calculate_risk_scores(self, edge_coefficient=EDGE_WEIGHT_COEFFICIENT):
+        """计算动态风险评分：动态权重 = 风险系数 + edge_coefficient × 出边关联强度之和
+
+        一条聚合语句完成全部节点（分批提交），不再逐节点查询出边和回写，返回更新的节点数。
+        """
         with self.driver.session() as session:
-            # 获取所有节点
-            nodes = session.run("MATCH (a:Attribute) RETURN a.code as code, a.risk as risk")
-            nodes = [dict(record) for record in nodes]
-            
-            # 计算动态权重
-            for node in nodes:
-                # 示例公式：动态权重 = 风险系数 * 关联强度
-                linked_nodes = session.run("""
-                    MATCH (a {code: $code})-[r]->(b)
-                    RETURN b.code as target, r.strength as strength
-                    """, code=node["code"])
-                linked_nodes = [dict(record) for record in linked_nodes]
-                
-                dynamic_weight = node["risk"]
-                for link in linked_nodes:
-                    dynamic_weight += link["strength"] * 0.1  # 调整权重公式
-                
-                # 更新节点权重
-                session.run("""
-                    MATCH (a {code: $code})
-                    SET a.dynamic_weight = $weight
-                    """, 
-                    code=node["code"], 
-                    weight=dynamic_weight
-                )
+            summary = session.run(UPDATE_DYNAMIC_WEIGHTS, coefficient=float(edge_coefficient)).consume()
+        return summary.counters.properties_set
 
 # 示例用法
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .graph_builder import LINK_DROP_PROB, NODE_BATCH_SIZE, edge_records, node_records
+
+# 参与比对的 CSV 列（任一列变化即视为该属性变化）
+SYNC_COLUMNS = ["属性代码", "类别", "隐私风险L", "关联属性"]
+
+
+class Debouncer:
+    """合并短时间内的多次触发：最后一次触发后静默 delay 秒才执行一次，执行过程互斥"""
+
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self._timer = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    def trigger(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._run_lock:
+            self.callback()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class GraphSynchronizer:
+    """按行哈希比对 CSV 与上次同步的快照，只把新增 / 变更 / 删除的属性及其关联写入图
+
+    首次同步整体构建；之后节点以 MERGE 更新，变更属性的出边先删除再按新的关联属性重建，
+    被删除的属性连同关联一起删除。图在同步过程中始终可以查询。
+    """
+
+    def __init__(self, kg, csv_path, drop_prob=LINK_DROP_PROB, seed=None, batch_size=NODE_BATCH_SIZE):
+        self.kg = kg
+        self.csv_path = csv_path
+        self.drop_prob = drop_prob
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.snapshot = None  # 属性代码 -> 行哈希
+
+    def _load(self):
+        df = pd.read_csv(self.csv_path)
+        df = df.drop_duplicates("属性代码", keep="last").reset_index(drop=True)
+        hashes = pd.util.hash_pandas_object(df[SYNC_COLUMNS], index=False, categorize=False).to_numpy()
+        return df, pd.Series(hashes, index=pd.Index(df["属性代码"].to_numpy(dtype=object), dtype=object))
+
+    def sync(self):
+        """同步一次，返回变更摘要"""
+        df, hashes = self._load()
+        if self.snapshot is None:
+            self.kg.build_graph(self.csv_path, batch_size=self.batch_size, drop_prob=self.drop_prob,
+                                seed=self.rng.integers(2 ** 32))
+            self.snapshot = hashes
+            return {"mode": "full", "nodes": len(hashes)}
+
+        prev = self.snapshot
+        common = hashes.index.intersection(prev.index, sort=False)
+        added = hashes.index.difference(prev.index, sort=False)
+        deleted = prev.index.difference(hashes.index, sort=False)
+        changed = common[hashes[common].to_numpy() != prev[common].to_numpy()]
+        upserted = added.append(changed)
+
+        # 关联到新增属性的行也要重建出边（之前目标不存在，关联被忽略）
+        links = df.loc[df["关联属性"].notna(), ["属性代码", "关联属性"]]
+        targets = links.assign(target=links["关联属性"].astype(str).str.split(";")).explode("target")
+        referencing = targets.loc[targets["target"].isin(added), "属性代码"].unique()
+        relinked = upserted.append(pd.Index(referencing, dtype=object)).unique()
+
+        codes = df["属性代码"]
+        node_rows = node_records(df[codes.isin(upserted)])
+        edge_rows = edge_records(df[codes.isin(relinked)], self.rng, self.drop_prob)
+        if len(upserted) or len(deleted) or len(relinked):
+            self.kg.apply_delta(node_rows, deleted.tolist(), list(relinked), edge_rows, self.batch_size)
+        self.snapshot = hashes
+        return {
+            "mode": "incremental",
+            "added": len(added),
+            "changed": len(changed),
+            "deleted": len(deleted),
+            "relinked": len(relinked),
+            "edges": len(edge_rows),
+        }
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .graph_builder import (
+    BASE_DIR, CSV_CHUNK_SIZE, EDGE_WEIGHT_COEFFICIENT, LINK_DROP_PROB, NODE_BATCH_SIZE,
+    draw_perturbation, link_pairs, perturbation_report,
+)
+
+
+class InMemoryGraph:
+    """进程内属性关联图，接口与 KnowledgeGraph 一致
+
+    节点按属性代码驻留（codes[i] <-> i），边以 CSR 邻接数组保存：
+    节点 i 的出边为 indices[indptr[i]:indptr[i+1]]，对应关联强度在 strength 的同一区间。
+    风险评分、差分隐私扰动、LSSS 生成都是对这些数组的向量化运算，不需要数据库；
+    需要时可用 sync_to() 把结果写入 Neo4j。
+    """
+
+    def __init__(self):
+        self._propagator = None  # 常驻的 RiskPropagator，增量更新后以上一次的解热启动
+        self._set_nodes(np.array([], dtype=object), np.array([], dtype=object), np.array([], dtype=float))
+        self._set_edges(np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=float))
+
+    # ------------------------- 构建 -------------------------
+    def _set_nodes(self, codes, categories, risk):
+        self.codes = np.asarray(codes, dtype=object)
+        self.index = pd.Index(self.codes, dtype=object)
+        self.category = np.asarray(categories, dtype=object)
+        self.risk = np.asarray(risk, dtype=float)
+        self.dynamic_weight = np.full(len(self.codes), np.nan)
+        self.propagated_risk = np.full(len(self.codes), np.nan)
+        self.community = np.full(len(self.codes), -1)  # 社区编号，detect_communities 之前为 -1
+
+    def _set_edges(self, sources, targets, strength):
+        """由边列表（节点下标）构建 CSR，同一源节点的边保持输入顺序"""
+        order = np.argsort(sources, kind="stable")
+        self.indices = np.asarray(targets, dtype=np.int64)[order]
+        self.strength = np.asarray(strength, dtype=float)[order]
+        counts = np.bincount(np.asarray(sources, dtype=np.int64), minlength=len(self.codes))
+        self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    @classmethod
+    def from_edges(cls, nodes, edges):
+        """由节点表（code、category、risk）和边表（source、target、strength）构建"""
+        graph = cls()
+        graph._load(nodes, edges)
+        return graph
+
+    def _load(self, nodes, edges):
+        nodes = nodes.drop_duplicates("code", keep="last")  # 与 MERGE 一致：重复代码以最后一行为准
+        categories = nodes["category"] if "category" in nodes else pd.Series(None, index=nodes.index)
+        self._set_nodes(nodes["code"].to_numpy(dtype=object), categories.to_numpy(dtype=object),
+                        nodes["risk"].to_numpy(dtype=float))
+        # 节点代码与边端点一起做一次哈希编码：节点代码唯一且在最前，编号恰为 0..n-1
+        n, m = self.n_nodes, len(edges)
+        ids, _ = pd.factorize(np.concatenate([
+            self.codes, edges["source"].to_numpy(dtype=object), edges["target"].to_numpy(dtype=object),
+        ]))
+        sources, targets = ids[n:n + m], ids[n + m:]
+        valid = (sources < n) & (targets < n)  # 与 MATCH 一致：端点不存在的关联被忽略
+        self._set_edges(sources[valid], targets[valid], edges["strength"].to_numpy(dtype=float)[valid])
+
+    def build_graph(self, csv_path, batch_size=NODE_BATCH_SIZE, chunk_size=CSV_CHUNK_SIZE,
+                    drop_prob=LINK_DROP_PROB, seed=None):
+        """从 CSV 构建图，扰动决策与 KnowledgeGraph.build_graph 相同（相同 seed 得到相同的图）"""
+        rng = np.random.default_rng(seed)
+        node_parts, edge_parts = [], []
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            node_parts.append(pd.DataFrame({
+                "code": chunk["属性代码"].to_numpy(dtype=object),
+                "category": chunk["类别"].to_numpy(dtype=object),
+                "risk": chunk["隐私风险L"].to_numpy(dtype=float),
+            }))
+            sources, targets, strength = link_pairs(chunk, rng, drop_prob)
+            edge_parts.append(pd.DataFrame({"source": sources, "target": targets, "strength": strength}))
+        self._load(pd.concat(node_parts, ignore_index=True), pd.concat(edge_parts, ignore_index=True))
+        return self
+
+    def apply_delta(self, node_rows, deleted_codes, relinked_codes, edge_rows, batch_size=None):
+        """增量更新：删除属性、更新/追加属性（保持原有顺序）、重建 relinked_codes 的出边"""
+        nodes = self.nodes()[["code", "category", "risk"]].set_index("code")
+        nodes = nodes[~nodes.index.isin(deleted_codes)]
+        upserts = pd.DataFrame(node_rows, columns=["code", "category", "risk"]).set_index("code")
+        existing = upserts.index.isin(nodes.index)
+        nodes.loc[upserts.index[existing]] = upserts[existing]
+        nodes = pd.concat([nodes, upserts[~existing]]).reset_index()
+
+        edges = self.edges()
+        removed = set(deleted_codes)
+        stale = edges["source"].isin(removed.union(relinked_codes)) | edges["target"].isin(removed)
+        edges = pd.concat([edges[~stale], pd.DataFrame(edge_rows, columns=["source", "target", "strength"])],
+                          ignore_index=True)
+        self._load(nodes, edges)
+
+    # ------------------------- 查询 -------------------------
+    @property
+    def n_nodes(self):
+        return len(self.codes)
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def edge_sources(self):
+        """每条边的源节点下标（与 indices 对齐）"""
+        return np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+
+    def neighbors(self, code):
+        """出边的目标代码与关联强度"""
+        i = self.index.get_loc(code)
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return self.codes[self.indices[lo:hi]], self.strength[lo:hi]
+
+    def nodes(self):
+        return pd.DataFrame({"code": self.codes, "category": self.category, "risk": self.risk,
+                             "dynamic_weight": self.dynamic_weight})
+
+    def edges(self):
+        return pd.DataFrame({"source": self.codes[self.edge_sources()], "target": self.codes[self.indices],
+                             "strength": self.strength})
+
+    # ------------------------- 分析 -------------------------
+    def apply_differential_privacy(self, epsilon=0.1, seed=None, batch_size=None):
+        """应用差分隐私扰动（决策与 KnowledgeGraph 相同，按 CSR 边顺序抽取），返回扰动报告"""
+        n_edges = self.n_edges
+        delete, update, strength = draw_perturbation(n_edges, epsilon, np.random.default_rng(seed))
+        self.strength[update] = strength
+        if delete.any():
+            keep = ~delete
+            self._set_edges(self.edge_sources()[keep], self.indices[keep], self.strength[keep])
+        return perturbation_report(n_edges, delete, update, epsilon, seed)
+
+    def out_strength(self):
+        """每个节点出边关联强度之和（CSR 分段求和）"""
+        nonempty = np.diff(self.indptr) > 0
+        totals = np.zeros(self.n_nodes)
+        if self.n_edges:
+            totals[nonempty] = np.add.reduceat(self.strength, self.indptr[:-1][nonempty])
+        return totals
+
+    def calculate_risk_scores(self, edge_coefficient=EDGE_WEIGHT_COEFFICIENT):
+        """计算动态风险评分：风险系数 + edge_coefficient × 出边关联强度之和"""
+        self.dynamic_weight = self.risk + self.out_strength() * edge_coefficient
+        return self.dynamic_weight
+
+    def propagate_risk(self, propagator=None):
+        """沿关联扩散风险（个性化 PageRank），结果保存在 propagated_risk，返回迭代信息
+
+        默认使用本图常驻的 RiskPropagator：apply_delta 之后再次调用时以上一次的解热启动。
+        """
+        from .risk_propagation import RiskPropagator  # 延迟导入：只有用到扩散风险时才加载 scipy
+        if propagator is None:
+            if self._propagator is None:
+                self._propagator = RiskPropagator()
+            propagator = self._propagator
+        result, info = propagator.propagate(self)
+        self.propagated_risk = result["propagated_risk"].to_numpy(dtype=float)
+        return info
+
+    def detect_communities(self, detector=None):
+        """在关联图上做社区发现，社区编号保存在 community，返回 (每个属性的社区, 模块度报告)"""
+        from .community import CommunityDetector  # 延迟导入：只有用到社区发现时才加载 scipy
+        communities, report = (detector or CommunityDetector()).detect(self)
+        self.community = communities["community"].to_numpy()
+        return communities, report
+
+    def suggest_categories(self, output=None, min_share=0.5, detector=None):
+        """按所在社区的多数类别给出建议类别，导出 CSV（code、category、suggested_category）供人工复核"""
+        from .community import CommunityDetector
+        communities, report = self.detect_communities(detector)
+        suggestions = CommunityDetector.suggest_categories(communities, min_share)
+        output = Path(output) if output else BASE_DIR / "data" / "category_suggestions.csv"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        suggestions.to_csv(output, index=False)
+        print(f"🧭 {report['communities']} 个社区，{len(suggestions)} 条类别建议已导出：{output}")
+        return suggestions
+
+    # ------------------------- 同步 / 导出 -------------------------
+    def sync_to(self, kg, batch_size=NODE_BATCH_SIZE):
+        """把当前图整体写入 Neo4j（KnowledgeGraph）"""
+        nodes = self.nodes()
+        nodes["category"] = nodes["category"].astype(object).where(nodes["category"].notna(), None)
+        node_rows = nodes[["code", "category", "risk"]].to_dict("records")
+        edge_rows = self.edges().to_dict("records")
+        kg.load_graph([node_rows], [edge_rows], batch_size)
+
+    def visualize(self, output=None):
+        """导出边表（source、target、strength），可导入 Graphviz / Gephi"""
+        output = Path(output) if output else BASE_DIR / "data" / "graph_edges.csv"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self.edges().to_csv(output, index=False)
+        print(f"🔍 图谱边表已导出：{output}")
+        return output
@@ -1,49 +1,154 @@
+import sys
+from pathlib import Path
+
 import numpy as np
-from neo4j import GraphDatabase
-import os
-from dotenv import load_dotenv
+import pandas as pd
+import scipy.sparse as sp
+
+if __package__ in (None, ""):  # 直接以脚本运行（python policy_mapper.py）时补全包上下文，使包内相对导入可用
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "ucap"
+
+from .driver_manager import get_driver, read_concurrently
+from .reachability import MAX_HOPS, ReachabilityIndex
+
+ALL_ATTRIBUTES = "MATCH (a:Attribute) RETURN a.code AS code, a.risk AS risk"
+ALL_LINKS = "MATCH (a:Attribute)-[]->(b:Attribute) RETURN a.code AS source, b.code AS target"
+SUBSET_ATTRIBUTES = """
+UNWIND $codes AS code
+MATCH (a:Attribute {code: code})
+RETURN a.code AS code, a.risk AS risk
+"""
+SUBSET_LINKS = """
+MATCH (a:Attribute)-[]->(b:Attribute)
+WHERE a.code IN $codes AND b.code IN $codes
+RETURN a.code AS source, b.code AS target
+"""
+
+
+def sparse_lsss(risk, sources, targets, size):
+    """LSSS 策略矩阵（CSR）：对角线为风险系数 × 10，关联属性所在列为 1（自关联时对角线也为 1）
+
+    sources / targets 为已驻留的行列下标，重复关联只记一次。
+    """
+    ones = np.ones(len(sources))
+    links = sp.csr_matrix((ones, (sources, targets)), shape=(size, size))
+    links.sum_duplicates()
+    links.data[:] = 1
+    diagonal = np.where(links.diagonal() > 0, 0.0, np.asarray(risk, dtype=float) * 10)
+    matrix = (links + sp.diags(diagonal, format="csr")).tocsr()
+    matrix.eliminate_zeros()
+    return matrix
+
 
-load_dotenv()
+def _intern(codes, sources, targets):
+    """属性代码驻留为下标，丢弃端点不在 codes 中的关联"""
+    n, m = len(codes), len(sources)
+    ids, _ = pd.factorize(np.concatenate([
+        np.asarray(codes, dtype=object), np.asarray(sources, dtype=object), np.asarray(targets, dtype=object),
+    ]))
+    src, dst = ids[n:n + m], ids[n + m:]
+    valid = (src < n) & (dst < n)
+    return src[valid], dst[valid]
 
 class PolicyGenerator:
-    def __init__(self):
-        self.driver = GraphDatabase.driver(  # 括号开始
-            os.getenv("NEO4J_URI"),
-            auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
-        )  # 括号闭合
+    def __init__(self, graph=None, driver=None, propagated_risk=False):
+        """graph 为内存图（InMemoryGraph）时直接基于其邻接数组生成，否则使用共享的 Neo4j 驱动
+
+        propagated_risk=True 时对角线使用沿关联扩散后的风险（InMemoryGraph.propagate_risk），
+        强关联链末端被大量关联的属性获得更高的行权重；仅支持内存图。
+        """
+        if propagated_risk and graph is None:
+            raise ValueError("扩散风险仅支持内存图（InMemoryGraph）")
+        self.graph = graph
+        self.propagated_risk = propagated_risk
+        self._reachability = None  # (邻接数组, 索引)：图未被替换 / 增量更新时复用
+        if graph is None:
+            self.driver = driver or get_driver()
+
+    def _risk(self):
+        """内存图的行权重来源：原始风险系数，或扩散后的风险（尚未计算时先计算）"""
+        g = self.graph
+        if not self.propagated_risk:
+            return g.risk
+        if np.isnan(g.propagated_risk).any():
+            g.propagate_risk()
+        return g.propagated_risk
+
+    def reachability(self, max_hops=MAX_HOPS):
+        """内存图的 k 跳可达性索引，图的邻接数组未变化时复用上一次构建的索引"""
+        if self.graph is None:
+            raise ValueError("可达性索引仅支持内存图（InMemoryGraph）")
+        g = self.graph
+        cached = self._reachability
+        if cached is None or cached[0] is not g.indices or cached[1].max_hops != max_hops:
+            self._reachability = (g.indices, ReachabilityIndex.from_graph(g, max_hops))
+        return self._reachability[1]
+
+    def linked_attributes(self, attributes, hops=MAX_HOPS):
+        """能在 hops 跳内关联到 attributes 中任一属性的其他属性（按图中顺序）"""
+        index = self.reachability(max(hops, 1))
+        targets = set(attributes)
+        linked = set()
+        for code in targets:
+            linked.update(index.linked_to(code, hops))
+        return [code for code in index.codes.tolist() if code in linked and code not in targets]
 
     def generate_lsss(self):
-        """生成LSSS策略矩阵"""
-        with self.driver.session() as session:
-            # 获取所有属性
-            result = session.run("MATCH (a:Attribute) RETURN a.code as code, a.risk as risk")
-            attributes = [(record["code"], record["risk"]) for record in result]
-            
-            # 构建LSSS矩阵
-            size = len(attributes)
-            matrix = np.zeros((size, size))
-            
-            for i, (code, risk) in enumerate(attributes):
-                # 行权重 = 风险系数 * 10
-                matrix[i][i] = risk * 10
-                
-                # 获取关联属性
-                linked = session.run("""
-                    MATCH (a {code: $code})-[r]->(b)
-                    RETURN b.code as target
-                    """, code=code)
-                linked_codes = [record["target"] for record in linked]
-                
-                # 列位置由关联属性决定
-                for j, (target_code, _) in enumerate(attributes):
-                    if target_code in linked_codes:
-                        matrix[i][j] = 1
-            
-            return matrix
+        """生成稠密 LSSS 策略矩阵（n × n，仅适用于小图；大图请使用 generate_lsss_sparse）
+
+        由稀疏矩阵展开，与 generate_lsss_sparse 共用一次取回全部关联的路径。
+        """
+        return self.generate_lsss_sparse()[0].toarray()
+
+    def generate_lsss_sparse(self, attributes=None, linked_hops=None):
+        """生成稀疏 LSSS 策略矩阵，返回 (CSR 矩阵, 行列对应的属性代码)
+
+        attributes 指定时只生成这些属性之间的子矩阵（按给定顺序）；
+        linked_hops 指定时把能在该跳数内间接关联到这些属性的属性追加到子矩阵末尾（仅内存图）。
+        全部关联一次取回（内存图直接使用邻接数组），不再逐属性查询。
+        """
+        if linked_hops is not None and attributes is not None:
+            attributes = list(dict.fromkeys(attributes))
+            attributes += self.linked_attributes(attributes, linked_hops)
+        if self.graph is not None:
+            return self._generate_lsss_sparse_in_memory(attributes)
+        # 属性与关联两个查询相互独立，并发执行
+        if attributes is None:
+            nodes, links = read_concurrently([(ALL_ATTRIBUTES, {}), (ALL_LINKS, {})])
+        else:
+            params = {"codes": list(attributes)}
+            nodes, links = read_concurrently([(SUBSET_ATTRIBUTES, params), (SUBSET_LINKS, params)])
+        codes = [node["code"] for node in nodes]
+        if attributes is not None:
+            missing = set(attributes) - set(codes)
+            if missing:
+                raise KeyError(f"未知属性: {sorted(missing)[:10]}")
+            risk = dict(zip(codes, (node["risk"] for node in nodes)))
+            codes = list(dict.fromkeys(attributes))
+            nodes = [{"risk": risk[code]} for code in codes]
+        sources, targets = _intern(codes, [l["source"] for l in links], [l["target"] for l in links])
+        risk = np.array([node["risk"] for node in nodes], dtype=float)
+        return sparse_lsss(risk, sources, targets, len(codes)), np.asarray(codes, dtype=object)
+
+    def _generate_lsss_sparse_in_memory(self, attributes=None):
+        g = self.graph
+        sources, targets = g.edge_sources(), g.indices
+        if attributes is None:
+            return sparse_lsss(self._risk(), sources, targets, g.n_nodes), g.codes
+        codes = np.asarray(list(dict.fromkeys(attributes)), dtype=object)
+        rows = g.index.get_indexer(codes)
+        if (rows < 0).any():
+            raise KeyError(f"未知属性: {codes[rows < 0][:10].tolist()}")
+        # 原图下标 -> 子矩阵下标，两端都在子集内的关联才保留
+        position = np.full(g.n_nodes, -1)
+        position[rows] = np.arange(len(rows))
+        keep = (position[sources] >= 0) & (position[targets] >= 0)
+        return sparse_lsss(self._risk()[rows], position[sources[keep]], position[targets[keep]], len(rows)), codes
 
 # 示例用法
 if __name__ == "__main__":
     pg = PolicyGenerator()
-    lsss_matrix = pg.generate_lsss()
-    print("🔐 LSSS策略矩阵：")
+    lsss_matrix, codes = pg.generate_lsss_sparse()
+    print(f"🔐 LSSS策略矩阵：{lsss_matrix.shape[0]} 个属性，{lsss_matrix.nnz} 个非零元素")
     print(lsss_matrix)
\ No newline at end of file
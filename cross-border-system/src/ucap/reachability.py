@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+MAX_HOPS = 3
+ROW_BLOCK = 4096  # 构建时每批处理的行数（限制临时内存）
+MAX_INDEX_BYTES = 1 << 31  # 位图总大小上限（k × n² / 8 字节），默认 2 GiB
+
+
+def _bit(ids):
+    """节点下标 -> (字节位置, 位掩码)，位序为 little"""
+    ids = np.asarray(ids, dtype=np.int64)
+    return ids >> 3, (1 << (ids & 7)).astype(np.uint8)
+
+
+class ReachabilityIndex:
+    """k 跳可达性索引（位图闭包）
+
+    levels[h-1][i] 是一个位图，记录从属性 i 出发经过 1..h 条 LINKED 关联可以到达的属性。
+    可达 / 距离查询只需测试若干位，最短关联链按层逐跳回溯，均为微秒级；
+    “哪些属性能在 k 跳内关联到 ID_CARD”是对位图一列的向量化提取。
+    增删关联时只重算受影响的行：新增 u→v 时把 v 的闭包并入所有能到达 u 的行，
+    删除时按层重算能在 k-1 跳内到达 u 的行。
+    内存为 k × n² / 8 字节，面向属性目录规模（数万个属性以内）；超过 max_bytes 时抛出 MemoryError。
+    """
+
+    def __init__(self, codes, sources, targets, max_hops=MAX_HOPS, max_bytes=MAX_INDEX_BYTES):
+        if max_hops < 1:
+            raise ValueError(f"max_hops 至少为 1: {max_hops}")
+        self.max_hops = max_hops
+        self.max_bytes = max_bytes
+        self.codes = np.asarray(codes, dtype=object)
+        self.index = pd.Index(self.codes, dtype=object)
+        n = len(self.codes)
+        self.succ = [set() for _ in range(n)]
+        for s, t in zip(np.asarray(sources).tolist(), np.asarray(targets).tolist()):
+            self.succ[s].add(t)
+        self._check_size(n)
+        self._build()
+
+    @classmethod
+    def from_graph(cls, graph, max_hops=MAX_HOPS, max_bytes=MAX_INDEX_BYTES):
+        """由 InMemoryGraph 的 CSR 邻接数组构建"""
+        return cls(graph.codes, graph.edge_sources(), graph.indices, max_hops, max_bytes)
+
+    @classmethod
+    def from_edges(cls, codes, edges, max_hops=MAX_HOPS, max_bytes=MAX_INDEX_BYTES):
+        """由属性代码列表和边表（source、target，属性代码）构建，端点不存在的关联被忽略"""
+        index = pd.Index(np.asarray(codes, dtype=object), dtype=object)
+        sources = index.get_indexer(edges["source"].to_numpy(dtype=object))
+        targets = index.get_indexer(edges["target"].to_numpy(dtype=object))
+        valid = (sources >= 0) & (targets >= 0)
+        return cls(index.to_numpy(), sources[valid], targets[valid], max_hops, max_bytes)
+
+    # ------------------------- 构建 -------------------------
+    @property
+    def n_nodes(self):
+        return len(self.codes)
+
+    def _width(self):
+        return (self.n_nodes + 7) // 8
+
+    def _check_size(self, n):
+        """位图总大小超过 max_bytes 时拒绝构建 / 扩展，避免分配到一半耗尽内存"""
+        size = self.max_hops * n * ((n + 7) // 8)
+        if size > self.max_bytes:
+            raise MemoryError(f"可达性索引需要 {size / 2**20:.0f} MiB（{n} 个属性 × {self.max_hops} 跳），"
+                              f"超过上限 {self.max_bytes / 2**20:.0f} MiB；请减小 max_hops、按子图构建或调大 max_bytes")
+
+    def _csr(self):
+        counts = np.array([len(s) for s in self.succ], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        indices = np.fromiter((t for s in self.succ for t in s), dtype=np.int64, count=int(counts.sum()))
+        return indptr, indices
+
+    def _build(self):
+        """逐层计算闭包：R1 为直接关联，Rh[i] = R1[i] ∪ ⋃_{j∈R1[i]} R(h-1)[j]"""
+        n, width = self.n_nodes, self._width()
+        indptr, indices = self._csr()
+        first = np.zeros((n, width), dtype=np.uint8)
+        sources = np.repeat(np.arange(n), np.diff(indptr))
+        byte, mask = _bit(indices)
+        np.bitwise_or.at(first, (sources, byte), mask)
+        self.levels = [first]
+        for _ in range(1, self.max_hops):
+            prev, level = self.levels[-1], first.copy()
+            for lo in range(0, n, ROW_BLOCK):
+                hi = min(lo + ROW_BLOCK, n)
+                rows = np.arange(lo, hi)[np.diff(indptr[lo:hi + 1]) > 0]
+                if len(rows):
+                    gathered = prev[indices[indptr[lo]:indptr[hi]]]
+                    level[rows] |= np.bitwise_or.reduceat(gathered, indptr[rows] - indptr[lo], axis=0)
+            self.levels.append(level)
+
+    # ------------------------- 查询 -------------------------
+    def _loc(self, code):
+        return self.index.get_loc(code)
+
+    def _has(self, level, row, target):
+        return bool(self.levels[level - 1][row, target >> 3] & (1 << (target & 7)))
+
+    def _hops(self, hops):
+        """查询跳数：None 取 max_hops，须在 0..max_hops 之间（0 跳内没有任何关联）"""
+        if hops is None:
+            return self.max_hops
+        if not 0 <= hops <= self.max_hops:
+            raise ValueError(f"hops 须在 0..{self.max_hops} 之间: {hops}")
+        return hops
+
+    def distance(self, source, target):
+        """最短关联跳数（超过 max_hops 或不可达返回 None）"""
+        s, t = self._loc(source), self._loc(target)
+        for h in range(1, self.max_hops + 1):
+            if self._has(h, s, t):
+                return h
+        return None
+
+    def reachable(self, source, target, hops=None):
+        """source 能否在 hops 跳内关联到 target"""
+        hops = self._hops(hops)
+        return hops > 0 and self._has(hops, self._loc(source), self._loc(target))
+
+    def reachable_from(self, source, hops=None):
+        """source 在 hops 跳内能关联到的属性代码"""
+        hops, row = self._hops(hops), self._loc(source)
+        if hops == 0:
+            return []
+        row = self.levels[hops - 1][row]
+        bits = np.unpackbits(row, count=self.n_nodes, bitorder="little")
+        return self.codes[bits.astype(bool)].tolist()
+
+    def linked_to(self, target, hops=None):
+        """能在 hops 跳内关联到 target 的属性代码（位图的一列）"""
+        hops, (byte, mask) = self._hops(hops), _bit(self._loc(target))
+        if hops == 0:
+            return []
+        column = self.levels[hops - 1][:, byte] & mask
+        return self.codes[column.astype(bool)].tolist()
+
+    def shortest_chain(self, source, target):
+        """最短关联链（属性代码列表，含两端）；超过 max_hops 或不可达返回 None"""
+        distance = self.distance(source, target)
+        if distance is None:
+            return None
+        t = self._loc(target)
+        chain, current = [self._loc(source)], self._loc(source)
+        for remaining in range(distance - 1, 0, -1):
+            # 下一跳：剩余 remaining 跳内仍能到达 target 的后继
+            current = next(j for j in self.succ[current] if self._has(remaining, j, t))
+            chain.append(current)
+        chain.append(t)
+        return self.codes[chain].tolist()
+
+    # ------------------------- 增量维护 -------------------------
+    def _closure(self, node, hops):
+        """node 自身加上其 hops 跳闭包的位图（hops=0 时只有自身）"""
+        row = np.zeros(self._width(), dtype=np.uint8)
+        byte, mask = _bit(node)
+        row[byte] |= mask
+        return row if hops == 0 else row | self.levels[hops - 1][node]
+
+    def _ancestors(self, node, hops):
+        """node 自身加上能在 hops 跳内到达 node 的节点下标"""
+        if hops == 0:
+            return np.array([node])
+        byte, mask = _bit(node)
+        return np.append(np.flatnonzero(self.levels[hops - 1][:, byte] & mask), node)
+
+    def add_node(self, code):
+        """追加一个孤立属性（位图按字节扩展列）"""
+        if code in self.index:
+            return self._loc(code)
+        n = self.n_nodes
+        self._check_size(n + 1)
+        self.codes = np.append(self.codes, np.array([code], dtype=object))
+        self.index = pd.Index(self.codes, dtype=object)
+        self.succ.append(set())
+        pad = self._width() - self.levels[0].shape[1]
+        self.levels = [np.pad(level, ((0, 1), (0, pad))) for level in self.levels]
+        return n
+
+    def add_edge(self, source, target):
+        """新增关联 source→target：经过新边的路径 x⇝u→v⇝y 长度 a+1+b ≤ h 时并入 Rh[x]"""
+        u, v = self.add_node(source), self.add_node(target)
+        if v in self.succ[u]:
+            return
+        k = self.max_hops
+        ancestors = [self._ancestors(u, a) for a in range(k)]
+        closures = [self._closure(v, b) for b in range(k)]
+        self.succ[u].add(v)
+        for h in range(1, k + 1):
+            level = self.levels[h - 1]
+            for a in range(h):
+                level[ancestors[a]] |= closures[h - 1 - a]
+
+    def remove_edge(self, source, target):
+        """删除关联 source→target：按层重算能在 h-1 跳内到达 source 的行"""
+        u, v = self._loc(source), self._loc(target)
+        if v not in self.succ[u]:
+            return
+        affected = [self._ancestors(u, h - 1) for h in range(1, self.max_hops + 1)]
+        self.succ[u].discard(v)
+        width = self._width()
+        for h, rows in enumerate(affected, start=1):
+            level = self.levels[h - 1]
+            for x in rows.tolist():
+                succ = np.fromiter(self.succ[x], dtype=np.int64, count=len(self.succ[x]))
+                row = np.zeros(width, dtype=np.uint8)
+                byte, mask = _bit(succ)
+                np.bitwise_or.at(row, byte, mask)
+                if h > 1 and len(succ):
+                    row |= np.bitwise_or.reduce(self.levels[h - 2][succ], axis=0)
+                level[x] = row
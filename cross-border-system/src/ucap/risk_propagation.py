@@ -0,0 +1,96 @@
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DAMPING = 0.85
+TOLERANCE = 1e-9
+MAX_ITER = 200
+
+
+def transition_matrix(indptr, indices, strength, n):
+    """按关联强度归一化的转移矩阵的转置 Pᵀ，以及无出边节点的掩码
+
+    直接复用 CSR 数组：CSR 的转置即同一组数组的 CSC，不需要重新排序，千万级边也只需一次按行缩放。
+    """
+    strength = np.asarray(strength, dtype=float)
+    degree = np.diff(indptr)
+    out_strength = np.zeros(n)
+    nonempty = degree > 0
+    if len(strength):
+        out_strength[nonempty] = np.add.reduceat(strength, np.asarray(indptr[:-1])[nonempty])
+    dangling = out_strength <= 0
+    scale = np.divide(1.0, out_strength, out=np.zeros(n), where=~dangling)
+    matrix = sp.csr_matrix((strength * np.repeat(scale, degree), indices, indptr), shape=(n, n))
+    return matrix.T, dangling
+
+
+def personalized_pagerank(transition_t, dangling, personalization, damping=DAMPING, tol=TOLERANCE,
+                          max_iter=MAX_ITER, x0=None):
+    """幂迭代求解 x = α·Pᵀx + α·(悬挂节点质量)·p + (1-α)·p
+
+    personalization 为各节点的初始风险（自动归一化），x0 为热启动的初值；
+    返回 (x, 迭代次数, 最后一次的 L1 残差)。
+    """
+    p = np.asarray(personalization, dtype=float)
+    if len(p) == 0:  # 空图：没有需要扩散的风险
+        return np.zeros(0), 0, 0.0
+    p = p / p.sum() if p.sum() > 0 else np.full(len(p), 1.0 / len(p))
+    x = p.copy() if x0 is None else np.asarray(x0, dtype=float) / max(np.sum(x0), 1e-300)
+    residual = np.inf
+    for iteration in range(1, max_iter + 1):
+        new = damping * (transition_t @ x + x[dangling].sum() * p) + (1 - damping) * p
+        residual = np.abs(new - x).sum()
+        x = new
+        if residual < tol:
+            break
+    return x, iteration, residual
+
+
+class RiskPropagator:
+    """沿 LINKED 关联扩散风险（个性化 PageRank）
+
+    每个属性以其风险系数为个性化分布，风险沿关联强度归一化后的出边传递、逐步衰减（damping），
+    多条低风险属性组成的强关联链会把风险汇集到链上被大量关联的属性。
+    结果 propagated_risk 的总和等于原始风险总和，可与 risk 直接比较。
+    图只发生少量变化时，以上一次的解（按属性代码对齐）作为初值，迭代次数大幅减少。
+    """
+
+    def __init__(self, damping=DAMPING, tol=TOLERANCE, max_iter=MAX_ITER):
+        self.damping = damping
+        self.tol = tol
+        self.max_iter = max_iter
+        self.solution = None  # 上一次的解：属性代码 -> 分布值
+
+    def propagate(self, graph, warm_start=True):
+        """对 InMemoryGraph 计算扩散后的风险，返回 DataFrame（code、risk、propagated_risk）及迭代信息"""
+        start = time.perf_counter()
+        transition_t, dangling = transition_matrix(graph.indptr, graph.indices, graph.strength, graph.n_nodes)
+        x0 = None
+        if warm_start and self.solution is not None:
+            # 新增节点以个性化分布为初值，删除的节点直接丢弃
+            x0 = self.solution.reindex(graph.index).to_numpy(dtype=float, copy=True)
+            missing = np.isnan(x0)
+            if missing.all():
+                x0 = None
+            else:
+                total = graph.risk.sum()
+                x0[missing] = graph.risk[missing] / total if total > 0 else 1.0 / graph.n_nodes
+        x, iterations, residual = personalized_pagerank(
+            transition_t, dangling, graph.risk, self.damping, self.tol, self.max_iter, x0,
+        )
+        self.solution = pd.Series(x, index=graph.index)
+        result = pd.DataFrame({
+            "code": graph.codes,
+            "risk": graph.risk,
+            "propagated_risk": x * graph.risk.sum(),
+        })
+        info = {
+            "iterations": iterations,
+            "residual": float(residual),
+            "converged": bool(residual < self.tol),
+            "warm_start": x0 is not None,
+            "seconds": time.perf_counter() - start,
+        }
+        return result, info
@@ -0,0 +1,146 @@
+# src/core/admin_gateway.py
+import argparse
+import importlib
+import time
+from pathlib import Path
+
+from flask import Blueprint, Flask, has_request_context, jsonify, render_template_string, request, url_for
+
+import artifact_store
+from artifact_store import ArtifactStore
+from dataset_registry import DatasetRegistry
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+
+# (蓝图名, 模块, URL 前缀)；量化与保护措施的路由本身带有 /quantify、/protection 前缀
+MODULES = [
+    ("classification", "sync_classification_admin_app", "/classification"),
+    ("grading", "sync_grading_admin_app", "/grading"),
+    ("risk", "sync_risk_analysis_admin_app", "/risk"),
+    ("quantify", "app_routes", ""),
+    ("protection", "protection_mapper", ""),
+]
+
+# 预加载模式下在 fork worker 之前导入的重量级依赖（各模块中为延迟导入）与读入缓存的产物
+PRELOAD_IMPORTS = ("scipy.stats", "pgmpy.estimators", "pgmpy.models")
+PRELOAD_ARTIFACTS = [
+    (BASE_DIR / "classification", "attribute_category_detail.csv"),
+    (BASE_DIR / "grading", "inital_grading.csv"),
+    (BASE_DIR / "grading", "risk_analysis.csv"),
+    (BASE_DIR / "grading", "risk_quantification.csv"),
+    (BASE_DIR / "grading", "protection_measures.csv"),
+]
+
+
+def blueprint_from_app(name, module_app):
+    """将独立运行的 Flask 应用的路由复制为蓝图，原模块仍可单独启动"""
+    bp = Blueprint(name, module_app.import_name)
+    for rule in module_app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        bp.add_url_rule(
+            rule.rule,
+            endpoint=rule.endpoint,
+            view_func=module_app.view_functions[rule.endpoint],
+            methods=sorted(rule.methods - {"HEAD", "OPTIONS"}),
+        )
+    return bp
+
+
+def _resolve_in_blueprint(error, endpoint, values):
+    """模块内的 url_for('grading_management') 在蓝图中解析为 '<蓝图>.grading_management'"""
+    if has_request_context() and request.blueprint and "." not in endpoint:
+        return url_for(f"{request.blueprint}.{endpoint}", **values)
+    raise error
+
+
+def preload(registry):
+    """导入重量级依赖并把当前产物读入缓存，返回各步骤耗时（秒）
+
+    配合 gunicorn --preload 在主进程中执行一次，fork 出的 worker 直接继承，
+    重启后的第一个请求不再承担导入和解析的开销。
+    """
+    timings = {}
+    for name in PRELOAD_IMPORTS:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue  # 未安装的可选依赖留给用到时报错
+        timings[name] = time.perf_counter() - start
+    for root, name in PRELOAD_ARTIFACTS:
+        pinned = ArtifactStore(root).pin()
+        if pinned.exists(name):
+            start = time.perf_counter()
+            pinned.read_csv(name)
+            timings[name] = time.perf_counter() - start
+    return timings
+
+
+def create_app(modules=None, registry=None, preload_data=False):
+    """创建合并后的管理后台：各模块作为蓝图挂载，共享同一份进程内数据集缓存"""
+    registry = registry or DatasetRegistry()
+    artifact_store.use_registry(registry)
+
+    app = Flask(__name__)
+    app.extensions["dataset_registry"] = registry
+    app.url_build_error_handlers.append(_resolve_in_blueprint)
+    mounted = []
+    for name, module_name, prefix in modules or MODULES:
+        module = importlib.import_module(module_name)
+        app.register_blueprint(blueprint_from_app(name, module.app), url_prefix=prefix or None)
+        mounted.append((name, prefix or "/"))
+    if preload_data:
+        app.extensions["preload_timings"] = preload(registry)
+
+    @app.route("/")
+    def gateway_index():
+        return render_template_string(INDEX_HTML, modules=mounted, rules=sorted(
+            (r.rule, r.endpoint) for r in app.url_map.iter_rules()
+            if r.endpoint not in ("static", "gateway_index") and not r.arguments
+        ))
+
+    @app.route("/healthz")
+    def healthz():
+        return jsonify({"status": "ok", "modules": [n for n, _ in mounted], "datasets": registry.stats()})
+
+    return app
+
+
+INDEX_HTML = """
+<!DOCTYPE html>
+<html>
+<head><title>数据出境管理后台</title></head>
+<body>
+    <h1>数据出境管理后台</h1>
+    <p>已挂载模块：{% for name, prefix in modules %}{{ name }}（{{ prefix }}）{% if not loop.last %}、{% endif %}{% endfor %}</p>
+    <ul>
+    {% for rule, endpoint in rules %}
+        <li><a href="{{ rule }}">{{ rule }}</a> — {{ endpoint }}</li>
+    {% endfor %}
+    </ul>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动合并后的管理后台")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--preload", action="store_true", help="启动时预先导入重量级依赖并加载产物")
+    args = parser.parse_args()
+    app = create_app(preload_data=args.preload)
+    try:
+        from waitress import serve
+    except ImportError:
+        # 未安装 waitress 时使用 werkzeug 多线程服务器
+        from werkzeug.serving import run_simple
+        run_simple(args.host, args.port, app, threaded=True)
+    else:
+        serve(app, host=args.host, port=args.port, threads=args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# src/core/admin_store.py
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import ArtifactStore
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+DB_PATH = BASE_DIR / "admin.db"
+
+# 后台维护的表及其兼容导出的 CSV 路径
+TABLES = {
+    "classification_detail": BASE_DIR / "classification" / "attribute_category_detail.csv",
+    "grading": BASE_DIR / "grading" / "inital_grading.csv",
+    "quantification": BASE_DIR / "grading" / "risk_quantification.csv",
+}
+KEY = "attribute_code"
+META_COLUMNS = ("row_version", "updated_at", "updated_by", "source_hash", "adjusted")
+PIPELINE = "pipeline"  # 流水线导入时记录的 updated_by
+
+
+class VersionConflict(Exception):
+    """行版本与期望不一致（其他人已修改该行）"""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__(f"{len(conflicts)} 行已被其他人修改: "
+                         + ", ".join(str(c[KEY]) for c in conflicts[:10]))
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _signature(path):
+    st = Path(path).stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+class AdminStore:
+    """人工调整的记录系统（SQLite）
+
+    每张表以 attribute_code 为主键、category_id 建索引，并附带 row_version 实现乐观并发：
+    修改时必须带上读取到的版本号，版本不一致说明其他人已修改，拒绝写入。
+    流水线生成的 CSV 变化时按主键合并：内容变化的行更新并递增 row_version，人工调整过的行保留调整结果，
+    流水线同时修改（或删除）了这些行时记入 _conflicts 待专家处理。调整完成后可按原 CSV 布局导出。
+    """
+
+    def __init__(self, path=DB_PATH, tables=None):
+        self.path = Path(path)
+        self.tables = dict(tables or TABLES)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _tables (name TEXT PRIMARY KEY, columns TEXT, source_signature TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _conflicts (name TEXT, attribute_code TEXT, pipeline_values TEXT, "
+                "detected_at TEXT, PRIMARY KEY (name, attribute_code))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _check_table(self, table):
+        if table not in self.tables:
+            raise KeyError(f"未知表: {table}")
+
+    def columns(self, table):
+        """表的业务列（原 CSV 列顺序）"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT columns FROM _tables WHERE name = ?", (table,)).fetchone()
+        return json.loads(row["columns"]) if row else None
+
+    # ------------------------- 导入 / 导出 -------------------------
+    def import_frame(self, table, df, signature=None):
+        """按主键把流水线输出合并进表，返回 {"inserted", "updated", "deleted", "conflicts"} 行数
+
+        内容未变化的行保持原版本号；变化的行更新并递增 row_version；新代码追加、消失的代码删除。
+        人工调整过的行（adjusted）不被覆盖：流水线也修改或删除了这些行时记入 _conflicts。
+        """
+        self._check_table(table)
+        if KEY not in df.columns or df[KEY].duplicated().any():
+            raise ValueError(f"{table} 缺少 {KEY} 列或存在重复代码")
+        df = df.reset_index(drop=True)
+        columns = list(df.columns)
+        hashes = pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy().view(np.int64)
+        keys = df[KEY].astype(str).to_numpy(dtype=object)
+        values = df.astype(object).where(df.notna(), None)
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            existing = self._create_or_extend(conn, table, df)
+            current = pd.Index(existing[KEY].to_numpy(dtype=object), dtype=object)
+            current_hash = existing["source_hash"].fillna(0).to_numpy(dtype=np.int64)
+            current_adjusted = existing["adjusted"].fillna(0).to_numpy(dtype=bool)
+            pos = current.get_indexer(keys)
+            found = pos >= 0
+            old_hash, adjusted = np.zeros(len(df), dtype=np.int64), np.zeros(len(df), dtype=bool)
+            old_hash[found], adjusted[found] = current_hash[pos[found]], current_adjusted[pos[found]]
+            changed = found & (old_hash != hashes)
+
+            inserted, updated, conflicted = (np.flatnonzero(~found), np.flatnonzero(changed & ~adjusted),
+                                             np.flatnonzero(changed & adjusted))
+            if len(inserted):
+                names = columns + ["row_version", "updated_at", "updated_by", "source_hash", "adjusted"]
+                conn.executemany(
+                    f"INSERT INTO {_quote(table)} ({', '.join(map(_quote, names))}) "
+                    f"VALUES ({', '.join('?' for _ in names)})",
+                    (row + (1, now, PIPELINE, int(h), 0)
+                     for row, h in zip(values.iloc[inserted].itertuples(index=False, name=None), hashes[inserted])),
+                )
+            if len(updated):
+                assignments = ", ".join(f"{_quote(c)} = ?" for c in columns if c != KEY)
+                data = values.drop(columns=[KEY]).iloc[updated].itertuples(index=False, name=None)
+                conn.executemany(
+                    f"UPDATE {_quote(table)} SET {assignments}, row_version = row_version + 1, updated_at = ?, "
+                    f"updated_by = ?, source_hash = ? WHERE {KEY} = ?",
+                    (row + (now, PIPELINE, int(h), k) for row, h, k in zip(data, hashes[updated], keys[updated])),
+                )
+            # 人工调整过的行保留调整结果，记录流水线的新值
+            conflicts = [(table, keys[i], json.dumps(values.iloc[i].to_dict(), ensure_ascii=False, default=str), now)
+                         for i in conflicted]
+            conn.executemany(f"UPDATE {_quote(table)} SET source_hash = ? WHERE {KEY} = ?",
+                             ((int(hashes[i]), keys[i]) for i in conflicted))
+
+            # 流水线删除的行：未调整的直接删除，调整过的保留并记为冲突
+            gone = ~current.isin(keys)
+            removed = current[gone & ~current_adjusted].tolist()
+            conflicts += [(table, code, None, now) for code in current[gone & current_adjusted]]
+            conn.executemany(f"DELETE FROM {_quote(table)} WHERE {KEY} = ?", ((k,) for k in removed))
+            conn.executemany("INSERT OR REPLACE INTO _conflicts (name, attribute_code, pipeline_values, detected_at) "
+                             "VALUES (?, ?, ?, ?)", conflicts)
+            conn.execute(
+                "INSERT OR REPLACE INTO _tables (name, columns, source_signature) VALUES (?, ?, ?)",
+                (table, json.dumps(columns, ensure_ascii=False), json.dumps(signature)),
+            )
+        return {"inserted": len(inserted), "updated": len(updated), "deleted": len(removed),
+                "conflicts": len(conflicts)}
+
+    def _create_or_extend(self, conn, table, df):
+        """建表（或为已有表补充新列），返回已有行的主键、来源哈希和调整标记"""
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if not exists:
+            definitions = [f"{_quote(c)} {'TEXT PRIMARY KEY' if c == KEY else _sql_type(df[c].dtype)}"
+                           for c in df.columns]
+            definitions += ["row_version INTEGER NOT NULL DEFAULT 1", "updated_at TEXT", "updated_by TEXT",
+                            "source_hash INTEGER", "adjusted INTEGER NOT NULL DEFAULT 0"]
+            conn.execute(f"CREATE TABLE {_quote(table)} ({', '.join(definitions)})")
+            if "category_id" in df.columns:
+                conn.execute(f"CREATE INDEX {_quote(f'idx_{table}_category')} ON {_quote(table)} (category_id)")
+        else:
+            present = {row["name"] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+            for c in df.columns:
+                if c not in present:
+                    conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(c)} {_sql_type(df[c].dtype)}")
+            for c, definition in (("source_hash", "INTEGER"), ("adjusted", "INTEGER NOT NULL DEFAULT 0")):
+                if c not in present:  # 旧版本建的表
+                    conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {c} {definition}")
+        return pd.read_sql_query(f"SELECT {KEY}, source_hash, adjusted FROM {_quote(table)}", conn,
+                                 dtype={KEY: object})
+
+    def sync_from_csv(self, table):
+        """流水线输出的 CSV 有更新（或表尚未导入）时按主键合并，返回是否导入"""
+        self._check_table(table)
+        path = self.tables[table]
+        if not path.exists():
+            return False
+        signature = _signature(path)
+        with self._connect() as conn:
+            row = conn.execute("SELECT source_signature FROM _tables WHERE name = ?", (table,)).fetchone()
+        if row and json.loads(row["source_signature"]) == signature:
+            return False
+        self.import_frame(table, pd.read_csv(path, dtype={KEY: str}), signature)
+        return True
+
+    def export_csv(self, table, path=None, chunk_size=100_000):
+        """按原 CSV 布局导出（不含版本列），默认写回流水线使用的 CSV"""
+        self._check_table(table)
+        target = Path(path) if path else self.tables[table]
+        columns = self.columns(table)
+        sql = f"SELECT {', '.join(map(_quote, columns))} FROM {_quote(table)} ORDER BY rowid"
+        with self._connect() as conn, ArtifactStore(target.parent).open_for_publish(target.name) as f:
+            for i, chunk in enumerate(pd.read_sql_query(sql, conn, chunksize=chunk_size)):
+                f.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+        if path is None:
+            # 导出的内容与库一致，不需要再次导入
+            with self._connect() as conn:
+                conn.execute("UPDATE _tables SET source_signature = ? WHERE name = ?",
+                             (json.dumps(_signature(target)), table))
+        return target
+
+    # ------------------------- 查询 -------------------------
+    def get(self, table, code):
+        self._check_table(table)
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT * FROM {_quote(table)} WHERE {KEY} = ?", (str(code),)).fetchone()
+        if row is None:
+            raise KeyError(f"未知属性: {code}")
+        return dict(row)
+
+    def query(self, table, category_id=None, limit=100, offset=0):
+        """按类别分页查询（走 category_id 索引），返回 DataFrame"""
+        self._check_table(table)
+        where, params = "", []
+        if category_id is not None:
+            where, params = "WHERE category_id = ?", [category_id]
+        sql = f"SELECT * FROM {_quote(table)} {where} ORDER BY rowid LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params + [int(limit), int(offset)])
+
+    def conflicts(self, table):
+        """流水线与人工调整冲突的行：当前（人工调整后的）值与流水线的新值（None 表示流水线已删除该行）"""
+        self._check_table(table)
+        with self._connect() as conn:
+            rows = conn.execute("SELECT attribute_code, pipeline_values, detected_at FROM _conflicts "
+                                "WHERE name = ? ORDER BY detected_at", (table,)).fetchall()
+        return [{KEY: row[KEY], "pipeline": json.loads(row["pipeline_values"]) if row["pipeline_values"] else None,
+                 "detected_at": row["detected_at"]} for row in rows]
+
+    def resolve_conflict(self, table, code, expected_version, accept_pipeline, changed_by="expert"):
+        """处理冲突：accept_pipeline 为真时改用流水线的值（已删除的行随之删除），否则保留人工调整"""
+        self._check_table(table)
+        with self._connect() as conn:
+            row = conn.execute("SELECT pipeline_values FROM _conflicts WHERE name = ? AND attribute_code = ?",
+                               (table, str(code))).fetchone()
+            if row is None:
+                raise KeyError(f"无冲突记录: {code}")
+            if accept_pipeline and row["pipeline_values"] is None:
+                if conn.execute(f"DELETE FROM {_quote(table)} WHERE {KEY} = ? AND row_version = ?",
+                                (str(code), int(expected_version))).rowcount == 0:
+                    raise VersionConflict([{KEY: code, "expected": expected_version, "current": None}])
+            else:
+                changes = {}
+                if accept_pipeline:
+                    changes = {k: v for k, v in json.loads(row["pipeline_values"]).items() if k != KEY}
+                conflicts = self._update_rows(conn, table, [{KEY: code, "changes": changes,
+                                                             "row_version": expected_version}],
+                                              changed_by, adjusted=not accept_pipeline)
+                if conflicts:
+                    raise VersionConflict(conflicts)
+            conn.execute("DELETE FROM _conflicts WHERE name = ? AND attribute_code = ?", (table, str(code)))
+
+    # ------------------------- 调整 -------------------------
+    def _update_rows(self, conn, table, updates, changed_by, adjusted=True):
+        """在同一事务内逐行按版本号更新，返回冲突行；每行都必须带 row_version"""
+        row = conn.execute("SELECT columns FROM _tables WHERE name = ?", (table,)).fetchone()
+        if row is None:
+            raise KeyError(f"表尚未导入: {table}")
+        allowed = set(json.loads(row["columns"])) - {KEY}
+        now = datetime.now().isoformat()
+        conflicts = []
+        for update in updates:
+            changes = {k: v for k, v in update["changes"].items() if k in allowed}
+            unknown = set(update["changes"]) - allowed
+            if unknown:
+                raise ValueError(f"不可修改的列: {sorted(unknown)}")
+            if update.get("row_version") is None:
+                raise ValueError(f"{update[KEY]} 缺少 row_version")
+            assignments = ", ".join(f"{_quote(c)} = ?" for c in changes)
+            sql = (f"UPDATE {_quote(table)} SET {assignments + ', ' if assignments else ''}"
+                   f"row_version = row_version + 1, updated_at = ?, updated_by = ?, adjusted = ? "
+                   f"WHERE {KEY} = ? AND row_version = ?")
+            params = list(changes.values()) + [now, changed_by, int(adjusted), str(update[KEY]),
+                                               int(update["row_version"])]
+            if conn.execute(sql, params).rowcount == 0:
+                current = conn.execute(f"SELECT row_version FROM {_quote(table)} WHERE {KEY} = ?",
+                                       (str(update[KEY]),)).fetchone()
+                conflicts.append({KEY: update[KEY], "expected": update.get("row_version"),
+                                  "current": current["row_version"] if current else None})
+        return conflicts
+
+    def update(self, table, code, changes, expected_version, changed_by="expert"):
+        """单行调整；expected_version 必填，版本不一致时抛出 VersionConflict，成功返回新的行内容"""
+        self._check_table(table)
+        with self._connect() as conn:
+            conflicts = self._update_rows(
+                conn, table, [{KEY: code, "changes": changes, "row_version": expected_version}], changed_by)
+            if conflicts:
+                raise VersionConflict(conflicts)  # 退出事务时回滚
+        return self.get(table, code)
+
+    def bulk_update(self, table, df, changed_by="expert"):
+        """批量调整：df 含 attribute_code、row_version 及要修改的列；缺少版本号或任一行冲突则整批回滚"""
+        self._check_table(table)
+        if "row_version" not in df.columns or df["row_version"].isna().any():
+            raise ValueError("批量修改的每一行都必须带 row_version")
+        value_columns = [c for c in df.columns if c not in (KEY,) + META_COLUMNS]
+        updates = []
+        for record in df.astype(object).where(df.notna(), None).to_dict("records"):
+            updates.append({
+                KEY: record[KEY],
+                "changes": {c: record[c] for c in value_columns},
+                "row_version": record["row_version"],
+            })
+        with self._connect() as conn:
+            conflicts = self._update_rows(conn, table, updates, changed_by)
+            if conflicts:
+                raise VersionConflict(conflicts)  # 任一行冲突，整批回滚
+        return len(updates)
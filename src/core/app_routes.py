@@ -1,11 +1,14 @@
-from flask import Flask, render_template_string, redirect, url_for
+from flask import Flask, render_template_string, redirect, url_for, request, Response
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import os
 import yaml
-from scipy.stats import entropy
 import traceback
+from serialization import negotiate, encode_frame, UnsupportedFormat, CSV
+from artifact_store import ArtifactStore
+from entropy_calculation import entropy_weights
+from dynamic_adjustments import composite_scores, quantify_indicators, relation_noise, relation_strength
 
 # 初始化Flask应用
 app = Flask(__name__)
@@ -24,9 +27,10 @@ class EntropyEnhancer:
     
     def enhance_entropy(self, risk_df):
         """多源熵计算（H_base基于原始数据，H_ext基于扩展系数）"""
+        from scipy.stats import entropy  # 延迟导入：只有量化计算时才加载 scipy
         try:
-            # 加载扩展数据
-            ext_df = pd.read_csv(self.ext_cross_path)
+            # 加载扩展数据（按属性去重，左连接后行与 risk_df 一一对应）
+            ext_df = pd.read_csv(self.ext_cross_path).drop_duplicates('attribute_code')
             merged = risk_df.merge(ext_df, on="attribute_code", how="left")
             
             # 计算原始熵 H_base
@@ -46,7 +50,8 @@ class EntropyEnhancer:
                 lambda x: (x - x.min()) / (x.max() - x.min() + 1e-8)
             )
             
-            risk_df = merged[['attribute_code', 'attribute_chinese', 'sensitivity_level', 'category_id', 'H']]
+            # 只替换 H，保留 P_risk、R 等后续标准化需要的列
+            risk_df['H'] = merged['H'].to_numpy()
         
         except Exception as e:
             print(f"多源熵计算失败: {str(e)}")
@@ -60,6 +65,7 @@ class EntropyEnhancer:
 
     def _calculate_base_entropy(self, df):
         """基于原始敏感级别计算条件熵"""
+        from scipy.stats import entropy
         grouped = df.groupby('category_id')['sensitivity_level'].value_counts(normalize=True)
         return grouped.groupby(level=0).apply(
             lambda x: entropy(x.values, base=2)
@@ -68,45 +74,15 @@ class EntropyEnhancer:
 class RiskCalculator:
     @staticmethod
     def calculate_relation_strength(risk_df):
-        """动态关联强度计算（解决R全0问题）"""
-        min_p = risk_df['P_risk'].min()
-        max_p = risk_df['P_risk'].max()
-        range_p = max_p - min_p if (max_p - min_p) != 0 else 1e-8
-        risk_df['R'] = (risk_df['P_risk'] - min_p) / range_p
-        
-        # 添加类别差异扰动
-        category_effect = risk_df.groupby('category_id')['P_risk'].transform(
-            lambda x: np.mean(x) / risk_df['P_risk'].mean()
-        )
-        risk_df['R'] *= category_effect
-        
-        # 添加随机扰动（论文公式3.5允许的误差范围）
-        np.random.seed(42)
-        risk_df['R'] += np.random.uniform(-0.1, 0.1, len(risk_df))
-        risk_df['R'] = risk_df['R'].clip(lower=0.01, upper=1.0)
+        """动态关联强度计算（解决R全0问题），与参数调整（param_dependencies）共用 relation_strength"""
+        risk_df['R'] = relation_strength(risk_df['P_risk'], risk_df['category_id'], relation_noise(len(risk_df)))
         return risk_df
 
 class WeightCalculator:
     @staticmethod
     def calculate_weights(normalized_data):
-        """修正权重计算（解决负数问题）"""
-        X = normalized_data[['v1', 'v2', 'v3']].values
-        min_vals = X.min(axis=0)
-        max_vals = X.max(axis=0)
-        ranges = max_vals - min_vals
-        ranges[ranges == 0] = 1e-8
-        p_ij = (X - min_vals) / ranges
-        
-        epsilon = 1e-8
-        p_ij = np.clip(p_ij, epsilon, 1)
-        p_ij = p_ij / p_ij.sum(axis=0, keepdims=True)
-        E = -np.sum(p_ij * np.log(p_ij), axis=0) / np.log(len(p_ij))
-        E = np.clip(E, 0, 0.95)
-        
-        weights = (1 - E) / (1 - E).sum()
-        weights = np.clip(weights, 0.1, None)
-        weights /= weights.sum()
-        return weights
+        """修正权重计算（解决负数问题），与在线评分共用 entropy_calculation.entropy_weights"""
+        return entropy_weights(normalized_data[['v1', 'v2', 'v3']].values)
 
 # ------------------------- 核心逻辑 -------------------------
 def load_risk_params():
@@ -129,7 +105,8 @@ def quantify_risk():
     """执行量化计算"""
     try:
         # 加载数据
-        risk_df = pd.read_csv(GRADING_DIR / "risk_analysis.csv")
+        artifacts = ArtifactStore(GRADING_DIR)
+        risk_df = artifacts.pin().read_csv("risk_analysis.csv")
         params = load_risk_params()
         
         # 计算动态指标
@@ -137,29 +114,20 @@ def quantify_risk():
         risk_df = EntropyEnhancer(BASE_DIR).enhance_entropy(risk_df)
         
         # 标准化指标
-        risk_df['v1'] = risk_df['R']
-        risk_df['v2'] = risk_df['P_risk'] / risk_df['P_risk'].max()
-        risk_df['v3'] = 1 - risk_df['H']
+        risk_df[['v1', 'v2', 'v3']] = quantify_indicators(risk_df['R'], risk_df['P_risk'], risk_df['H'])
         
         # 计算权重
         weights = WeightCalculator.calculate_weights(risk_df)
         
-        # 综合评分
-        risk_df['L'] = (risk_df[['v1', 'v2', 'v3']] * weights).sum(axis=1)
-        
-        # ------------------------- 新增：强制敏感级别排序 -------------------------
-        sensitivity_bonus = {
-            'RT01': 0.3,
-            'RT02': 0.15,
-            'RT03': 0.0
-        }
-        risk_df['L_rank'] = risk_df['sensitivity_level'].map(sensitivity_bonus)
-        risk_df['L'] += risk_df['L_rank']
+        # 综合评分（含强制敏感级别排序的加分，与参数调整、在线评分共用 composite_scores）
+        risk_df['L'] = composite_scores(risk_df[['v1', 'v2', 'v3']], weights, risk_df['sensitivity_level'])
         risk_df.sort_values(['sensitivity_level', 'L'], ascending=[True, False], inplace=True)
-        risk_df.drop('L_rank', axis=1, inplace=True)
-        # ------------------------- 修正结束 -------------------------
         
-        risk_df.to_csv(GRADING_DIR / "risk_quantification.csv", index=False)
+        # 量化结果与熵权（供在线评分快照加载）一起发布，固定版本读取时总是配套的
+        artifacts.publish_all({
+            "risk_quantification.csv": risk_df,
+            "risk_weights.json": {"weights": weights.tolist()},
+        })
         
         return render_template_string(QUANT_TEMPLATE, 
                                    data=risk_df.to_dict('records'),
@@ -169,6 +137,19 @@ def quantify_risk():
         traceback.print_exc()
         return f"量化失败: {str(e)}", 500
 
+@app.route('/quantify/export')
+def export_quantification():
+    """导出量化结果（按 Accept 头返回 CSV / JSON / Arrow / MessagePack）"""
+    try:
+        media_type = negotiate(request.headers.get('Accept'), default=CSV)
+    except UnsupportedFormat as e:
+        return str(e), 406
+    try:
+        risk_df = ArtifactStore(GRADING_DIR).pin().read_csv("risk_quantification.csv")
+    except FileNotFoundError:
+        return "暂无量化结果", 404
+    return Response(encode_frame(risk_df, media_type), mimetype=media_type)
+
 # ------------------------- 前端模板 -------------------------
 QUANT_TEMPLATE = """
 <!DOCTYPE html>
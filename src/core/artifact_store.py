@@ -0,0 +1,279 @@
+# src/core/artifact_store.py
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 flock，退化为仅依赖原子替换
+    fcntl = None
+
+META_DIR = ".artifacts"
+KEEP_VERSIONS = 3
+
+# 进程内共享的数据集缓存（DatasetRegistry），由管理网关启用；为 None 时每次都读盘
+_registry = None
+
+
+def use_registry(registry):
+    """启用（或传入 None 关闭）进程内数据集缓存"""
+    global _registry
+    _registry = registry
+
+
+def _fsync_dir(path):
+    """重命名后同步目录项，保证掉电后新文件名可见（Windows 不支持，忽略）"""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ArtifactStore:
+    """流水线产物的原子发布与版本固定读取
+
+    每次发布先写入同目录下的临时文件并 fsync，再硬链接为不可变的版本文件
+    .artifacts/<name>.v<N>，最后原子替换原路径并更新清单 .artifacts/manifest.json。
+    原路径始终是完整的最新版本，旧代码直接读取也不会读到写了一半的文件；
+    多个产物需要一致读取时用 pin() 固定清单中的版本号。
+    写入方通过 .artifacts/.lock 上的 flock 串行化，保留最近 keep 个版本供已固定的读取方使用。
+    """
+
+    def __init__(self, root, keep=KEEP_VERSIONS):
+        self.root = Path(root)
+        self.meta_dir = self.root / META_DIR
+        self.manifest_path = self.meta_dir / "manifest.json"
+        self.keep = keep
+
+    @contextmanager
+    def _lock(self):
+        self.meta_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.meta_dir / ".lock", "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    # ------------------------- 发布 -------------------------
+    def _tmp_path(self, name):
+        return self.root / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _write_tmp(self, tmp, payload):
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextmanager
+    def open_for_publish(self, name):
+        """以二进制文件对象写入新版本，正常退出时原子发布，异常时丢弃"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(name)
+        try:
+            with open(tmp, "wb") as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            self._commit([(name, tmp)])
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    def publish(self, name, data):
+        """发布 DataFrame（CSV）、字典（JSON）或已序列化的字节，返回版本信息"""
+        return self.publish_all({name: data})[name]
+
+    def publish_all(self, artifacts):
+        """在同一次清单更新中发布多个产物，固定版本的读取方要么全部看到新版本，要么全部看到旧版本"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staged = []
+        try:
+            for name, data in artifacts.items():
+                tmp = self._tmp_path(name)
+                staged.append((name, tmp))
+                self._write_tmp(tmp, _encode(data))
+            manifest = self._commit(staged)
+        finally:
+            for _, tmp in staged:
+                if tmp.exists():
+                    tmp.unlink()
+        if _registry is not None:
+            # 下一阶段在同一进程内读取时直接使用发布的结果，无需重新解析
+            for name, data in artifacts.items():
+                if isinstance(data, pd.DataFrame):
+                    _registry.put(self.root / name, ("v", manifest[name]["version"]), data)
+        return {name: manifest[name] for name in artifacts}
+
+    def _commit(self, staged):
+        """持锁安装各临时文件并写入清单，返回本次写入的清单（不再在锁外重新读取，避免读到之后的发布）"""
+        with self._lock():
+            manifest = self.manifest()
+            for name, tmp in staged:
+                manifest[name] = self._install(name, tmp, manifest.get(name, {}))
+            manifest_tmp = self.manifest_path.with_suffix(".tmp")
+            with open(manifest_tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(manifest_tmp, self.manifest_path)
+            _fsync_dir(self.meta_dir)
+        return manifest
+
+    def _install(self, name, tmp, entry):
+        """临时文件转为版本文件并替换原路径，返回新的清单条目（调用方持有锁）"""
+        with open(tmp, "rb") as f:
+            sha = hashlib.sha256(f.read()).hexdigest()
+        version = entry.get("version", 0) + 1
+        versioned = self.meta_dir / f"{name}.v{version}"
+        if versioned.exists():  # 上次发布中途退出遗留的文件
+            versioned.unlink()
+        try:
+            os.link(tmp, versioned)  # 与原路径共享同一份数据，不重复写入
+        except OSError:
+            with open(tmp, "rb") as src, open(versioned, "wb") as dst:
+                dst.write(src.read())
+        os.replace(tmp, self.root / name)
+        _fsync_dir(self.root)
+        history = entry.get("history", []) + [version]
+        for old in history[:-self.keep]:
+            try:
+                (self.meta_dir / f"{name}.v{old}").unlink()
+            except FileNotFoundError:
+                pass
+        return {
+            "version": version,
+            "sha": sha,
+            "published_at": datetime.now().isoformat(),
+            "history": history[-self.keep:],
+        }
+
+    # ------------------------- 读取 -------------------------
+    def pin(self):
+        """固定当前清单中各产物的版本，之后的读取不受并发发布影响"""
+        return PinnedArtifacts(self, self.manifest())
+
+    def read_pinned(self, reader, attempts=3):
+        """以固定版本调用 reader(pinned)；固定的版本在读取期间被清理时重新固定后重试"""
+        for attempt in range(attempts):
+            try:
+                return reader(self.pin())
+            except PinExpired:
+                if attempt == attempts - 1:
+                    raise
+
+
+class PinExpired(FileNotFoundError):
+    """固定的版本文件已被清理（之后又发布了超过 keep 个版本），需要重新 pin()"""
+
+    def __init__(self, name, version):
+        self.name = name
+        self.version = version
+        super().__init__(f"{name} 的固定版本 v{version} 已被清理，请重新固定版本")
+
+
+class PinnedArtifacts:
+    """某一时刻的产物版本集合"""
+
+    def __init__(self, store, manifest):
+        self.store = store
+        self.versions = {name: entry["version"] for name, entry in manifest.items()}
+
+    def path(self, name):
+        """固定版本的文件路径（不检查是否存在）；未经发布器写入的产物为原路径"""
+        version = self.versions.get(name)
+        if version is None:
+            return self.store.root / name
+        return self.store.meta_dir / f"{name}.v{version}"
+
+    def open(self, name):
+        """以二进制方式打开固定版本的文件
+
+        直接打开而不预先检查，打开后即使版本文件被清理也能读完；
+        清单中有版本号但版本文件已被清理时抛出 PinExpired，不退回原路径（原路径可能已是更新的版本）。
+        """
+        try:
+            return open(self.path(name), "rb")
+        except FileNotFoundError:
+            if name in self.versions:
+                raise PinExpired(name, self.versions[name]) from None
+            raise
+
+    def exists(self, name):
+        """产物是否已发布（清单中有版本号）或原路径存在"""
+        return name in self.versions or (self.store.root / name).exists()
+
+    def read_bytes(self, name):
+        with self.open(name) as f:
+            return f.read()
+
+    def read_csv(self, name, **kwargs):
+        registry = _registry
+        if registry is not None and name in self.versions:
+            df = registry.get(self.store.root / name, ("v", self.versions[name]), kwargs)
+            if df is not None:
+                return df
+        # 版本文件只会被整体替换或删除，打开后读到的内容始终完整
+        with self.open(name) as f:
+            if registry is None:
+                return pd.read_csv(f, **kwargs)
+            if name in self.versions:
+                version = "v", self.versions[name]
+            else:
+                st = os.fstat(f.fileno())  # 未经发布器写入的文件以大小和修改时间区分版本
+                version = "file", st.st_size, st.st_mtime_ns
+                df = registry.get(self.store.root / name, version, kwargs)
+                if df is not None:
+                    return df
+            df = pd.read_csv(f, **kwargs)
+            registry.put(self.store.root / name, version, df, kwargs)
+            return df
+
+    def read_json(self, name):
+        return json.loads(self.read_bytes(name))
+
+
+def _encode(data):
+    if isinstance(data, pd.DataFrame):
+        return data.to_csv(index=False).encode("utf-8")
+    if isinstance(data, dict):
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+    return data
+
+
+def publish_csv(path, df):
+    """将 DataFrame 原子发布到 path（替代 df.to_csv(path, index=False)）"""
+    path = Path(path)
+    return ArtifactStore(path.parent).publish(path.name, df)
+
+
+def publish_bytes(path, payload):
+    path = Path(path)
+    return ArtifactStore(path.parent).publish(path.name, payload)
+
+
+def read_csv(path, **kwargs):
+    """读取 path 最新发布的完整版本"""
+    path = Path(path)
+    return ArtifactStore(path.parent).read_pinned(lambda pinned: pinned.read_csv(path.name, **kwargs))
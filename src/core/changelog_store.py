@@ -0,0 +1,163 @@
+# src/core/changelog_store.py
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    changed_by TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_action_type ON events (action_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_changed_by ON events (changed_by, timestamp);
+"""
+
+BASE_FIELDS = ("timestamp", "action_type", "changed_by")
+
+
+class ChangeLog:
+    """只追加的变更日志（SQLite WAL）
+
+    写入先进入内存缓冲，累计 batch_size 条时立即在一个事务内批量提交；
+    不足一批时由后台定时器在 flush_interval 秒内落盘（空闲的长期进程中最后几条事件
+    也会及时对其他进程可见）；进程退出时自动落盘。时间戳、操作类型、操作人均有索引，
+    管理后台可按时间范围和条件分页查询，无需读取整个日志。
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=1.0, legacy_csv=None):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._timer = None
+        is_new = not self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if is_new and legacy_csv and Path(legacy_csv).exists():
+            self.import_csv(legacy_csv)
+        atexit.register(self.flush)
+
+    def append(self, action_type, changed_by="system", timestamp=None, **details):
+        """记录一条事件（缓冲写入）"""
+        row = (
+            timestamp or pd.Timestamp.now().isoformat(),
+            action_type,
+            changed_by,
+            json.dumps(details, ensure_ascii=False, default=str) if details else None,
+        )
+        with self._lock:
+            self._buffer.append(row)
+            due = (len(self._buffer) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+            if not due and self._timer is None:
+                # 缓冲中第一条事件启动定时落盘，之后的事件随同一次提交写入
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """将缓冲区中的事件在一个事务内写入"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return 0
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO events (timestamp, action_type, changed_by, details) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def query(self, start=None, end=None, action_type=None, changed_by=None, limit=100, offset=0):
+        """按时间范围 [start, end) 及操作类型、操作人查询，按时间倒序返回"""
+        self.flush()
+        clauses, params = [], []
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(str(start))
+        if end:
+            clauses.append("timestamp < ?")
+            params.append(str(end))
+        if action_type:
+            clauses.append("action_type = ?")
+            params.append(action_type)
+        if changed_by:
+            clauses.append("changed_by = ?")
+            params.append(changed_by)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT timestamp, action_type, changed_by, details FROM events {where} "
+               f"ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            cursor = self._conn.execute(sql, params + [int(limit), int(offset)])
+            rows = cursor.fetchall()
+        events = []
+        for timestamp, action, actor, details in rows:
+            event = {"timestamp": timestamp, "action_type": action, "changed_by": actor}
+            event.update(json.loads(details) if details else {})
+            events.append(event)
+        return events
+
+    def count(self, action_type=None):
+        self.flush()
+        with self._lock:
+            if action_type:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM events WHERE action_type = ?", (action_type,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def import_csv(self, csv_path):
+        """导入旧版 changelog.csv（action 列视为 action_type，其余列存入 details）"""
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        df = df.rename(columns={"action": "action_type"})
+        extra = [c for c in df.columns if c not in BASE_FIELDS]
+        rows = []
+        for r in df.to_dict("records"):
+            details = {c: r[c] for c in extra if r[c]}
+            rows.append((
+                r.get("timestamp") or pd.Timestamp.now().isoformat(),
+                r.get("action_type") or "unknown",
+                r.get("changed_by") or None,
+                json.dumps(details, ensure_ascii=False) if details else None,
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO events (timestamp, action_type, changed_by, details) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+        self._conn.close()
+
+
+_LOGS = {}
+
+
+def get_changelog(path, **kwargs):
+    """同一进程内共享同一日志实例，使缓冲区能跨调用合并提交"""
+    path = Path(path).resolve()
+    if path not in _LOGS:
+        _LOGS[path] = ChangeLog(path, **kwargs)
+    return _LOGS[path]
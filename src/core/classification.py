@@ -1,7 +1,27 @@
 # src/core/classification.py
+import numpy as np
+
 def process_request(data: dict) -> str:
     # 示例逻辑：根据数据返回分类结果
     if "risk_factor" in data and data["risk_factor"] > 0.5:
         return "High Risk"
     else:
         return "Low Risk"
+
+def _risk_value(record):
+    # 与 process_request 一致：缺失视为低风险，非数值的 risk_factor 是该请求自身的错误
+    value = record.get("risk_factor", np.nan)
+    if isinstance(value, (str, bytes)) or not isinstance(value, (int, float, np.number)):
+        return None
+    return float(value)
+
+def process_batch(records: list) -> list:
+    # 向量化版本：一次处理多条请求，结果与 process_request 逐条一致
+    # 非法记录在对应位置返回 TypeError 实例，只让该请求失败，不影响同批其他请求
+    values = [_risk_value(r) for r in records]
+    risk = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    results = np.where(risk > 0.5, "High Risk", "Low Risk").tolist()
+    for i, v in enumerate(values):
+        if v is None:
+            results[i] = TypeError(f"risk_factor 必须是数值: {records[i].get('risk_factor')!r}")
+    return results
@@ -0,0 +1,80 @@
+# src/core/dataset_registry.py
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class DatasetRegistry:
+    """进程内共享的数据集缓存，按 (文件路径, 发布版本) 索引
+
+    同一进程中的各管理模块通过 artifact_store 读取产物时先查这里：版本未变直接复用
+    已解析的 DataFrame，某一阶段发布新版本时把结果直接放入缓存，下一阶段无需再读盘解析。
+    每个文件只保留最新版本。
+
+    get 返回与缓存共享数据的只读视图（不复制），调用方需要修改时先 .copy()：
+    写时复制（pandas >= 3 或开启 mode.copy_on_write）下就地修改只作用于调用方自己的视图；
+    否则缓存的底层数组被设为只读，就地写入直接报错，而不会悄悄改动其他模块看到的数据。
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path, options=None):
+        return str(Path(path).resolve()), repr(sorted((options or {}).items()))
+
+    def get(self, path, version, options=None):
+        """版本一致时返回缓存数据的只读视图，否则返回 None"""
+        with self._lock:
+            entry = self._frames.get(self._key(path, options))
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1].copy(deep=False)
+
+    def put(self, path, version, df, options=None):
+        path_key, option_key = self._key(path, options)
+        with self._lock:
+            # 新版本替换该文件所有读取选项下的旧版本
+            for key in [k for k, v in self._frames.items() if k[0] == path_key and v[0] != version]:
+                del self._frames[key]
+            self._frames[(path_key, option_key)] = (version, _frozen(df))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "datasets": len(self._frames),
+                "bytes": int(sum(df.memory_usage(deep=True).sum() for _, df in self._frames.values())),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+def _copy_on_write():
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except (KeyError, AttributeError):  # pandas < 2.0 没有该选项
+        return False
+
+
+def _frozen(df):
+    """放入缓存的 DataFrame：写时复制下只需浅拷贝；否则复制一次并把底层数组设为只读"""
+    if _copy_on_write():
+        return df.copy(deep=False)
+    df = df.copy()
+    for block in df._mgr.blocks:
+        if isinstance(block.values, np.ndarray):
+            block.values.flags.writeable = False
+    return df
@@ -1,6 +1,41 @@
 import pandas as pd
 import numpy as np
 
+# 敏感级别加分（app_routes.quantify_risk 强制敏感级别排序），量化、调参与在线评分共用
+SENSITIVITY_BONUS = {'RT01': 0.3, 'RT02': 0.15, 'RT03': 0.0}
+RELATION_NOISE_SEED = 42
+
+
+def relation_noise(n):
+    """公式3.5 允许的随机扰动，与 np.random.seed(42) 后的 uniform(-0.1, 0.1, n) 相同"""
+    return np.random.RandomState(RELATION_NOISE_SEED).uniform(-0.1, 0.1, n)
+
+
+def relation_strength(p_risk, categories, noise):
+    """动态关联强度（解决R全0问题）：全局极差标准化 × 类别均值比 + 扰动，截断到 [0.01, 1]"""
+    p = np.asarray(p_risk, dtype=float)
+    lo, hi = p.min(), p.max()
+    span = hi - lo if (hi - lo) != 0 else 1e-8
+    labels, _ = pd.factorize(pd.Series(categories))
+    known = labels >= 0
+    means = np.bincount(labels[known], weights=p[known]) / np.bincount(labels[known])
+    effect = np.full(len(p), np.nan)  # 类别缺失的行与 groupby 一样得到 NaN
+    effect[known] = means[labels[known]] / p.mean()
+    return np.clip((p - lo) / span * effect + noise, 0.01, 1.0)
+
+
+def quantify_indicators(R, P, H):
+    """标准化指标：v1 = R，v2 = P / P_max，v3 = 1 - H"""
+    P = np.asarray(P, dtype=float)
+    return np.column_stack([np.asarray(R, dtype=float), P / P.max(), 1 - np.asarray(H, dtype=float)])
+
+
+def composite_scores(V, weights, levels):
+    """综合评分 L = v·w + 敏感级别加分（未知级别为 NaN，与量化结果一致）"""
+    bonus = pd.Series(np.asarray(levels, dtype=object)).map(SENSITIVITY_BONUS).to_numpy(dtype=float)
+    return np.asarray(V, dtype=float) @ np.asarray(weights, dtype=float) + bonus
+
+
 class RiskAdjuster:
     @staticmethod
     def adjust_relation_strength(risk_df, params):
@@ -10,7 +45,7 @@ class RiskAdjuster:
         
         risk_df['R_dynamic'] = risk_df.apply(
             lambda row: max(
-                row['R'] * (1 + jurisdiction_weights.get(row['category_id'], default_weight),
+                row['R'] * (1 + jurisdiction_weights.get(row['category_id'], default_weight)),
                 params.get('min_R', 0.05)
             ),
             axis=1
@@ -1,6 +1,6 @@
 from pathlib import Path
 import pandas as pd
-from scipy.stats import entropy
+import numpy as np
 
 class EntropyEnhancer:
     def __init__(self, data_dir):
@@ -32,5 +32,27 @@ class EntropyEnhancer:
         return risk_df
     
     def _calculate_entropy(self, df):
+        from scipy.stats import entropy  # 延迟导入：只有计算条件熵时才加载 scipy
         grouped = df.groupby('category_id')['combined_sensitivity'].value_counts(normalize=True)
         return grouped.groupby(level=0).apply(lambda x: entropy(x.values, base=2)).to_dict()
+
+
+def entropy_weights(X):
+    """熵权法计算指标权重（X 为 n×k 指标矩阵），权重下限 0.1 并重新归一化"""
+    X = np.asarray(X, dtype=np.float64)
+    min_vals, max_vals = X.min(axis=0), X.max(axis=0)
+    ranges = max_vals - min_vals
+    ranges[ranges == 0] = 1e-8
+    p_ij = np.clip((X - min_vals) / ranges, 1e-8, 1)
+    return entropy_weights_from_sums(p_ij.sum(axis=0), np.sum(p_ij * np.log(p_ij), axis=0), len(p_ij))
+
+
+def entropy_weights_from_sums(sum_p, sum_plogp, n):
+    """由各列的 Σp 与 Σp·ln(p) 得到熵权（p 为截断后的极差标准化值），供增量维护这两个和的调用方复用
+
+    按列归一化 q = p / Σp 后 Σq·ln(q) = Σp·ln(p) / Σp − ln(Σp)。
+    """
+    sum_p = np.asarray(sum_p, dtype=np.float64)
+    E = np.clip(-(np.asarray(sum_plogp, dtype=np.float64) / sum_p - np.log(sum_p)) / np.log(n), 0, 0.95)
+    weights = np.clip((1 - E) / (1 - E).sum(), 0.1, None)
+    return weights / weights.sum()
@@ -0,0 +1,227 @@
+# src/core/generate_synthetic_data.py
+"""按真实数据结构生成可复现的大规模模拟数据（用于压测和容量规划）
+
+输出目录结构与 data/ 保持一致：
+    original_data/cross_attributes.csv
+    original_data/cross_attributes_extended.csv
+    classification/config/mapping_rules.yaml
+    grading/inital_grading.csv
+    grading/config/risk_parameters.yaml
+
+运行方式：python src/core/generate_synthetic_data.py --rows 1000000 --workers 8 --format parquet
+（Parquet 输出依赖 pyarrow，已列入 requirements.txt）
+"""
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_OUTPUT = PROJECT_ROOT / "data" / "synthetic"
+
+# 属性名称词表（中文, 英文）
+VOCABULARY = [
+    ("姓名", "Name"), ("性别", "Gender"), ("出生日期", "Date of Birth"),
+    ("身份证号", "ID Card Number"), ("护照号", "Passport Number"), ("手机号", "Phone Number"),
+    ("电子邮箱", "Email"), ("住址", "Address"), ("银行账号", "Bank Account"),
+    ("工作单位", "Employer"), ("职位", "Job Title"), ("学历", "Education"),
+    ("病历", "Medical Record"), ("血型", "Blood Type"), ("基因数据", "Genetic Data"),
+    ("浏览记录", "Browsing History"), ("IP地址", "IP Address"), ("社交账号", "Social Account"),
+    ("犯罪记录", "Criminal Record"), ("消费记录", "Purchase History"),
+]
+
+# 分类及其出现概率（与 mapping_rules.yaml 中的类别一致）
+CATEGORIES = {
+    1: ("个人身份信息(PII)", 0.16), 2: ("就业信息", 0.40), 3: ("健康信息", 0.11),
+    4: ("通用信息", 0.05), 6: ("教育信息", 0.07), 7: ("网络行为信息", 0.05),
+    10: ("社交信息", 0.08), 12: ("法律信息", 0.04), 13: ("消费信息", 0.04),
+}
+DEFAULT_CATEGORY = 4
+
+# 敏感级别映射（与 grading_rules.yaml 及 generate_grading 的默认值一致）
+GRADING_LEVELS = {1: 'RT01', 2: 'RT02', 3: 'RT03'}
+DEFAULT_LEVEL = 'RT02'
+
+JURISDICTIONS = {'GDPR': 1.2, 'CCPA': 0.8, 'PIPL': 1.0, 'PDPO': 0.9, 'APPI': 0.95, 'LGPD': 1.1}
+
+BLOCK_SIZE = 50  # 同一类别的连续属性代码块大小
+MAX_RANGES = 10_000  # 映射规则中代码区间总数的上限
+
+
+def code_width(rows):
+    return max(3, len(str(rows)))
+
+
+def block_categories(rows, seed):
+    """每个代码块的类别，只依赖 rows 和 seed，各进程可独立重建
+
+    代码块数超过 MAX_RANGES 时，相邻的若干块共用一个类别，使映射规则中的区间总数不随行数增长。
+    """
+    rng = np.random.default_rng([seed, 0])
+    ids = np.array(list(CATEGORIES))
+    probs = np.array([p for _, p in CATEGORIES.values()])
+    n_blocks = (rows + BLOCK_SIZE - 1) // BLOCK_SIZE
+    run = (n_blocks + MAX_RANGES - 1) // MAX_RANGES
+    draws = rng.choice(ids, size=(n_blocks + run - 1) // run, p=probs / probs.sum())
+    return np.repeat(draws, run)[:n_blocks]
+
+
+def mapping_rules(rows, seed):
+    """映射规则：相邻同类代码块合并为一个区间，每个类别一条规则（规则数 ≤ 类别数，区间数 ≤ MAX_RANGES）"""
+    cats = block_categories(rows, seed)
+    starts = np.flatnonzero(np.r_[True, cats[1:] != cats[:-1]])
+    ends = np.r_[starts[1:], len(cats)]
+    width = code_width(rows)
+    ranges = {}
+    for b0, b1 in zip(starts, ends):
+        lo, hi = b0 * BLOCK_SIZE + 1, min(b1 * BLOCK_SIZE, rows)
+        ranges.setdefault(int(cats[b0]), []).append(f"A{lo:0{width}d}-A{hi:0{width}d}")
+    rules = [{"code_ranges": ranges[cat], "category_id": cat, "description": CATEGORIES[cat][0]}
+             for cat in sorted(ranges)]
+    return {"version": 1.1, "default_category": DEFAULT_CATEGORY, "rules": rules}
+
+
+def _chunk_frames(start, stop, rows, seed, chunk_seed):
+    """生成 [start, stop) 区间内各表的数据"""
+    rng = np.random.default_rng(chunk_seed)
+    n = stop - start
+    idx = np.arange(start + 1, stop + 1)
+    codes = pd.Series(idx).astype(str).str.zfill(code_width(rows)).radd("A")
+    vocab = rng.integers(0, len(VOCABULARY), n)
+    cn = pd.Series(np.array([v[0] for v in VOCABULARY], dtype=object)[vocab]) + "_" + pd.Series(idx).astype(str)
+    en = pd.Series(np.array([v[1] for v in VOCABULARY], dtype=object)[vocab]) + " " + pd.Series(idx).astype(str)
+    categories = block_categories(rows, seed)[(idx - 1) // BLOCK_SIZE]
+    levels = pd.Series(categories).map(GRADING_LEVELS).fillna(DEFAULT_LEVEL)
+
+    cross = pd.DataFrame({"attribute_code": codes, "attribute_chinese": cn, "attribute_english": en})
+    extended = pd.DataFrame({
+        "attribute_code": codes,
+        "sensitivity_level_ext": np.round(rng.beta(2, 5, n), 4),
+    })
+    grading = pd.DataFrame({
+        "attribute_code": codes,
+        "attribute_chinese": cn,
+        "sensitivity_level": levels,
+        "category_id": categories,
+    })
+    return {"cross_attributes": cross, "cross_attributes_extended": extended, "inital_grading": grading}
+
+
+def _write_chunk(task):
+    """工作进程：生成一个分块并写入各表的分片文件"""
+    chunk_id, start, stop, rows, seed, chunk_seed, parts_dir, fmt = task
+    frames = _chunk_frames(start, stop, rows, seed, chunk_seed)
+    for name, df in frames.items():
+        part = Path(parts_dir) / name / f"part-{chunk_id:05d}.{fmt}"
+        part.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "parquet":
+            df.to_parquet(part, index=False)
+        else:
+            df.to_csv(part, index=False, header=(chunk_id == 0))
+    return chunk_id
+
+
+def _merge_parts(parts_dir, target, fmt):
+    """合并分片：CSV 按顺序拼接为单文件，Parquet 保留为分片目录"""
+    parts = sorted(Path(parts_dir).iterdir())
+    if fmt == "parquet":
+        target = target.with_suffix(".parquet")
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.move(str(parts_dir), str(target))
+        return target
+    with open(target, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, length=16 * 1024 * 1024)
+    return target
+
+
+def generate_risk_parameters(rows, seed, sample_size=1000):
+    """生成各司法管辖区的风险参数（lambda/beta 只为抽样属性配置，其余取默认值）"""
+    rng = np.random.default_rng([seed, 1])
+    width = code_width(rows)
+    sampled = np.sort(rng.choice(np.arange(1, rows + 1), size=min(sample_size, rows), replace=False))
+    codes = [f"A{i:0{width}d}" for i in sampled]
+    lambdas = np.round(rng.uniform(0.1, 1.0, len(codes)), 3)
+    beta = {}
+    for code in codes[: len(codes) // 2]:
+        j = list(JURISDICTIONS)[rng.integers(len(JURISDICTIONS))]
+        beta[f"{code}_{j}"] = round(float(rng.uniform(0.5, 1.5)), 3)
+    return {
+        'lambda': {c: float(v) for c, v in zip(codes, lambdas)},
+        'alpha': dict(JURISDICTIONS),
+        'beta': beta,
+        'jurisdiction_weights': {**{cat: round(float(rng.uniform(0.05, 0.5)), 3) for cat in CATEGORIES},
+                                 'default': 0.1},
+        'min_R': 0.05,
+        'min_H': 0.01,
+    }
+
+
+def generate(rows, output_dir=DEFAULT_OUTPUT, seed=42, workers=None, chunk_rows=1_000_000, fmt="csv"):
+    """生成全部模拟数据；相同 rows/seed/chunk_rows 的结果与 workers 数无关"""
+    output_dir = Path(output_dir)
+    parts_dir = output_dir / ".parts"
+    if parts_dir.exists():
+        shutil.rmtree(parts_dir)
+    chunk_seeds = np.random.SeedSequence(seed).spawn((rows + chunk_rows - 1) // chunk_rows)
+    tasks = [
+        (i, start, min(start + chunk_rows, rows), rows, seed, chunk_seeds[i], str(parts_dir), fmt)
+        for i, start in enumerate(range(0, rows, chunk_rows))
+    ]
+    workers = workers or os.cpu_count()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_write_chunk, tasks))
+    else:
+        for task in tasks:
+            _write_chunk(task)
+
+    targets = {
+        "cross_attributes": output_dir / "original_data/cross_attributes.csv",
+        "cross_attributes_extended": output_dir / "original_data/cross_attributes_extended.csv",
+        "inital_grading": output_dir / "grading/inital_grading.csv",
+    }
+    written = {}
+    for name, target in targets.items():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        written[name] = _merge_parts(parts_dir / name, target, fmt)
+
+    rules_path = output_dir / "classification/config/mapping_rules.yaml"
+    rules_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(rules_path, "w", encoding="utf-8") as f:
+        yaml.dump(mapping_rules(rows, seed), f, allow_unicode=True, sort_keys=False)
+    written["mapping_rules"] = rules_path
+
+    params_path = output_dir / "grading/config/risk_parameters.yaml"
+    params_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(params_path, "w") as f:
+        yaml.dump(generate_risk_parameters(rows, seed), f, allow_unicode=True)
+    written["risk_parameters"] = params_path
+
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成跨境属性模拟数据")
+    parser.add_argument("--rows", type=float, default=1e3, help="属性行数（1e3 ~ 1e8）")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="输出目录")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="每个分块的行数")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+    written = generate(int(args.rows), args.output, args.seed, args.workers, args.chunk_rows, args.format)
+    for name, path in written.items():
+        print(f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,35 @@
+import argparse
+import io
+import json
+import numpy as np
 import pandas as pd
 import yaml
 from pathlib import Path
-from datetime import datetime
-import shutil
+from snapshot_store import SnapshotStore
+from changelog_store import get_changelog
+from report_stats import StatsCollector, save_stats
+from artifact_store import ArtifactStore, PinnedArtifacts, publish_bytes
 
 # 定义路径
 BASE_DIR = Path(__file__).parent.parent.parent / "data"
 GRADING_DIR = BASE_DIR / "grading"
 CONFIG_DIR = GRADING_DIR / "config"  # 更新为 grading/config 目录
 
+OUTPUT_NAME = 'inital_grading.csv'
+OUTPUT_COLUMNS = ['attribute_code', 'attribute_chinese', 'sensitivity_level', 'category_id']
+DEFAULT_LEVEL = 'RT02'
+
 def load_config():
     """加载分级规则配置文件"""
     with open(CONFIG_DIR / "grading_rules.yaml") as f:
         return yaml.safe_load(f)
 
-def generate_grading():
-    """生成初始分级结果"""
+def grading_store():
+    """分级结果的历史快照库"""
+    return SnapshotStore(GRADING_DIR / "history" / "snapshots", key="attribute_code")
+
+def generate_grading(incremental=False):
+    """生成分级结果；incremental=True 时只重新分级输入或规则有变化的属性"""
     # 确保目录存在
     GRADING_DIR.mkdir(exist_ok=True)
     CONFIG_DIR.mkdir(exist_ok=True)
@@ -25,70 +39,211 @@ def generate_grading():
     cross_df = pd.read_csv(BASE_DIR / "original_data/cross_attributes.csv")
     detail_df = pd.read_csv(BASE_DIR / "classification/attribute_category_detail.csv")
     rules = load_config()
-    
-    # 合并数据
-    merged = cross_df.merge(detail_df, on="attribute_code")
-    
-    # 映射敏感级别
     rule_map = {r['category_id']: r['sensitivity_level'] for r in rules['rules']}
-    merged['sensitivity_level'] = merged['category_id'].map(rule_map).fillna('RT02')
     
-    # 生成结果
-    result = merged[[
-        'attribute_code', 
-        'attribute_chinese',
-        'sensitivity_level',
-        'category_id'
-    ]]
+    # 输入行哈希只计算一次，既用于增量比对也作为下次比对的基准
+    hashes = _input_hashes(cross_df, detail_df)
+    if incremental:
+        summary = regrade_incremental(cross_df, detail_df, rule_map, hashes)
+        if summary is not None:
+            log_grading_change("incremental_generate", **summary)
+            return summary
+
+    # 合并数据并映射敏感级别
+    merged = cross_df.merge(detail_df, on="attribute_code")
+    merged['sensitivity_level'] = merged['category_id'].map(rule_map).fillna(DEFAULT_LEVEL)
+    result = merged[OUTPUT_COLUMNS]
+    summary = {"mode": "full", "regraded": len(result), "deleted": 0}
     
-    # 保存结果
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    result.to_csv(GRADING_DIR / "inital_grading.csv", index=False)
-    shutil.copy2(
-        GRADING_DIR / "inital_grading.csv",
-        GRADING_DIR / "history" / f"grading_{timestamp}.csv"
-    )
+    # 保存结果（历史版本以行级增量写入快照库）
+    payload = result.to_csv(index=False).encode("utf-8")
+    published = publish_bytes(GRADING_DIR / OUTPUT_NAME, payload)
+    grading_store().commit(result, message="auto_generate", payload=payload)
+    save_grading_state(hashes, rule_map, result['attribute_code'].to_numpy(dtype=str),
+                       result['sensitivity_level'].to_numpy(dtype=str), published)
     
     # 生成报告
     generate_validation_report(result)
-    log_grading_change()
+    log_grading_change("auto_generate", **summary)
+    return summary
+
+# ------------------------- 增量分级 -------------------------
+def _state_paths():
+    return GRADING_DIR / "history" / "grading_state.json", GRADING_DIR / "history" / "grading_state.npz"
+
+def _input_hashes(cross_df, detail_df):
+    """按 attribute_code 对齐两张输入表，返回 (保留行位置, 明细行位置, 合并后的行哈希)；代码不唯一时返回 None"""
+    cross_keys = pd.Index(cross_df['attribute_code'].astype(str).to_numpy(dtype=object), dtype=object)
+    detail_keys = pd.Index(detail_df['attribute_code'].astype(str).to_numpy(dtype=object), dtype=object)
+    if not cross_keys.is_unique or not detail_keys.is_unique:
+        return None
+    detail_pos = detail_keys.get_indexer(cross_keys)
+    kept = np.flatnonzero(detail_pos >= 0)
+    cross_hash = pd.util.hash_pandas_object(cross_df, index=False, categorize=False).to_numpy()
+    detail_hash = pd.util.hash_pandas_object(detail_df, index=False, categorize=False).to_numpy()
+    row_hash = cross_hash[kept] * np.uint64(1000003) ^ detail_hash[detail_pos[kept]]
+    return kept, detail_pos[kept], row_hash
+
+def save_grading_state(hashes, rule_map, codes, levels, published):
+    """记录本次分级的输入行哈希、敏感级别（与输出逐行对齐）、规则映射和输出的发布版本，供下次增量比对"""
+    meta_path, state_path = _state_paths()
+    if hashes is None:
+        for path in (meta_path, state_path):
+            path.unlink(missing_ok=True)
+        return
+    np.savez(state_path, codes=np.asarray(codes, dtype=str), row_hash=hashes[2],
+             levels=np.asarray(levels, dtype=str))
+    with open(meta_path, 'w') as f:
+        json.dump({"rule_map": [[k, v] for k, v in rule_map.items()],
+                   "output": [published["version"], published["sha"]]}, f)
+
+def _previous_output(meta):
+    """读取上次分级发布的输出（不可变的版本文件）；清单中的最新版本不是上次分级写入的则返回 None"""
+    store = ArtifactStore(GRADING_DIR)
+    manifest = store.manifest()
+    entry = manifest.get(OUTPUT_NAME)
+    if not entry or [entry["version"], entry["sha"]] != meta.get("output"):
+        return None
+    try:
+        return PinnedArtifacts(store, manifest).read_bytes(OUTPUT_NAME)
+    except FileNotFoundError:
+        return None
+
+def _line_ends(payload, n_rows):
+    """CSV 各行（表头 + n_rows 行）结束位置；行数对不上（字段内含换行等）返回 None"""
+    ends = np.flatnonzero(np.frombuffer(payload, dtype=np.uint8) == 10) + 1
+    if len(ends) != n_rows + 1 or ends[-1] != len(payload):
+        return None
+    return ends
+
+def _splice(payload, ends, prev_pos, changed, new_lines):
+    """把变化行的新内容拼入上次的输出：未变化且在上次输出中连续的行整段复制"""
+    parts = [payload[:ends[0]]]
+    n = len(prev_pos)
+    if n:
+        breaks = np.ones(n, dtype=bool)
+        breaks[1:] = changed[1:] | changed[:-1] | (prev_pos[1:] != prev_pos[:-1] + 1)
+        starts = np.flatnonzero(breaks)
+        stops = np.append(starts[1:], n)
+        lines = iter(new_lines)
+        for lo, hi in zip(starts.tolist(), stops.tolist()):
+            if changed[lo]:
+                parts.append(next(lines))
+            else:
+                first, last = prev_pos[lo], prev_pos[hi - 1]
+                parts.append(payload[ends[first]:ends[last + 1]])
+    return b"".join(parts)
+
+def regrade_incremental(cross_df, detail_df, rule_map, hashes):
+    """与上次分级的输入比对，只对新增/变更的行及规则映射变化的类别重新分级
+
+    未变化的行直接复制上次发布的 CSV 中对应的字节，只格式化变化的行；
+    快照库按变化行提交增量，不重新计算整表的行哈希。
+    返回 None 表示无法增量（无历史状态、输出已被其他发布覆盖、代码不唯一等），调用方应全量分级。
+    """
+    meta_path, state_path = _state_paths()
+    if hashes is None or not (meta_path.exists() and state_path.exists()):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    previous = _previous_output(meta)
+    if previous is None:
+        return None
+    kept, detail_pos, row_hash = hashes
+    with np.load(state_path) as state:
+        prev_codes, prev_hash, prev_levels = state['codes'], state['row_hash'], state['levels']
+
+    prev_keys = pd.Index(prev_codes.astype(object), dtype=object)
+    cur_codes = cross_df['attribute_code'].astype(str).to_numpy(dtype=object)[kept]
+    prev_pos = prev_keys.get_indexer(cur_codes)
+
+    # 变更行：新增、输入哈希变化、所属类别的分级规则发生变化
+    old_map = dict((k, v) for k, v in meta["rule_map"])
+    moved = [c for c in set(old_map) | set(rule_map) if old_map.get(c) != rule_map.get(c)]
+    categories = detail_df['category_id'].to_numpy()[detail_pos]
+    existing = prev_pos >= 0
+    changed = ~existing
+    changed[existing] = row_hash[existing] != prev_hash[prev_pos[existing]]
+    if moved:
+        changed |= np.isin(categories, moved)
+    n_deleted = len(prev_keys) - int(existing.sum())
+    summary = {"mode": "incremental", "regraded": int(changed.sum()), "deleted": n_deleted}
+    if not changed.any() and n_deleted == 0 and np.array_equal(prev_pos, np.arange(len(prev_keys))):
+        return summary  # 输入和规则均无变化，输出保持不变
+    ends = _line_ends(previous, len(prev_keys))
+    if ends is None:
+        return None
+
+    # 只对变化的行查规则并格式化为 CSV 行
+    rows = np.flatnonzero(changed)
+    levels = np.empty(len(kept), dtype=object)
+    levels[~changed] = prev_levels[prev_pos[~changed]]
+    levels[rows] = pd.Series(categories[rows]).map(rule_map).fillna(DEFAULT_LEVEL).to_numpy()
+    upserts = pd.DataFrame({
+        'attribute_code': cross_df['attribute_code'].to_numpy()[kept[rows]],
+        'attribute_chinese': cross_df['attribute_chinese'].to_numpy()[kept[rows]],
+        'sensitivity_level': levels[rows],
+        'category_id': categories[rows],
+    })
+    new_lines = upserts.to_csv(index=False, header=False).encode("utf-8").splitlines(keepends=True)
+    if len(new_lines) != len(rows):
+        return None
+    payload = _splice(previous, ends, prev_pos, changed, new_lines)
+    published = publish_bytes(GRADING_DIR / OUTPUT_NAME, payload)
+
+    # 保留行维持原顺序且新增行都在末尾时，快照库直接提交变化的行；否则（中间插入等）写入完整检查点
+    store = grading_store()
+    n_kept = int(existing.sum())
+    committed = None
+    if existing[:n_kept].all() and np.all(np.diff(prev_pos[:n_kept]) > 0):
+        present = np.zeros(len(prev_keys), dtype=bool)
+        present[prev_pos[existing]] = True
+        committed = store.commit_delta(upserts, prev_codes[~present], published["sha"], meta["output"][1],
+                                       message="incremental_generate")
+    if committed is None:
+        result = pd.read_csv(io.BytesIO(payload))
+        store.commit(result, message="incremental_generate", payload=payload)
+    save_grading_state(hashes, rule_map, cur_codes, levels, published)
+    generate_validation_report(pd.DataFrame({'sensitivity_level': levels, 'category_id': categories}))
+    return summary
 
 def generate_validation_report(df):
-    """生成验证报告"""
-    stats = {
-        "total": len(df),
-        "high_risk": len(df[df['sensitivity_level'] == 'RT01']),
-        "medium_risk": len(df[df['sensitivity_level'] == 'RT02']),
-        "low_risk": len(df[df['sensitivity_level'] == 'RT03'])
-    }
-    
-    report = f"""
+    """生成验证报告：单遍统计写入 validation_stats.json，再由统计结果渲染 HTML"""
+    stats = StatsCollector(count_columns=["sensitivity_level", "category_id"]).collect(df)
+    save_stats(stats, GRADING_DIR / "validation_stats.json")
+    with open(GRADING_DIR / "validation_report.html", "w") as f:
+        f.write(render_validation_report(stats))
+    return stats
+
+def render_validation_report(stats):
+    """由统计结果渲染分级验证报告"""
+    levels = stats["counts"]["sensitivity_level"]
+    return f"""
     <html><body>
-        <h1>分级验证报告 {datetime.now()}</h1>
+        <h1>分级验证报告 {stats['generated_at']}</h1>
         <h2>分级统计</h2>
         <ul>
             <li>总属性数: {stats['total']}</li>
-            <li>高敏感属性: {stats['high_risk']}</li>
-            <li>中敏感属性: {stats['medium_risk']}</li>
-            <li>低敏感属性: {stats['low_risk']}</li>
+            <li>高敏感属性: {levels.get('RT01', 0)}</li>
+            <li>中敏感属性: {levels.get('RT02', 0)}</li>
+            <li>低敏感属性: {levels.get('RT03', 0)}</li>
         </ul>
         <h2>异常检测</h2>
-        <p>未分类属性: {len(df[df['sensitivity_level'].isna()])}</p>
+        <p>未分类属性: {stats['missing']['sensitivity_level']}</p>
     </body></html>
     """
-    
-    with open(GRADING_DIR / "validation_report.html", "w") as f:
-        f.write(report)
 
-def log_grading_change():
+def grading_changelog():
+    """分级变更日志（首次使用时导入旧版 changelog.csv）"""
+    history_dir = GRADING_DIR / "history"
+    return get_changelog(history_dir / "changelog.db", legacy_csv=history_dir / "changelog.csv")
+
+def log_grading_change(action_type="auto_generate", changed_by="system", **details):
     """记录变更日志"""
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": "auto_generate",
-        "changed_by": "system"
-    }
-    log_path = GRADING_DIR / "history/changelog.csv"
-    pd.DataFrame([log_entry]).to_csv(log_path, mode='a', header=not log_path.exists(), index=False)
+    grading_changelog().append(action_type, changed_by, **details)
 
 if __name__ == "__main__":
-    generate_grading()
+    parser = argparse.ArgumentParser(description="生成分级结果")
+    parser.add_argument("--incremental", action="store_true", help="只重新分级有变化的属性")
+    summary = generate_grading(incremental=parser.parse_args().incremental)
+    print(f"分级完成（{summary['mode']}）：重新分级 {summary['regraded']} 行，删除 {summary['deleted']} 行")
@@ -0,0 +1,212 @@
+# src/core/online_scoring.py
+import json
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .artifact_store import ArtifactStore, PinExpired
+from .dynamic_adjustments import composite_scores
+from .entropy_calculation import entropy_weights
+
+# 定义路径（与 app_routes.py / protection_mapper.py 一致）
+BASE_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+GRADING_DIR = BASE_DIR / "grading"
+CONFIG_DIR = BASE_DIR / "config"
+
+RISK_QUANTIFICATION_PATH = GRADING_DIR / "risk_quantification.csv"
+RISK_WEIGHTS_PATH = GRADING_DIR / "risk_weights.json"
+RISK_PARAMS_PATH = CONFIG_DIR / "risk_parameters.yaml"  # 与 app_routes.quantify_risk 读取同一个参数文件
+THRESHOLD_PARAMS_PATH = CONFIG_DIR / "protection_thresholds.yaml"
+
+# 保护等级顺序：0=high, 1=mid, 2=low
+PROTECTION_TIERS = ('high', 'mid', 'low')
+DEFAULT_JURISDICTION = 'default'
+
+
+class UnknownJurisdiction(ValueError):
+    """查询的司法管辖区未在风险参数（alpha）中配置"""
+
+
+class ScoringSnapshot:
+    """冻结的模型快照：所有查询只读取预计算数组"""
+
+    def __init__(self, codes, jurisdictions, scores, tiers, levels, measures, weights):
+        self.code_index = {code: i for i, code in enumerate(codes)}
+        self.jurisdictions = frozenset(jurisdictions)
+        self.codes = codes
+        self.scores = scores          # (n_attr,) 综合评分 L
+        self.tiers = tiers            # (n_attr,) 保护等级下标
+        self.levels = levels          # (n_attr,) 敏感级别
+        self.measures = measures      # 每个保护等级对应的措施列表
+        self.weights = weights
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, quant_path=RISK_QUANTIFICATION_PATH, weights_path=RISK_WEIGHTS_PATH,
+             params_path=RISK_PARAMS_PATH, thresholds_path=THRESHOLD_PARAMS_PATH):
+        """从量化结果与配置文件构建快照"""
+        # 固定发布版本，量化结果与熵权来自同一次量化
+        quant_path, weights_path = Path(quant_path), Path(weights_path)
+        same_dir = weights_path.parent == quant_path.parent
+        df, weights = ArtifactStore(quant_path.parent).read_pinned(lambda pinned: (
+            pinned.read_csv(quant_path.name), _read_weights(weights_path, pinned if same_dir else None)))
+        V = df[['v1', 'v2', 'v3']].to_numpy(dtype=np.float64)
+        if weights is None:
+            weights = entropy_weights(V)
+        params = _load_yaml(params_path)
+        thresholds = _load_yaml(thresholds_path)
+
+        # 与 /quantify 完全相同的综合评分：批量 L 不区分司法管辖区，参数中配置的管辖区只用于校验查询
+        codes = df['attribute_code'].astype(str).to_numpy()
+        jurisdictions = {DEFAULT_JURISDICTION, *map(str, params.get('alpha') or {})}
+        levels = df['sensitivity_level'].to_numpy()
+        scores = composite_scores(V, weights, levels)
+
+        # 保护等级映射（与 ProtectionEngine.map_protection 条件一致）
+        theta_high = float(thresholds.get('theta_high', np.inf))
+        theta_low = float(thresholds.get('theta_low', -np.inf))
+        tiers = np.where(scores >= theta_high, 0, np.where(scores >= theta_low, 1, 2)).astype(np.int8)
+        configured = thresholds.get('measures') or {}
+        measures = tuple(list(configured.get(t, [])) for t in PROTECTION_TIERS)
+
+        return cls(codes, jurisdictions, scores, tiers, levels, measures, weights)
+
+    def check_jurisdiction(self, jurisdiction):
+        """未配置的司法管辖区抛出 UnknownJurisdiction（不回退到默认值）"""
+        if str(jurisdiction) not in self.jurisdictions:
+            raise UnknownJurisdiction(f"未知司法管辖区: {jurisdiction}")
+
+    def score(self, attribute_code, jurisdiction=DEFAULT_JURISDICTION):
+        """单属性在线评分：L + 敏感级别 + 保护措施"""
+        self.check_jurisdiction(jurisdiction)
+        i = self.code_index[attribute_code]
+        tier = self.tiers[i]
+        return {
+            "attribute_code": attribute_code,
+            "jurisdiction": jurisdiction,
+            "L": float(self.scores[i]),
+            "sensitivity_level": self.levels[i],
+            "protection_level": PROTECTION_TIERS[tier],
+            "protection_measures": self.measures[tier],
+        }
+
+    def score_frame(self, attribute_codes=None, jurisdiction=DEFAULT_JURISDICTION):
+        """批量评分，直接从预计算数组切片（未知属性的行被丢弃）"""
+        self.check_jurisdiction(jurisdiction)
+        if attribute_codes is None:
+            idx = slice(None)
+        else:
+            idx = np.array([self.code_index[c] for c in attribute_codes if c in self.code_index], dtype=np.intp)
+        tiers = self.tiers[idx]
+        labels = np.array(['|'.join(m) for m in self.measures], dtype=object)
+        return pd.DataFrame({
+            "attribute_code": self.codes[idx],
+            "L": self.scores[idx],
+            "sensitivity_level": self.levels[idx],
+            "protection_level": np.array(PROTECTION_TIERS, dtype=object)[tiers],
+            "protection_measures": labels[tiers],
+        })
+
+
+class OnlineScorer:
+    """持有当前快照，并在源文件变化时热加载"""
+
+    def __init__(self, check_interval=1.0, **paths):
+        self.check_interval = check_interval
+        self.paths = {
+            'quant_path': RISK_QUANTIFICATION_PATH,
+            'weights_path': RISK_WEIGHTS_PATH,
+            'params_path': RISK_PARAMS_PATH,
+            'thresholds_path': THRESHOLD_PARAMS_PATH,
+        }
+        self.paths.update(paths)
+        self.snapshot = None
+        self._signature = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._reloading = False
+
+    def _current_signature(self):
+        sig = []
+        for p in self.paths.values():
+            try:
+                st = Path(p).stat()
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def reload(self):
+        """重新构建快照并原子替换引用"""
+        with self._lock:
+            signature = self._current_signature()
+            self.snapshot = ScoringSnapshot.load(**self.paths)
+            self._signature = signature
+            self._last_check = time.monotonic()
+        return self.snapshot
+
+    def refresh(self, wait=True):
+        """按检查间隔比较文件签名，变化时重新加载
+
+        wait=False 时不阻塞调用方（如事件循环）：在后台线程重建快照，重建完成前继续返回旧快照；
+        尚未加载过快照时返回 None。
+        """
+        now = time.monotonic()
+        if self.snapshot is not None and now - self._last_check < self.check_interval:
+            return self.snapshot
+        self._last_check = now
+        if self.snapshot is not None and self._current_signature() == self._signature:
+            return self.snapshot
+        if wait:
+            return self.reload()
+        if self.snapshot is not None:
+            self._reload_in_background()
+        return self.snapshot
+
+    def _reload_in_background(self):
+        with self._state_lock:
+            if self._reloading:
+                return
+            self._reloading = True
+
+        def run():
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"在线评分快照重新加载失败，继续使用旧快照: {e}")
+            finally:
+                self._reloading = False
+
+        threading.Thread(target=run, name="scoring-reload", daemon=True).start()
+
+    def score(self, attribute_code, jurisdiction=DEFAULT_JURISDICTION):
+        return self.refresh().score(attribute_code, jurisdiction)
+
+
+def _load_yaml(path):
+    try:
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def _read_weights(weights_path, pinned=None):
+    """读取量化阶段保存的熵权（pinned 不为空时按固定版本读取），从未保存过时返回 None"""
+    try:
+        if pinned is not None:
+            data = pinned.read_json(weights_path.name)
+        else:
+            with open(weights_path) as f:
+                data = json.load(f)
+    except PinExpired:
+        raise
+    except FileNotFoundError:
+        return None
+    return np.asarray(data['weights'], dtype=np.float64)
+
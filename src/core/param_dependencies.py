@@ -0,0 +1,386 @@
+# src/core/param_dependencies.py
+"""风险参数依赖跟踪与定向重算
+
+risk_parameters.yaml 中各参数只影响部分行的 P_risk：
+    lambda[属性代码]              -> 该属性的 P_risk
+    alpha[类别]                   -> 该类别所有行的 P_risk
+    beta["<属性代码>_<类别>"]     -> 对应行的 P_risk
+修改参数后只重算受影响行的 P_risk 与所在类别的风险分析 R（贝叶斯网络联合概率与条件熵 H 不随参数变化，不再计算）；
+量化指标按 /quantify（app_routes.quantify_risk）的公式整体向量化重算，熵权通过逐列维护的 Σp、Σp·ln(p) 增量更新，
+因此调参结果与重新执行风险分析和 /quantify 一致。
+
+P_risk 变化后 risk_analysis.csv、risk_quantification.csv 与 risk_weights.json 通过 publish_all 一起发布；
+risk_parameters.yaml 只改写变化的参数值，保留注释。风险分析管理界面常驻一个 ParameterTuner（POST /risk_parameters）。
+
+运行方式：python src/core/param_dependencies.py data/grading --set alpha.GDPR=1.3
+"""
+import argparse
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from artifact_store import ArtifactStore
+from dynamic_adjustments import composite_scores, quantify_indicators, relation_noise, relation_strength
+from entropy_calculation import entropy_weights_from_sums
+
+PARAMS_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "grading" / "config" / "risk_parameters.yaml"
+
+# 参数缺省值（风险分析计算 P_risk 时同样使用 risk_factors）
+DEFAULT_LAMBDA = 0.5
+DEFAULT_ALPHA = 1.0
+DEFAULT_BETA = 1.0
+EPSILON = 1e-8
+
+P_SECTIONS = ("lambda", "alpha", "beta")
+
+
+class IncompatibleArtifacts(ValueError):
+    """发布的风险分析 / 量化结果缺少调参所需的列或属性，需要重新执行风险分析与量化"""
+
+
+def risk_factors(df, params):
+    """逐行的 lambda * alpha * beta"""
+    codes = df['attribute_code'].astype(str)
+    categories = df['category_id']
+    lam = codes.map(params.get('lambda') or {}).fillna(DEFAULT_LAMBDA)
+    alpha = categories.map(params.get('alpha') or {}).fillna(DEFAULT_ALPHA)
+    beta_keys = codes + "_" + categories.astype(str)
+    beta = beta_keys.map(params.get('beta') or {}).fillna(DEFAULT_BETA)
+    return (lam * alpha * beta).to_numpy(dtype=float)
+
+
+def diff_params(old, new):
+    """返回发生变化的参数键 [(段, 键)]；标量参数的键为 None"""
+    changes = []
+    for section in set(old) | set(new):
+        a, b = old.get(section), new.get(section)
+        if isinstance(a, dict) or isinstance(b, dict):
+            a, b = a or {}, b or {}
+            changes.extend((section, k) for k in set(a) | set(b) if a.get(k) != b.get(k))
+        elif a != b:
+            changes.append((section, None))
+    return changes
+
+
+class ParameterDependencies:
+    """参数键 -> 行位置的依赖索引"""
+
+    def __init__(self, df):
+        self.codes = pd.Index(df['attribute_code'].astype(str).to_numpy(dtype=object), dtype=object)
+        self.categories = df['category_id'].to_numpy()
+        self.category_str = df['category_id'].astype(str).to_numpy(dtype=object)
+        self.by_category = {k: np.asarray(v) for k, v in pd.Series(self.categories).groupby(self.categories).indices.items()}
+        self.n_rows = len(df)
+        # 预先建立代码哈希表，交互调参时的首次查找无需等待
+        self.codes_unique = self.codes.is_unique
+        self.codes.get_indexer(self.codes[:1])
+
+    def _code_rows(self, code):
+        if self.codes_unique:
+            pos = self.codes.get_indexer([str(code)])
+            return pos[pos >= 0]
+        return np.flatnonzero(self.codes == str(code))
+
+    def rows_for(self, section, key):
+        """单个参数键影响的行"""
+        if section == 'lambda':
+            return self._code_rows(key)
+        if section == 'alpha':
+            return self.by_category.get(key, np.empty(0, dtype=np.int64))
+        if section == 'beta':
+            code, _, category = str(key).rpartition("_")
+            rows = self._code_rows(code)
+            return rows[self.category_str[rows] == category]
+        return np.empty(0, dtype=np.int64)
+
+    def affected(self, changes, sections=P_SECTIONS):
+        """sections 中的参数变化影响的行（去重排序）"""
+        return _union(self.n_rows, [self.rows_for(section, key) for section, key in changes if section in sections])
+
+
+def _union(n, arrays):
+    """多组行位置的并集（有序），用掩码代替排序去重"""
+    mask = np.zeros(n, dtype=bool)
+    for rows in arrays:
+        mask[rows] = True
+    return np.flatnonzero(mask)
+
+
+def _require(frame, columns, name):
+    missing = [c for c in columns if c not in frame]
+    if missing:
+        raise IncompatibleArtifacts(f"{name} 缺少列 {missing}，请重新执行风险分析与量化")
+
+
+class _EntropyColumn:
+    """熵权中一列指标的增量统计：极差标准化参数、Σp 和 Σp·ln(p)（与 entropy_weights 相同的截断）"""
+
+    def __init__(self, values):
+        self.rebuild(values)
+
+    def _p(self, x):
+        return np.clip((x - self.min) / self.range, EPSILON, 1)
+
+    def rebuild(self, values):
+        self.min = values.min()
+        rng = values.max() - self.min
+        self.range = rng if rng != 0 else EPSILON
+        p = self._p(values)
+        self.sum_p, self.sum_plogp = p.sum(), (p * np.log(p)).sum()
+
+    def update(self, values, rows, old):
+        """values 已写入新值；rows 为变化的行、old 为其旧值，极差不变时只更新这些行的贡献"""
+        rng = values.max() - values.min()
+        if values.min() != self.min or (rng if rng != 0 else EPSILON) != self.range:
+            self.rebuild(values)
+        elif len(rows):
+            new, old = self._p(values[rows]), self._p(old)
+            self.sum_p += new.sum() - old.sum()
+            self.sum_plogp += (new * np.log(new)).sum() - (old * np.log(old)).sum()
+
+
+class ParameterTuner:
+    """在内存中保存量化结果的各中间列，参数修改后只重算受影响行的 P_risk
+
+    analysis 为风险分析结果 risk_analysis.csv（行序决定 /quantify 的随机扰动），需包含
+    attribute_code、category_id、sensitivity_level、P_risk，若有 P_base 列（贝叶斯网络联合概率）则直接使用，
+    否则由 P_risk / (lambda·alpha·beta) 反推；quantification 为 /quantify 发布的 risk_quantification.csv，
+    从中取与参数无关的 H。缺少列或属性时抛出 IncompatibleArtifacts。
+    """
+
+    def __init__(self, analysis, quantification, params):
+        _require(analysis, ('attribute_code', 'category_id', 'sensitivity_level', 'P_risk'), "risk_analysis.csv")
+        _require(quantification, ('attribute_code', 'H'), "risk_quantification.csv")
+        self.frame = analysis.reset_index(drop=True)
+        self.params = params
+        self.deps = ParameterDependencies(self.frame)
+        entropy = quantification.assign(attribute_code=quantification['attribute_code'].astype(str))
+        entropy = entropy.drop_duplicates('attribute_code', keep='last').set_index('attribute_code')['H']
+        missing = ~self.deps.codes.isin(entropy.index)
+        if missing.any():
+            raise IncompatibleArtifacts(f"risk_quantification.csv 缺少属性 {self.deps.codes[missing][:10].tolist()}，"
+                                        "请重新执行量化")
+        self.H = entropy.reindex(self.deps.codes).to_numpy(dtype=float)
+
+        factors = risk_factors(self.frame, params)
+        if 'P_base' in self.frame:
+            self.base = self.frame['P_base'].to_numpy(dtype=float)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.base = np.where(factors != 0, self.frame['P_risk'].to_numpy(dtype=float) / factors, np.nan)
+        self.P = self.base * factors
+        self.noise = relation_noise(len(self.frame))
+        self.R_category = np.empty(len(self.frame))
+        self.category_extremes = {}
+        for category, rows in self.deps.by_category.items():
+            self._recompute_category_r(category, rows)
+        self.R = relation_strength(self.P, self.deps.categories, self.noise)
+        self.v = quantify_indicators(self.R, self.P, self.H)
+        self.p_max = self.P.max()
+        self.columns = [_EntropyColumn(self.v[:, j]) for j in range(3)]
+        self.weights = self._weights()
+
+    # ------------------------- 逐层计算 -------------------------
+    def _recompute_category_r(self, category, rows):
+        """风险分析的 R：类别内极差标准化"""
+        values = self.P[rows]
+        lo, hi = values.min(), values.max()
+        self.category_extremes[category] = (lo, hi)
+        self.R_category[rows] = (values - lo) / (hi - lo + 1e-8)
+
+    def _weights(self):
+        return entropy_weights_from_sums([c.sum_p for c in self.columns], [c.sum_plogp for c in self.columns],
+                                         len(self.frame))
+
+    # ------------------------- 参数更新 -------------------------
+    def update(self, new_params):
+        """应用新参数，返回本次重算的统计信息"""
+        start = time.perf_counter()
+        changes = diff_params(self.params, new_params)
+        self.params = new_params
+
+        # 1. P_risk：只重算 lambda / alpha / beta 影响的行
+        p_rows = self.deps.affected(changes)
+        if len(p_rows):
+            new_p = self.base[p_rows] * risk_factors(self.frame.iloc[p_rows], new_params)
+            moved = new_p != self.P[p_rows]
+            p_rows = p_rows[moved]
+            self.P[p_rows] = new_p[moved]
+
+        # 2. 风险分析的 R：类别内极差不变时只更新变化的行，否则重算整个类别
+        for category in np.unique(self.deps.categories[p_rows]):
+            rows = self.deps.by_category[category]
+            lo, hi = self.P[rows].min(), self.P[rows].max()
+            if (lo, hi) != self.category_extremes[category]:
+                self._recompute_category_r(category, rows)
+            else:
+                changed = p_rows[self.deps.categories[p_rows] == category]
+                self.R_category[changed] = (self.P[changed] - lo) / (hi - lo + 1e-8)
+
+        # 3. 量化指标：v1（R 依赖全局均值与极差）整列重算；v2 在 P_max 不变时只更新变化的行；v3 与参数无关
+        if len(p_rows):
+            self.R = relation_strength(self.P, self.deps.categories, self.noise)
+            self.v[:, 0] = self.R
+            self.columns[0].rebuild(self.v[:, 0])
+            if self.P.max() != self.p_max:
+                self.p_max = self.P.max()
+                self.v[:, 1] = self.P / self.p_max
+                self.columns[1].rebuild(self.v[:, 1])
+            else:
+                old = self.v[p_rows, 1]
+                self.v[p_rows, 1] = self.P[p_rows] / self.p_max
+                self.columns[1].update(self.v[:, 1], p_rows, old)
+
+        # 4. 熵权
+        self.weights = self._weights()
+        return {
+            "changed_keys": [f"{s}.{k}" if k is not None else s for s, k in changes],
+            "p_rows": int(len(p_rows)),
+            "weights": self.weights.tolist(),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def result(self):
+        """按当前参数输出与 /quantify 相同的量化结果表（含敏感级别加分，按敏感级别、L 排序）"""
+        out = self.frame.copy()
+        out['P_risk'] = self.P
+        out['R'] = self.R
+        out['H'] = self.H
+        out[['v1', 'v2', 'v3']] = self.v
+        out['L'] = composite_scores(self.v, self.weights, out['sensitivity_level'])
+        return out.sort_values(['sensitivity_level', 'L'], ascending=[True, False])
+
+    def analysis(self):
+        """按当前参数输出的风险分析结果（P_risk 与类别内 R 更新，其余列保持原值）"""
+        out = self.frame.copy()
+        out['P_risk'] = self.P
+        if 'R' in out:
+            out['R'] = self.R_category
+        return out
+
+
+def dependent_artifacts(tuner, quantification_name="risk_quantification.csv"):
+    """P_risk 变化后需要一起发布的产物 {文件名: 内容}：风险分析结果、量化结果与熵权"""
+    return {
+        "risk_analysis.csv": tuner.analysis(),
+        quantification_name: tuner.result(),
+        "risk_weights.json": {"weights": tuner.weights.tolist()},
+    }
+
+
+def _parse_assignment(text):
+    """解析 section.key=value（键为整数时按类别 ID 处理）"""
+    name, value = text.split("=", 1)
+    section, _, key = name.partition(".")
+    value = yaml.safe_load(value)
+    if not key:
+        return section, None, value
+    return section, int(key) if key.lstrip("-").isdigit() else key, value
+
+
+def apply_assignments(params, assignments):
+    """返回应用 section.key=value 修改后的参数副本（不修改 params）"""
+    new_params = {k: dict(v) if isinstance(v, dict) else v for k, v in params.items()}
+    for assignment in assignments:
+        section, key, value = _parse_assignment(assignment)
+        if key is None:
+            new_params[section] = value
+        else:
+            new_params.setdefault(section, {})[key] = value
+    return new_params
+
+
+# ------------------------- 参数文件 -------------------------
+_MISSING = object()
+
+
+def _yaml_scalar(value):
+    text = yaml.safe_dump(value, default_flow_style=True, allow_unicode=True).strip()
+    return text[:-3].strip() if text.endswith("...") else text
+
+
+def _entry_pattern(key, indent):
+    return re.compile(rf"^({indent}){re.escape(_yaml_scalar(key))}\s*:(?:\s+([^#\n]*?))?(\s+#.*)?\s*$")
+
+
+def _set_line(lines, section, key, value):
+    """改写（或删除、追加）一个参数在 YAML 文本中的行"""
+    top = _entry_pattern(section, "")
+    start = next((i for i, line in enumerate(lines) if top.match(line)), None)
+    if key is None:
+        if start is None:
+            return lines if value is _MISSING else lines + [f"{_yaml_scalar(section)}: {_yaml_scalar(value)}\n"]
+        if value is _MISSING:
+            return lines[:start] + lines[start + 1:]
+        comment = top.match(lines[start]).group(3) or ""
+        return lines[:start] + [f"{_yaml_scalar(section)}: {_yaml_scalar(value)}{comment}\n"] + lines[start + 1:]
+
+    entry = f"{_yaml_scalar(key)}: {_yaml_scalar(value)}" if value is not _MISSING else None
+    if start is None:
+        if entry is None:
+            return lines
+        tail = [] if not lines or lines[-1].endswith("\n") else ["\n"]
+        return lines + tail + [f"{_yaml_scalar(section)}:\n", f"  {entry}\n"]
+    # 段的范围：其后缩进的行、空行和注释行
+    end, last, indent = start + 1, start, "  "
+    while end < len(lines) and (not lines[end].strip() or lines[end][0] in " \t#"):
+        if lines[end].strip() and not lines[end].lstrip().startswith("#"):
+            last, indent = end, re.match(r"\s*", lines[end]).group(0)
+        end += 1
+    pattern = _entry_pattern(key, r"\s+")
+    for i in range(start + 1, end):
+        match = pattern.match(lines[i])
+        if match:
+            if entry is None:
+                return lines[:i] + lines[i + 1:]
+            return lines[:i] + [f"{match.group(1)}{entry}{match.group(3) or ''}\n"] + lines[i + 1:]
+    if entry is None:
+        return lines
+    return lines[:last + 1] + [f"{indent}{entry}\n"] + lines[last + 1:]
+
+
+def save_params(path, old_params, new_params):
+    """只改写参数文件中变化的值，保留注释与其余格式
+
+    新增的键追加到所在段末尾；改写结果解析后与 new_params 不一致（如流式写法的段）时退回整体重写。
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8") if path.exists() else ""
+    lines = text.splitlines(keepends=True)
+    for section, key in diff_params(old_params, new_params):
+        value = new_params.get(section, _MISSING) if key is None else (new_params.get(section) or {}).get(key, _MISSING)
+        lines = _set_line(lines, section, key, value)
+    text = "".join(lines)
+    if (yaml.safe_load(text) or {}) != new_params:
+        text = yaml.dump(new_params, allow_unicode=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="修改风险参数并只重算受影响的行")
+    parser.add_argument("grading_dir", help="risk_analysis.csv 与 /quantify 输出的 risk_quantification.csv 所在目录")
+    parser.add_argument("--params", default=str(PARAMS_PATH), help="风险参数文件")
+    parser.add_argument("--set", action="append", default=[], metavar="SECTION.KEY=VALUE")
+    args = parser.parse_args()
+
+    with open(args.params) as f:
+        params = yaml.safe_load(f)
+    store = ArtifactStore(args.grading_dir)
+    pinned = store.pin()
+    tuner = ParameterTuner(pinned.read_csv("risk_analysis.csv"), pinned.read_csv("risk_quantification.csv"), params)
+    summary = tuner.update(apply_assignments(params, args.set))
+    store.publish_all(dependent_artifacts(tuner))
+    save_params(args.params, params, tuner.params)
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
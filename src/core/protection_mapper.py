@@ -1,10 +1,12 @@
 # src/core/protection_mapper.py
-from flask import Flask, render_template_string, request, redirect, url_for
+from flask import Flask, render_template_string, request, redirect, url_for, Response
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import yaml
 import traceback
+from serialization import negotiate, encode_frame, UnsupportedFormat, CSV
+from artifact_store import publish_csv, read_csv
 
 # 初始化Flask应用
 app = Flask(__name__)
@@ -25,7 +27,7 @@ class ProtectionEngine:
     @staticmethod
     def load_risk_data():
         """加载风险量化数据"""
-        return pd.read_csv(RISK_QUANTIFICATION_PATH)
+        return read_csv(RISK_QUANTIFICATION_PATH)
 
     @staticmethod
     def calculate_thresholds(df):
@@ -105,7 +107,7 @@ def protection_management():
         
         # 保存结果
         GRADING_DIR.mkdir(parents=True, exist_ok=True)
-        result_df.to_csv(PROTECTION_MEASURES_PATH, index=False)
+        publish_csv(PROTECTION_MEASURES_PATH, result_df)
         
         return render_template_string(PROTECTION_TEMPLATE, 
                                     params=params,
@@ -115,6 +117,19 @@ def protection_management():
         traceback.print_exc()
         return f"操作失败: {str(e)}", 500
 
+@app.route('/protection/export')
+def export_protection():
+    """导出保护措施结果（按 Accept 头返回 CSV / JSON / Arrow / MessagePack）"""
+    try:
+        media_type = negotiate(request.headers.get('Accept'), default=CSV)
+    except UnsupportedFormat as e:
+        return str(e), 406
+    try:
+        df = read_csv(PROTECTION_MEASURES_PATH)
+    except FileNotFoundError:
+        return "暂无保护措施结果", 404
+    return Response(encode_frame(df, media_type), mimetype=media_type)
+
 # *************** 前端模板 ***************
 PROTECTION_TEMPLATE = """
 <!DOCTYPE html>
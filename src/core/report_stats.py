@@ -0,0 +1,82 @@
+# src/core/report_stats.py
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class StatsCollector:
+    """单遍流式统计：逐块累计验证报告所需的全部指标
+
+    count_columns   需要统计取值分布的列（同时统计缺失值个数）
+    """
+
+    def __init__(self, count_columns=()):
+        self.count_columns = list(count_columns)
+        self.total = 0
+        self.counts = {c: {} for c in self.count_columns}
+        self.missing = {c: 0 for c in self.count_columns}
+
+    def update(self, chunk):
+        self.total += len(chunk)
+        for col in self.count_columns:
+            counts = self.counts[col]
+            for value, n in chunk[col].value_counts(dropna=False).items():
+                if pd.isna(value):
+                    self.missing[col] += int(n)
+                    continue
+                key = _json_key(value)
+                counts[key] = counts.get(key, 0) + int(n)
+        return self
+
+    def collect(self, source, chunk_size=100_000):
+        """source 可以是 DataFrame、CSV 路径或 DataFrame 分块的可迭代对象"""
+        if isinstance(source, pd.DataFrame):
+            chunks = (source.iloc[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+        elif isinstance(source, (str, Path)):
+            chunks = pd.read_csv(source, chunksize=chunk_size)
+        else:
+            chunks = source
+        for chunk in chunks:
+            self.update(chunk)
+        return self.result()
+
+    def result(self):
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "total": self.total,
+            "counts": {c: dict(sorted(v.items(), key=lambda kv: -kv[1])) for c, v in self.counts.items()},
+            "missing": self.missing,
+        }
+
+
+def _json_key(value):
+    """统一为 JSON 对象键（整数类别写成 "2" 而不是 "2.0"）"""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+def save_stats(stats, path):
+    """原子写入统计结果 JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def load_stats(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def counts_table(counts, key_label, count_label="count"):
+    """分布字典渲染为 HTML 表格"""
+    rows = "".join(f"<tr><td>{k}</td><td>{v}</td></tr>" for k, v in counts.items())
+    return f"<table border=\"1\"><tr><th>{key_label}</th><th>{count_label}</th></tr>{rows}</table>"
@@ -1,7 +1,9 @@
 import yaml
+import pandas as pd
 import numpy as np
 from .dynamic_adjustments import RiskAdjuster
 from .entropy_calculation import EntropyEnhancer
+from .artifact_store import publish_csv
 
 class PrivacyRiskQuantifier:
     def __init__(self, config_path, data_dir):
@@ -44,5 +46,5 @@ class PrivacyRiskQuantifier:
         
         # 综合评分（公式3.4）
         risk_df['L'] = (risk_df[['v1', 'v2', 'v3']] * weights).sum(axis=1)
-        risk_df.to_csv(output_path, index=False)
+        publish_csv(output_path, risk_df)
         return risk_df, weights
@@ -0,0 +1,163 @@
+# src/core/rule_index.py
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class RuleIndex:
+    """编译后的属性分类规则索引
+
+    mapping_rules.yaml 中每条规则可组合使用以下匹配方式：
+        attribute_codes: ["A001", "A002"]      精确代码
+        code_ranges:     ["A069-A100"]         代码区间（按字母前缀 + 数值比较，含两端）
+        code_prefixes:   ["B1"]                代码前缀（最长前缀优先）
+        code_patterns:   ["^C\\d{3}$"]         正则表达式
+    优先级：精确代码 > 区间 > 前缀 > 正则 > default_category；
+    同一种方式内多条规则冲突时，以后出现的规则为准。
+    """
+
+    RANGE_PATTERN = re.compile(r'^(\D*)(\d+)\s*-\s*(\D*)(\d+)$')
+
+    def __init__(self, rules, default_category):
+        self.default_category = default_category
+        self.exact = {}
+        ranges = []
+        self.prefixes = {}      # {前缀长度: {前缀: 类别}}，按层组织的前缀树
+        self.patterns = []
+        for rule in rules:
+            category = rule['category_id']
+            for code in rule.get('attribute_codes') or []:
+                self.exact[code] = category
+            for spec in rule.get('code_ranges') or []:
+                ranges.append(self._parse_range(spec) + (category,))
+            for prefix in rule.get('code_prefixes') or []:
+                self.prefixes.setdefault(len(prefix), {})[prefix] = category
+            for pattern in rule.get('code_patterns') or []:
+                self.patterns.append((re.compile(pattern), category))
+        self.intervals = self._compile_intervals(ranges)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['rules'], config['default_category'])
+
+    @classmethod
+    def _parse_range(cls, spec):
+        if isinstance(spec, (list, tuple)):
+            spec = f"{spec[0]}-{spec[1]}"
+        match = cls.RANGE_PATTERN.match(str(spec).strip())
+        if not match or match.group(1) != match.group(3):
+            raise ValueError(f"无效的代码区间: {spec}")
+        lo, hi = int(match.group(2)), int(match.group(4))
+        if lo > hi:
+            raise ValueError(f"代码区间起点大于终点: {spec}")
+        return match.group(1), lo, hi
+
+    @staticmethod
+    def _compile_intervals(ranges):
+        """按字母前缀编译为互不重叠的有序区间 (starts, ends, categories)"""
+        by_prefix = {}
+        for order, (prefix, lo, hi, category) in enumerate(ranges):
+            by_prefix.setdefault(prefix, []).append((lo, hi, category))
+        compiled = {}
+        for prefix, items in by_prefix.items():
+            los = np.array([i[0] for i in items], dtype=np.int64)
+            his = np.array([i[1] for i in items], dtype=np.int64)
+            cats = np.array([i[2] for i in items], dtype=np.int64)
+            order = np.argsort(los, kind='stable')
+            if np.all(los[order][1:] > his[order][:-1]):
+                compiled[prefix] = (los[order], his[order], cats[order])
+                continue
+            # 存在重叠：切分为基本区段，按规则顺序覆盖（后出现的规则优先）
+            bounds = np.unique(np.concatenate([los, his + 1]))
+            seg_cat = np.full(len(bounds) - 1, -1, dtype=np.int64)
+            for lo, hi, cat in zip(los, his, cats):
+                seg_cat[np.searchsorted(bounds, lo):np.searchsorted(bounds, hi + 1)] = cat
+            covered = seg_cat >= 0
+            compiled[prefix] = (bounds[:-1][covered], bounds[1:][covered] - 1, seg_cat[covered])
+        return compiled
+
+    def classify(self, codes, chunk_size=1_000_000):
+        """对整列属性代码做向量化分类，返回与输入等长的类别数组"""
+        codes = np.asarray(codes)
+        if codes.dtype.kind != 'U':
+            codes = np.asarray(pd.Series(codes, dtype=object).astype(str).to_numpy(), dtype=str)
+        result = np.empty(len(codes), dtype=np.int64)
+        for start in range(0, len(codes), chunk_size):
+            result[start:start + chunk_size] = self._classify_chunk(codes[start:start + chunk_size])
+        return result
+
+    def _classify_chunk(self, codes):
+        categories = np.full(len(codes), self.default_category, dtype=np.int64)
+        todo = np.ones(len(codes), dtype=bool)
+
+        # 精确代码：有序数组 + 二分查找
+        if self.exact:
+            todo &= ~_lookup(codes, self.exact, categories)
+
+        # 代码区间：按字母前缀分组，在有序区间上二分查找
+        if self.intervals and todo.any():
+            prefix_len, values, valid = _split_codes(codes)
+            for prefix, (starts, ends, cats) in self.intervals.items():
+                sel = todo & valid & (prefix_len == len(prefix))
+                if prefix:
+                    sel &= np.char.startswith(codes, prefix)
+                idx = np.flatnonzero(sel)
+                pos = np.searchsorted(starts, values[idx], side='right') - 1
+                hit = (pos >= 0) & (values[idx] <= ends[np.maximum(pos, 0)])
+                categories[idx[hit]] = cats[pos[hit]]
+                todo[idx[hit]] = False
+
+        # 前缀：从最长前缀开始逐层匹配（截断后的定长字符串二分查找）
+        for length in sorted(self.prefixes, reverse=True):
+            if not todo.any():
+                break
+            idx = np.flatnonzero(todo)
+            sub = np.empty(len(idx), dtype=np.int64)
+            hit = _lookup(codes[idx].astype(f'U{length}'), self.prefixes[length], sub)
+            hit &= np.char.str_len(codes[idx]) >= length
+            categories[idx[hit]] = sub[hit]
+            todo[idx[hit]] = False
+
+        # 正则：只对剩余未匹配的代码逐个匹配
+        for pattern, category in reversed(self.patterns):
+            if not todo.any():
+                break
+            idx = np.flatnonzero(todo)
+            hit = pd.Series(codes[idx]).str.match(pattern).to_numpy(dtype=bool)
+            categories[idx[hit]] = category
+            todo[idx[hit]] = False
+
+        return categories
+
+
+def _lookup(keys, mapping, out):
+    """在有序键数组上二分查找，命中的位置写入 out，返回命中掩码"""
+    table = np.array(sorted(mapping), dtype=str)
+    values = np.array([mapping[k] for k in table], dtype=np.int64)
+    pos = np.minimum(np.searchsorted(table, keys), len(table) - 1)
+    hit = table[pos] == keys
+    out[hit] = values[pos[hit]]
+    return hit
+
+
+def _split_codes(codes):
+    """将代码拆分为 (字母前缀长度, 末尾数值, 是否有效)，基于定长 Unicode 数组向量化计算"""
+    width = codes.dtype.itemsize // 4
+    if width == 0:
+        n = len(codes)
+        return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+    chars = codes.view(np.uint32).reshape(len(codes), width)
+    length = np.count_nonzero(chars, axis=1)
+    is_digit = (chars >= 48) & (chars <= 57)
+    positions = np.arange(width)
+    non_digit = ~is_digit & (positions < length[:, None])
+    prefix_len = np.where(non_digit.any(axis=1), width - np.argmax(non_digit[:, ::-1], axis=1), 0)
+    n_digits = length - prefix_len
+    valid = (n_digits > 0) & (n_digits <= 18)
+    # 逐列按 Horner 法则累加末尾数字
+    values = np.zeros(len(codes), dtype=np.int64)
+    for j in range(width):
+        in_number = (j >= prefix_len) & (j < length)
+        values = np.where(in_number, values * 10 + (chars[:, j].astype(np.int64) - 48), values)
+    return prefix_len, values, valid
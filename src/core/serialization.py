@@ -0,0 +1,119 @@
+# src/core/serialization.py
+import json
+
+import numpy as np
+
+# 支持的响应格式（pyarrow / msgpack 列在 requirements.txt 中；未安装时对应格式不参与协商）
+JSON = "application/json"
+CSV = "text/csv"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+
+class UnsupportedFormat(Exception):
+    """客户端请求的格式不可用，调用方应返回 406"""
+
+
+def available_formats(default=JSON):
+    """当前环境可输出的格式，默认格式排在首位"""
+    formats = [default] + [f for f in (JSON, CSV) if f != default]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append(ARROW_STREAM)
+    except ImportError:
+        pass
+    try:
+        import msgpack  # noqa: F401
+        formats.append(MSGPACK)
+    except ImportError:
+        pass
+    return formats
+
+
+def negotiate(accept, default=JSON):
+    """按 Accept 头（含 q 值）选择响应格式"""
+    formats = available_formats(default)
+    if not accept:
+        return default
+    candidates = []
+    for order, part in enumerate(accept.split(",")):
+        fields = part.strip().split(";")
+        media_type = _ALIASES.get(fields[0].strip().lower(), fields[0].strip().lower())
+        q = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            candidates.append((-q, order, media_type))
+    for _, _, media_type in sorted(candidates):
+        if media_type in ("*/*", "application/*"):
+            return default
+        if media_type in formats:
+            return media_type
+    raise UnsupportedFormat(f"不支持的格式: {accept}，可用: {', '.join(formats)}")
+
+
+def encode_frame(df, media_type):
+    """将 DataFrame 序列化为指定格式的字节串"""
+    if media_type == ARROW_STREAM:
+        return _encode_arrow(df)
+    if media_type == MSGPACK:
+        return _encode_msgpack(df)
+    if media_type == CSV:
+        return df.to_csv(index=False).encode("utf-8")
+    return json.dumps(df.to_dict("records"), ensure_ascii=False).encode("utf-8")
+
+
+def _require(module, media_type):
+    """导入可选依赖；未安装时抛出 UnsupportedFormat（调用方返回 406），而不是 ImportError"""
+    import importlib
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise UnsupportedFormat(f"{media_type} 需要安装 {module}（pip install {module}）") from None
+
+
+def _encode_arrow(df):
+    pa = _require("pyarrow", ARROW_STREAM)
+    # 数值列直接引用 numpy 缓冲区，不经过 Python 对象
+    batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode_msgpack(df):
+    """列式 MessagePack：数值列以原始小端缓冲区写入，可用 np.frombuffer 还原"""
+    msgpack = _require("msgpack", MSGPACK)
+    data = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind in "biuf":
+            arr = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+            data[col] = {"dtype": arr.dtype.str, "buffer": memoryview(arr)}
+        else:
+            data[col] = {"dtype": "object", "values": [None if v is None or v != v else v for v in values.tolist()]}
+    payload = {"columns": [str(c) for c in df.columns], "rows": len(df), "data": data}
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def decode_msgpack(payload):
+    """encode_frame(MSGPACK) 的逆操作，返回 DataFrame"""
+    msgpack = _require("msgpack", MSGPACK)
+    import pandas as pd
+    obj = msgpack.unpackb(payload, raw=False)
+    columns = {}
+    for col in obj["columns"]:
+        spec = obj["data"][col]
+        if spec["dtype"] == "object":
+            columns[col] = spec["values"]
+        else:
+            columns[col] = np.frombuffer(spec["buffer"], dtype=np.dtype(spec["dtype"]))
+    return pd.DataFrame(columns, columns=obj["columns"])
@@ -0,0 +1,313 @@
+# src/core/snapshot_store.py
+import argparse
+import bisect
+import gzip
+import hashlib
+import io
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 flock，退化为仅依赖原子替换
+    fcntl = None
+
+
+class SnapshotStore:
+    """内容寻址的表快照存储：按主键保存行级增量，并定期写入完整检查点
+
+    目录结构：
+        manifest.json          版本清单（时间戳、类型、引用的数据块）
+        objects/<sha256>.gz    gzip 压缩的 CSV 数据块，相同内容只保存一份
+        head.npz               最新版本的主键和行哈希，计算下一次增量时无需还原整表
+        .lock                  提交方（流水线、管理后台）通过 flock 串行化，版本号不会重复
+    """
+
+    def __init__(self, root, key="attribute_code", checkpoint_every=20):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifest_path = self.root / "manifest.json"
+        self.head_path = self.root / "head.npz"
+        self.key = key
+        self.checkpoint_every = checkpoint_every
+
+    @contextmanager
+    def _lock(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ------------------------- 写入 -------------------------
+    def commit(self, df, timestamp=None, message=None, payload=None):
+        """提交新版本；内容与最新版本相同时不新增版本，返回最新版本信息
+
+        payload 为调用方已序列化好的 CSV 内容（与 df.to_csv(index=False) 一致），可避免重复序列化。
+        """
+        payload = payload if payload is not None else _to_csv_bytes(df)
+        content_sha = hashlib.sha256(payload).hexdigest()
+        with self._lock():
+            versions = self.versions()
+            if versions and versions[-1]["sha"] == content_sha:
+                return versions[-1]
+
+            entry = {
+                "version": versions[-1]["version"] + 1 if versions else 1,
+                "timestamp": (timestamp or datetime.now()).isoformat(),
+                "sha": content_sha,
+                "rows": len(df),
+                "message": message,
+            }
+            delta = None
+            cur_hash = _row_hashes(df)
+            since_checkpoint = self._deltas_since_checkpoint(versions)
+            if versions and since_checkpoint < self.checkpoint_every:
+                delta = self._make_delta(self._head(versions), df, cur_hash)
+            if delta is None:
+                entry.update(kind="full", blob=self._put(payload))
+            else:
+                upserts, deletes = delta
+                entry.update(kind="delta", upserts=self._put(_to_csv_bytes(upserts)),
+                             deletes=self._put(_to_csv_bytes(deletes)),
+                             changed=len(upserts), deleted=len(deletes))
+            self._write_head(entry["version"], list(df.columns), self._keys(df), cur_hash)
+            versions.append(entry)
+            self._write_manifest(versions)
+        return entry
+
+    def commit_delta(self, upserts, deleted, sha, base_sha, timestamp=None, message=None):
+        """提交调用方已知的行级增量，不重新计算整表的行哈希
+
+        base_sha 为增量所基于的版本（最新版本）的内容 sha256，sha 为新版本的内容 sha256；
+        upserts 为变更和新增的行（新增行按 upserts 中的顺序追加到末尾），deleted 为删除的主键。
+        只对 upserts 计算行哈希，其余行沿用 head.npz 中的哈希。
+        最新版本不是 base_sha、无 head 缓存、列变化或已到检查点间隔时返回 None，调用方应改用 commit()。
+        """
+        with self._lock():
+            versions = self.versions()
+            if not versions or versions[-1]["sha"] != base_sha or not self.head_path.exists():
+                return None
+            if self._deltas_since_checkpoint(versions) >= self.checkpoint_every:
+                return None
+            with np.load(self.head_path) as head:
+                if int(head["version"]) != versions[-1]["version"] or list(head["columns"]) != list(upserts.columns):
+                    return None
+                keys, hashes = head["keys"], head["hashes"]
+
+            deleted = np.asarray(deleted, dtype=str)
+            if len(upserts) + len(deleted) > len(keys) // 2:
+                return None  # 与 commit() 一致：变更过多时改写完整检查点
+            if len(deleted):
+                keep = ~np.isin(keys, deleted)
+                keys, hashes = keys[keep], hashes[keep]
+            up_keys = np.asarray(self._keys(upserts), dtype=str)
+            up_pos = pd.Index(keys).get_indexer(up_keys)
+            added = up_pos < 0
+            up_pos[added] = len(keys) + np.arange(int(added.sum()))
+            keys = np.concatenate([keys, up_keys[added]])
+            hashes = np.concatenate([hashes, np.zeros(int(added.sum()), dtype=np.uint64)])
+            hashes[up_pos] = _row_hashes(upserts)
+            entry = {
+                "version": versions[-1]["version"] + 1,
+                "timestamp": (timestamp or datetime.now()).isoformat(),
+                "sha": sha,
+                "rows": len(keys),
+                "message": message,
+                "kind": "delta",
+                "upserts": self._put(_to_csv_bytes(upserts)),
+                "deletes": self._put(_to_csv_bytes(pd.DataFrame({self.key: deleted}))),
+                "changed": len(upserts),
+                "deleted": len(deleted),
+            }
+            self._write_head(entry["version"], list(upserts.columns), keys, hashes)
+            versions.append(entry)
+            self._write_manifest(versions)
+        return entry
+
+    def _head(self, versions):
+        """最新版本的 (列名, 主键, 行哈希)；缓存缺失或过期时由历史还原"""
+        if self.head_path.exists():
+            with np.load(self.head_path) as head:
+                if int(head["version"]) == versions[-1]["version"]:
+                    return list(head["columns"]), pd.Index(head["keys"].astype(object), dtype=object), head["hashes"]
+        prev = self._materialize(versions, len(versions) - 1)
+        return list(prev.columns), self._keys(prev), _row_hashes(prev)
+
+    def _write_head(self, version, columns, keys, hashes):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / "head.tmp.npz"
+        np.savez(tmp, version=version, columns=np.array(columns, dtype=str),
+                 keys=np.asarray(keys, dtype=str), hashes=hashes)
+        os.replace(tmp, self.head_path)
+
+    def _make_delta(self, head, cur, cur_hash):
+        """计算行级增量；列或行顺序变化、变更过多时返回 None（改写完整检查点）"""
+        prev_columns, prev_keys, prev_hash = head
+        if prev_columns != list(cur.columns) or cur[self.key].duplicated().any():
+            return None
+        cur_keys = self._keys(cur)
+        if not prev_keys.is_unique:
+            return None
+
+        prev_pos = prev_keys.get_indexer(cur_keys)
+        in_prev = prev_pos >= 0
+        n_kept = int(in_prev.sum())
+        # 保留的行必须维持原顺序，新增行只能追加在末尾，才能由增量精确还原
+        if not in_prev[:n_kept].all() or not np.all(np.diff(prev_pos[:n_kept]) > 0):
+            return None
+
+        changed = ~in_prev
+        changed[in_prev] = cur_hash[in_prev] != prev_hash[prev_pos[in_prev]]
+        deletes = pd.DataFrame({self.key: prev_keys[~prev_keys.isin(cur_keys)]})
+        upserts = cur.loc[changed]
+        if len(upserts) + len(deletes) > len(cur) // 2:
+            return None
+        return upserts, deletes
+
+    # ------------------------- 查询 -------------------------
+    def versions(self):
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, version):
+        """读取指定版本号的完整表"""
+        versions = self.versions()
+        numbers = [v["version"] for v in versions]
+        if version not in numbers:
+            raise KeyError(f"版本不存在: {version}")
+        return self._materialize(versions, numbers.index(version))
+
+    def as_of(self, timestamp):
+        """返回时间点 T 时的表状态（T 之前无版本时返回 None）"""
+        versions = self.versions()
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        pos = bisect.bisect_right([v["timestamp"] for v in versions], timestamp) - 1
+        return self._materialize(versions, pos) if pos >= 0 else None
+
+    def diff(self, from_version, to_version):
+        """两个版本之间的差异：新增、删除、变更的行"""
+        old, new = self.load(from_version), self.load(to_version)
+        old_idx, new_idx = old.set_index(self.key), new.set_index(self.key)
+        added = new_idx.loc[new_idx.index.difference(old_idx.index, sort=False)]
+        removed = old_idx.loc[old_idx.index.difference(new_idx.index, sort=False)]
+        common = new_idx.index.intersection(old_idx.index, sort=False)
+        columns = [c for c in new_idx.columns if c in old_idx.columns]
+        before = old_idx.loc[common, columns].astype(str)
+        after = new_idx.loc[common, columns].astype(str)
+        changed = new_idx.loc[common[(before != after).any(axis=1).to_numpy()]]
+        return {
+            "added": added.reset_index(),
+            "removed": removed.reset_index(),
+            "changed": changed.reset_index(),
+        }
+
+    # ------------------------- 内部实现 -------------------------
+    def _deltas_since_checkpoint(self, versions):
+        count = 0
+        for entry in reversed(versions):
+            if entry["kind"] == "full":
+                return count
+            count += 1
+        return count
+
+    def _materialize(self, versions, pos):
+        """从最近的检查点开始依次应用增量"""
+        start = pos
+        while versions[start]["kind"] != "full":
+            start -= 1
+        df = self._get(versions[start]["blob"])
+        for entry in versions[start + 1:pos + 1]:
+            upserts = self._get(entry["upserts"])
+            deletes = self._get(entry["deletes"])
+            df = df[~self._keys(df).isin(self._keys(deletes))].reset_index(drop=True)
+            positions = self._keys(df).get_indexer(self._keys(upserts))
+            updated = positions >= 0
+            if updated.any():
+                for col in df.columns:
+                    values, new = df[col].to_numpy(), upserts[col].to_numpy()[updated]
+                    values = values.astype(np.result_type(values.dtype, new.dtype))
+                    values[positions[updated]] = new
+                    df[col] = values
+            df = pd.concat([df, upserts[~updated]], ignore_index=True)
+        return df.reset_index(drop=True)
+
+    def _keys(self, df):
+        return pd.Index(df[self.key].astype(str).to_numpy(dtype=object), dtype=object)
+
+    def _put(self, payload):
+        sha = hashlib.sha256(payload).hexdigest()
+        path = self.objects_dir / f"{sha}.gz"
+        if not path.exists():
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(payload, compresslevel=6))
+            os.replace(tmp, path)
+        return sha
+
+    def _get(self, sha):
+        with open(self.objects_dir / f"{sha}.gz", "rb") as f:
+            return pd.read_csv(io.BytesIO(gzip.decompress(f.read())), dtype={self.key: str})
+
+    def _write_manifest(self, versions):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(versions, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+
+def _row_hashes(df):
+    # 行哈希：类型不一致只会多记几行增量，不影响还原结果
+    return pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy()
+
+
+def _to_csv_bytes(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询历史快照")
+    parser.add_argument("store", help="快照目录，如 data/classification/history/snapshots")
+    parser.add_argument("--key", default="attribute_code")
+    parser.add_argument("--as-of", help="输出该时间点的表状态，如 2025-03-12T18:00")
+    parser.add_argument("--diff", nargs=2, type=int, metavar=("FROM", "TO"), help="比较两个版本")
+    parser.add_argument("--output", help="as-of 结果输出的 CSV 路径")
+    args = parser.parse_args()
+    store = SnapshotStore(args.store, key=args.key)
+
+    if args.as_of:
+        df = store.as_of(args.as_of)
+        if df is None:
+            print("该时间点之前没有版本")
+        elif args.output:
+            df.to_csv(args.output, index=False)
+            print(f"已导出到 {args.output}")
+        else:
+            print(df.to_string(index=False))
+    elif args.diff:
+        for name, df in store.diff(*args.diff).items():
+            print(f"== {name}: {len(df)} 行")
+            if len(df):
+                print(df.to_string(index=False))
+    else:
+        for v in store.versions():
+            print(f"v{v['version']:<6}{v['timestamp']:<28}{v['kind']:<7}{v['rows']:>10} 行")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# src/core/startup_profile.py
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+CORE_DIR = Path(__file__).resolve().parent
+
+# 管理后台与命令行脚本的入口模块
+DEFAULT_MODULES = [
+    "sync_classification",
+    "grading_generator",
+    "sync_classification_admin_app",
+    "sync_grading_admin_app",
+    "sync_risk_analysis_admin_app",
+    "app_routes",
+    "protection_mapper",
+    "admin_gateway",
+]
+# 单个模块启动（解释器 + 导入）的默认耗时上限：解释器与 pandas（及其加载的 numpy / pyarrow）约占 0.5 s，
+# 各入口模块实测 0.74–0.88 s，超出说明引入了新的重量级导入
+DEFAULT_BUDGET_MS = 1000
+# 只能在用到的代码路径中延迟导入的重量级依赖
+HEAVY_PACKAGES = ("scipy", "pgmpy", "sklearn", "matplotlib", "torch", "networkx")
+
+
+def profile_import(module, cwd=CORE_DIR):
+    """在子进程中以 -X importtime 导入模块，返回总耗时和按顶层包汇总的导入耗时"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(cwd), capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{proc.stderr[-2000:]}")
+
+    packages, import_ms = {}, 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0.0) + int(self_us) / 1000
+        if name == module:
+            import_ms = int(cumulative_us) / 1000
+    return {
+        "module": module,
+        "import_ms": round(import_ms, 1),
+        "wall_ms": round(wall_ms, 1),
+        "packages": dict(sorted(((k, round(v, 1)) for k, v in packages.items()), key=lambda kv: -kv[1])),
+        "heavy": sorted(p for p in packages if p in HEAVY_PACKAGES),
+    }
+
+
+def check_budget(results, budget_ms):
+    """返回超出启动预算或在启动时加载了重量级依赖的模块"""
+    failures = []
+    for r in results:
+        if r["wall_ms"] > budget_ms:
+            failures.append(f"{r['module']}: 启动 {r['wall_ms']:.0f} ms，超出预算 {budget_ms:.0f} ms")
+        if r["heavy"]:
+            failures.append(f"{r['module']}: 启动时导入了 {', '.join(r['heavy'])}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口模块导入耗时分析与启动预算检查")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="单个模块启动（解释器 + 导入）的耗时上限")
+    parser.add_argument("--top", type=int, default=5, help="每个模块显示耗时最多的包数")
+    parser.add_argument("--output", help="结果保存为 JSON")
+    args = parser.parse_args()
+
+    results = [profile_import(m) for m in args.modules]
+    for r in results:
+        top = ", ".join(f"{k} {v:.0f}ms" for k, v in list(r["packages"].items())[:args.top])
+        print(f"{r['module']:<34}{r['wall_ms']:>8.0f} ms  导入 {r['import_ms']:>6.0f} ms  [{top}]")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failures = check_budget(results, args.budget_ms)
+    for failure in failures:
+        print(failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
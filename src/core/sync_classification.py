@@ -2,7 +2,11 @@ import pandas as pd
 import yaml
 from pathlib import Path
 from datetime import datetime
-import shutil
+from rule_index import RuleIndex
+from snapshot_store import SnapshotStore
+from changelog_store import get_changelog
+from report_stats import StatsCollector, counts_table
+from artifact_store import publish_csv
 
 # 定义路径
 # 使用 __file__ 的绝对路径来确定项目根目录
@@ -17,55 +21,49 @@ def load_mapping_rules():
     with open(CLASSIFICATION_DIR / "config/mapping_rules.yaml") as f:
         return yaml.safe_load(f)
 
-def generate_category_mapping(rules):
-    mapping = {}
-    for rule in rules['rules']:
-        for code in rule['attribute_codes']:
-            mapping[code] = rule['category_id']
-    return mapping
+def detail_store():
+    """分类明细表的历史快照库（行级增量 + 定期完整检查点）"""
+    return SnapshotStore(HISTORY_DIR / "snapshots", key="attribute_code")
 
 def backup_current_version():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    """将当前明细表纳入快照库（内容未变化时不产生新版本），返回版本标识"""
     detail_path = CLASSIFICATION_DIR / "attribute_category_detail.csv"
-    backup_path = HISTORY_DIR / f"detail_{timestamp}.csv"
-    shutil.copy2(detail_path, backup_path)
-    return backup_path.name
+    if not detail_path.exists():
+        return None
+    version = detail_store().commit(pd.read_csv(detail_path, dtype={"attribute_code": str}))
+    return f"snapshots@v{version['version']}"
+
+UNMAPPED_CATEGORY = 4
 
 def generate_validation_report(detail_df):
-    validation_results = {
-        "total_attributes": len(detail_df),
-        "unmapped_attributes": len(detail_df[detail_df['category_id'] == 4]),
-        "category_distribution": detail_df['category_id'].value_counts().to_dict()
-    }
-    
-    report_html = f"""
+    """单遍统计分类指标并渲染报告"""
+    stats = StatsCollector(count_columns=["category_id"]).collect(detail_df)
+    report_path = REPORT_DIR / f"validation_{datetime.now().strftime('%Y%m%d_%H%M')}.html"
+    with open(report_path, 'w') as f:
+        f.write(render_validation_report(stats))
+    return report_path
+
+def render_validation_report(stats):
+    distribution = stats["counts"]["category_id"]
+    return f"""
     <html><body>
-        <h1>分类验证报告 {datetime.now()}</h1>
+        <h1>分类验证报告 {stats['generated_at']}</h1>
         <h2>概要统计</h2>
         <ul>
-            <li>总属性数: {validation_results['total_attributes']}</li>
-            <li>未映射属性数: {validation_results['unmapped_attributes']}</li>
+            <li>总属性数: {stats['total']}</li>
+            <li>未映射属性数: {distribution.get(str(UNMAPPED_CATEGORY), 0)}</li>
         </ul>
         <h2>分类分布</h2>
-        {detail_df['category_id'].value_counts().to_frame().to_html()}
+        {counts_table(distribution, 'category_id')}
     </body></html>
     """
-    
-    report_path = REPORT_DIR / f"validation_{datetime.now().strftime('%Y%m%d_%H%M')}.html"
-    with open(report_path, 'w') as f:
-        f.write(report_html)
-    return report_path
+
+def changelog():
+    """分类变更日志（首次使用时导入旧版 changelog.csv）"""
+    return get_changelog(HISTORY_DIR / "changelog.db", legacy_csv=HISTORY_DIR / "changelog.csv")
 
 def log_change(action_type, changed_by="system", backup_file=None):
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action_type": action_type,
-        "changed_by": changed_by,
-        "backup_file": backup_file
-    }
-    
-    log_path = HISTORY_DIR / "changelog.csv"
-    pd.DataFrame([log_entry]).to_csv(log_path, mode='a', header=not log_path.exists(), index=False)
+    changelog().append(action_type, changed_by, backup_file=backup_file)
 
 def sync_classification():
     # 初始化目录
@@ -75,22 +73,19 @@ def sync_classification():
     # 加载数据
     cross_df = pd.read_csv(ORIGINAL_DATA_DIR / "cross_attributes.csv")
     rules = load_mapping_rules()
-    mapping = generate_category_mapping(rules)
-    
-    # 生成明细数据
-    detail_data = []
-    for _, row in cross_df.iterrows():
-        code = row['attribute_code']
-        detail_data.append({
-            "attribute_code": code,
-            "category_id": mapping.get(code, rules['default_category'])
-        })
+    rule_index = RuleIndex.from_config(rules)
     
-    detail_df = pd.DataFrame(detail_data)
+    # 生成明细数据（编译后的规则索引对整列代码一次性分类）
+    detail_df = pd.DataFrame({
+        "attribute_code": cross_df['attribute_code'],
+        "category_id": rule_index.classify(cross_df['attribute_code'])
+    })
     
     # 备份和保存
-    backup_file = backup_current_version()
-    detail_df.to_csv(CLASSIFICATION_DIR / "attribute_category_detail.csv", index=False)
+    backup_current_version()
+    publish_csv(CLASSIFICATION_DIR / "attribute_category_detail.csv", detail_df)
+    version = detail_store().commit(detail_df, message="auto_sync")
+    backup_file = f"snapshots@v{version['version']}"
     
     # 生成报告
     report_path = generate_validation_report(detail_df)
@@ -1,11 +1,15 @@
 # src/core/sync_grading_admin_app.py
-from flask import Flask, request, render_template_string, redirect, url_for
+from flask import Flask, request, render_template_string, redirect, url_for, jsonify, send_file
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import shutil
 import subprocess
 import os
+from changelog_store import get_changelog
+from report_stats import load_stats
+from grading_generator import render_validation_report, log_grading_change
+from admin_store import AdminStore, VersionConflict
 
 # 定义与grading_generator.py一致的路径体系
 BASE_DIR = Path(__file__).resolve().parent.parent.parent / "data"
@@ -14,6 +18,16 @@ CONFIG_DIR = GRADING_DIR / "config"
 
 app = Flask(__name__)
 
+PAGE_SIZE = 200
+
+def admin_store():
+    """人工调整的记录系统；流水线 CSV 有更新时自动重新导入"""
+    return AdminStore(BASE_DIR / "admin.db", {
+        "classification_detail": BASE_DIR / "classification" / "attribute_category_detail.csv",
+        "grading": GRADING_DIR / "inital_grading.csv",
+        "quantification": GRADING_DIR / "risk_quantification.csv",
+    })
+
 @app.route('/')
 def index():
     return redirect(url_for('grading_management'))
@@ -21,20 +35,116 @@ def index():
 @app.route('/grading')
 def grading_management():
     """分级管理主界面"""
+    # 从后台库分页读取分级数据（按类别筛选走索引）
+    store = admin_store()
+    category_id = request.args.get('category_id', type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
+    if store.sync_from_csv("grading") or store.columns("grading"):
+        grading_df = store.query("grading", category_id, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE)
+    else:
+        grading_df = pd.DataFrame(columns=["attribute_code", "attribute_chinese", "sensitivity_level", "row_version"])
     try:
-        # 加载最新分级数据
-        grading_df = pd.read_csv(GRADING_DIR / "inital_grading.csv")
-        report_content = open(GRADING_DIR / "validation_report.html").read()
+        # 报告由生成时保存的统计结果渲染，不再重新统计
+        report_content = render_validation_report(load_stats(GRADING_DIR / "validation_stats.json"))
     except FileNotFoundError:
-        grading_df = pd.DataFrame(columns=["attribute_code", "attribute_chinese", "sensitivity_level"])
         report_content = "<p>暂无验证报告</p>"
     
     return render_template_string(
         GRADING_HTML,
         data=grading_df.to_dict('records'),
-        report=report_content
+        report=report_content,
+        page=page,
+        category_id=category_id,
+        has_next=len(grading_df) == PAGE_SIZE,
     )
 
+# ------------------------- 人工调整接口 -------------------------
+def _conflict_response(e):
+    return jsonify({"error": str(e), "conflicts": e.conflicts}), 409
+
+@app.route('/api/<table>/<attribute_code>', methods=['POST'])
+def adjust_row(table, attribute_code):
+    """单行调整：{"changes": {...}, "row_version": n, "changed_by": "..."}，缺少 row_version 返回 400，版本不一致返回 409"""
+    payload = request.get_json(force=True)
+    if payload.get("row_version") is None:
+        return jsonify({"error": "缺少 row_version"}), 400
+    store = admin_store()
+    try:
+        store.sync_from_csv(table)
+        row = store.update(table, attribute_code, payload.get("changes", {}), payload.get("row_version"),
+                           payload.get("changed_by", "expert"))
+    except VersionConflict as e:
+        return _conflict_response(e)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    log_grading_change("manual_adjust", payload.get("changed_by", "expert"), table=table,
+                       attribute_code=attribute_code, changes=payload.get("changes", {}))
+    return jsonify(row)
+
+@app.route('/api/<table>/bulk', methods=['POST'])
+def bulk_adjust(table):
+    """批量调整：上传 CSV（attribute_code、row_version 及要修改的列），缺少版本号返回 400，任一行冲突则整批不生效"""
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({"error": "缺少上传文件 file"}), 400
+    changed_by = request.form.get('changed_by', 'expert')
+    store = admin_store()
+    try:
+        store.sync_from_csv(table)
+        updated = store.bulk_update(table, pd.read_csv(upload, dtype={"attribute_code": str}), changed_by)
+    except VersionConflict as e:
+        return _conflict_response(e)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    log_grading_change("bulk_adjust", changed_by, table=table, rows=updated)
+    return jsonify({"updated": updated})
+
+@app.route('/api/<table>/conflicts', methods=['GET'])
+def list_conflicts(table):
+    """流水线重新生成时与人工调整冲突的行"""
+    store = admin_store()
+    try:
+        store.sync_from_csv(table)
+        return jsonify(store.conflicts(table))
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+
+@app.route('/api/<table>/conflicts/<attribute_code>', methods=['POST'])
+def resolve_conflict(table, attribute_code):
+    """处理冲突：{"row_version": n, "accept_pipeline": true/false, "changed_by": "..."}"""
+    payload = request.get_json(force=True)
+    if payload.get("row_version") is None:
+        return jsonify({"error": "缺少 row_version"}), 400
+    changed_by = payload.get("changed_by", "expert")
+    store = admin_store()
+    try:
+        store.resolve_conflict(table, attribute_code, payload["row_version"],
+                               bool(payload.get("accept_pipeline")), changed_by)
+    except VersionConflict as e:
+        return _conflict_response(e)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    log_grading_change("resolve_conflict", changed_by, table=table, attribute_code=attribute_code,
+                       accept_pipeline=bool(payload.get("accept_pipeline")))
+    return jsonify({"resolved": attribute_code})
+
+@app.route('/api/<table>/export', methods=['POST', 'GET'])
+def export_table(table):
+    """按原 CSV 布局写回流水线使用的文件（供下游步骤读取），并返回该文件"""
+    store = admin_store()
+    try:
+        store.sync_from_csv(table)
+        path = store.export_csv(table)
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    return send_file(path, mimetype="text/csv", as_attachment=True, download_name=path.name)
+
 @app.route('/generate_grading')
 def trigger_grading():
     """触发分级生成"""
@@ -65,6 +175,23 @@ def trigger_grading():
         error_msg = f"生成失败: {str(e)}"
         return render_template_string(ERROR_HTML, error=error_msg), 500
 
+@app.route('/history')
+def change_history():
+    """变更历史：按时间范围、操作类型、操作人分页查询（走日志索引，不读全量）"""
+    filters = {k: request.args.get(k) or None for k in ("start", "end", "action_type", "changed_by")}
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = 50
+    log = get_changelog(GRADING_DIR / "history" / "changelog.db",
+                        legacy_csv=GRADING_DIR / "history" / "changelog.csv")
+    events = log.query(**filters, limit=page_size + 1, offset=(page - 1) * page_size)
+    return render_template_string(
+        HISTORY_HTML,
+        events=events[:page_size],
+        filters=filters,
+        page=page,
+        has_next=len(events) > page_size,
+    )
+
 # 页面模板
 GRADING_HTML = """
 <!DOCTYPE html>
@@ -93,6 +220,7 @@ GRADING_HTML = """
 <body>
     <h1>跨境数据属性分级管理</h1>
     <button onclick="generateGrading()">重新生成分级</button>
+    <a href="{{ url_for('change_history') }}">变更历史</a>
     
     <div class="container">
         <div>
@@ -102,15 +230,22 @@ GRADING_HTML = """
                     <th>属性代码</th>
                     <th>属性名称</th>
                     <th>敏感级别</th>
+                    <th>版本</th>
                 </tr>
                 {% for item in data %}
                 <tr>
                     <td>{{ item.attribute_code }}</td>
                     <td>{{ item.attribute_chinese }}</td>
                     <td>{{ item.sensitivity_level }}</td>
+                    <td>{{ item.row_version }}</td>
                 </tr>
                 {% endfor %}
             </table>
+            <p>
+                {% if page > 1 %}<a href="{{ url_for('grading_management', page=page - 1, category_id=category_id) }}">上一页</a>{% endif %}
+                第 {{ page }} 页
+                {% if has_next %}<a href="{{ url_for('grading_management', page=page + 1, category_id=category_id) }}">下一页</a>{% endif %}
+            </p>
         </div>
         
         <div class="report-box">
@@ -139,6 +274,49 @@ GRADING_HTML = """
 </html>
 """
 
+HISTORY_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>分级变更历史</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 2rem; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f5f7fa; }
+        form input { margin-right: 1rem; }
+    </style>
+</head>
+<body>
+    <h1>分级变更历史</h1>
+    <form method="get">
+        起始 <input name="start" value="{{ filters.start or '' }}" placeholder="2025-03-01">
+        截止 <input name="end" value="{{ filters.end or '' }}" placeholder="2025-04-01">
+        操作 <input name="action_type" value="{{ filters.action_type or '' }}">
+        操作人 <input name="changed_by" value="{{ filters.changed_by or '' }}">
+        <input type="submit" value="查询">
+    </form>
+    <table>
+        <tr><th>时间</th><th>操作</th><th>操作人</th><th>详情</th></tr>
+        {% for e in events %}
+        <tr>
+            <td>{{ e.timestamp }}</td>
+            <td>{{ e.action_type }}</td>
+            <td>{{ e.changed_by }}</td>
+            <td>{% for k, v in e.items() if k not in ('timestamp', 'action_type', 'changed_by') %}{{ k }}={{ v }} {% endfor %}</td>
+        </tr>
+        {% endfor %}
+    </table>
+    <p>
+        {% if page > 1 %}<a href="{{ url_for('change_history', page=page - 1, **filters) }}">上一页</a>{% endif %}
+        第 {{ page }} 页
+        {% if has_next %}<a href="{{ url_for('change_history', page=page + 1, **filters) }}">下一页</a>{% endif %}
+        | <a href="{{ url_for('grading_management') }}">返回分级管理</a>
+    </p>
+</body>
+</html>
+"""
+
 ERROR_HTML = """
 <!DOCTYPE html>
 <html>
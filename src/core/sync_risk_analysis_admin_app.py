@@ -1,15 +1,16 @@
-from flask import Flask, request, render_template_string, redirect, url_for  # 导入 Flask 相关模块
+from flask import Flask, request, render_template_string, redirect, url_for, jsonify  # 导入 Flask 相关模块
 import pandas as pd  # 导入 pandas 用于数据处理
 import numpy as np  # 导入 numpy 用于数值计算
 from pathlib import Path  # 导入 Path 用于路径操作
 import subprocess  # 导入 subprocess 用于执行外部脚本
 import os  # 导入 os 用于系统操作
 import yaml  # 导入 yaml 用于解析 YAML 配置文件
-from pgmpy.estimators import BicScore, HillClimbSearch  # 导入贝叶斯网络相关模块
-from pgmpy.models import BayesianNetwork  # 导入贝叶斯网络模型
-from pgmpy.estimators import MaximumLikelihoodEstimator  # 导入最大似然估计器
-from scipy.stats import entropy  # 导入 entropy 用于计算条件熵
+import threading  # 导入 threading 用于串行化参数修改
 import traceback  # 导入 traceback 用于捕获异常堆栈
+from param_dependencies import IncompatibleArtifacts, ParameterTuner, apply_assignments, dependent_artifacts, risk_factors, save_params  # 参数依赖跟踪与定向重算
+from artifact_store import ArtifactStore  # 产物原子发布与版本固定读取
+from grading_generator import render_validation_report  # 分级验证报告渲染
+from report_stats import load_stats  # 读取生成时保存的验证统计
 
 # 定义路径体系（与 grading_generator.py 完全一致）
 BASE_DIR = Path(__file__).resolve().parent.parent.parent / "data"  # 基础路径
@@ -27,6 +28,7 @@ def load_risk_parameters():
 
 def calculate_conditional_entropy(df, target_col):
     """计算条件熵 H(A|C)"""
+    from scipy.stats import entropy  # 延迟导入：只有执行风险分析时才加载 scipy
     grouped = df.groupby('category_id')[target_col].value_counts(normalize=True)  # 按类别分组并计算频率
     cond_entropy = grouped.groupby(level=0).apply(  # 计算条件熵
         lambda x: entropy(x.values, base=2)  # 使用熵公式计算
@@ -35,6 +37,10 @@ def calculate_conditional_entropy(df, target_col):
 
 def build_bayesian_network(data):
     """构建贝叶斯网络模型"""
+    # 延迟导入：pgmpy 及其依赖加载耗时较长，浏览分级页面等请求不需要
+    from pgmpy.estimators import BicScore, HillClimbSearch, MaximumLikelihoodEstimator
+    from pgmpy.models import BayesianNetwork
+
     # 结构学习（使用 pgmpy 0.1.26 的 scoring_method）
     hc = HillClimbSearch(data)  # 先初始化 HillClimbSearch，不传入 scoring_method
     best_model = hc.estimate(scoring_method=BicScore(data))  # 在 estimate 方法中传入 scoring_method
@@ -51,7 +57,7 @@ def risk_analysis():
 
         # 加载必要数据
         print("[2/8] 加载分级数据...")
-        grading_df = pd.read_csv(GRADING_DIR / "inital_grading.csv")  # 加载分级数据
+        grading_df = ArtifactStore(GRADING_DIR).pin().read_csv("inital_grading.csv")  # 加载分级数据
 
         print("[3/8] 加载交叉属性数据...")
         cross_df = pd.read_csv(BASE_DIR / "original_data/cross_attributes.csv")  # 加载交叉属性数据
@@ -71,12 +77,13 @@ def risk_analysis():
             cpd = model.get_cpds(node)  # 获取条件概率分布
             cpd_dict[node] = cpd.values  # 存储概率值
 
-        # 计算风险概率
+        # 计算风险概率：贝叶斯网络联合概率与参数无关，单独保存为 P_base，调参时只需重乘参数因子
         print("[6/8] 计算风险指标...")
-        merged['P_risk'] = merged.apply(
-            lambda row: calculate_risk_probability(row, cpd_dict, load_risk_parameters()),  # 计算风险概率
+        merged['P_base'] = merged.apply(
+            lambda row: calculate_node_probability(row, cpd_dict),  # 计算联合概率
             axis=1
         )
+        merged['P_risk'] = merged['P_base'] * risk_factors(merged, load_risk_parameters())
 
         # 计算关联强度
         merged['R'] = merged.groupby('category_id')['P_risk'].transform(
@@ -89,7 +96,7 @@ def risk_analysis():
 
         # 保存结果
         print("[7/8] 保存结果...")
-        output_cols = ['attribute_code', 'attribute_chinese', 'sensitivity_level', 'category_id', 'P_risk', 'R', 'H']  # 修改处：增加 category_id
+        output_cols = ['attribute_code', 'attribute_chinese', 'sensitivity_level', 'category_id', 'P_base', 'P_risk', 'R', 'H']  # 修改处：增加 category_id
         # 检查 merged 数据框中是否包含所有输出列
         available_cols = merged.columns.tolist()
         missing_cols = [col for col in output_cols if col not in available_cols]
@@ -98,7 +105,7 @@ def risk_analysis():
             # 可以选择移除缺失的列或者进行其他处理
             output_cols = [col for col in output_cols if col in available_cols]
 
-        merged[output_cols].to_csv(GRADING_DIR / "risk_analysis.csv", index=False)  # 保存风险分析结果
+        ArtifactStore(GRADING_DIR).publish("risk_analysis.csv", merged[output_cols])  # 原子发布风险分析结果
 
         print("[8/8] 风险分析完成!")
         return merged[output_cols]  # 返回结果数据
@@ -107,17 +114,8 @@ def risk_analysis():
         traceback.print_exc()  # 打印异常堆栈
         raise RuntimeError(f"风险分析失败: {str(e)}")  # 抛出异常
 
-def calculate_risk_probability(row, cpd_dict, params):
-    """应用公式3.4计算风险概率"""
-    # 构建 beta 的键
-    beta_key = f"{row['attribute_code']}_{row['category_id']}"
-
-    # 获取参数（带默认值）
-    lambda_i = params['lambda'].get(row['attribute_code'], 0.5)  # 获取单属性识别系数
-    alpha_ij = params['alpha'].get(row['category_id'], 1.0)  # 获取司法管辖区加权因子
-    beta_ij = params['beta'].get(beta_key, 1.0)  # 获取风险影响因子
-
-    # 计算贝叶斯网络联合概率
+def calculate_node_probability(row, cpd_dict):
+    """计算贝叶斯网络联合概率（与风险参数无关）"""
     node_prob = 1.0
     for node in cpd_dict:  # 遍历条件概率分布
         try:
@@ -130,7 +128,39 @@ def calculate_risk_probability(row, cpd_dict, params):
             # 如果转换失败，跳过该节点
             continue
 
-    return node_prob * lambda_i * alpha_ij * beta_ij  # 返回风险概率
+    return node_prob  # 返回联合概率
+
+# ------------------------- 参数调整模块 -------------------------
+# 常驻的 ParameterTuner：修改参数时只重算受影响的行；风险分析或量化结果被其他流程重新发布后才重建
+_tuner = None
+_tuner_version = None
+_tuner_lock = threading.Lock()
+TUNER_INPUTS = ("risk_analysis.csv", "risk_quantification.csv")  # 风险分析结果与 /quantify 的输出
+
+def get_tuner(artifacts):
+    """返回与固定版本的风险分析、量化结果一致的 ParameterTuner（调用方持有 _tuner_lock）"""
+    global _tuner, _tuner_version
+    version = tuple(artifacts.versions.get(name) for name in TUNER_INPUTS)
+    if _tuner is None or None in version or version != _tuner_version:
+        _tuner = ParameterTuner(*(artifacts.read_csv(name) for name in TUNER_INPUTS), load_risk_parameters())
+        _tuner_version = version
+    return _tuner
+
+def update_risk_parameters(assignments):
+    """应用 section.key=value 形式的参数修改，重新发布依赖 P_risk 的产物并写回参数文件"""
+    global _tuner_version
+    with _tuner_lock:
+        store = ArtifactStore(GRADING_DIR)
+        artifacts = store.pin()
+        tuner = get_tuner(artifacts)
+        params = load_risk_parameters()
+        if params != tuner.params:  # 参数文件被手工修改过，先同步
+            tuner.update(params)
+        summary = tuner.update(apply_assignments(params, assignments))
+        published = store.publish_all(dependent_artifacts(tuner))
+        _tuner_version = tuple(published[name]["version"] for name in TUNER_INPUTS)
+        save_params(RISK_PARAMS_PATH, params, tuner.params)
+        return summary
 
 # ------------------------- Flask路由模块 -------------------------
 @app.route('/')
@@ -141,9 +171,10 @@ def index():
 def grading_management():
     """分级管理主界面"""
     try:
-        grading_df = pd.read_csv(GRADING_DIR / "inital_grading.csv")  # 加载分级数据
-        report_content = open(GRADING_DIR / "validation_report.html").read()  # 加载验证报告
-        risk_df = pd.read_csv(GRADING_DIR / "risk_analysis.csv") if os.path.exists(GRADING_DIR / "risk_analysis.csv") else pd.DataFrame()  # 加载风险分析结果
+        artifacts = ArtifactStore(GRADING_DIR).pin()  # 固定版本，分级与风险分析结果来自同一时刻
+        grading_df = artifacts.read_csv("inital_grading.csv")  # 加载分级数据
+        report_content = render_validation_report(load_stats(GRADING_DIR / "validation_stats.json"))  # 由分级统计结果渲染验证报告
+        risk_df = artifacts.read_csv("risk_analysis.csv") if artifacts.exists("risk_analysis.csv") else pd.DataFrame()  # 加载风险分析结果
     except Exception as e:
         print(f"界面加载错误: {str(e)}")  # 打印错误日志
         grading_df = pd.DataFrame(columns=["attribute_code", "attribute_chinese", "sensitivity_level"])  # 创建空 DataFrame
@@ -180,6 +211,21 @@ def run_risk_analysis():
     except Exception as e:
         return f"风险分析失败: {str(e)}", 500  # 返回错误信息
 
+@app.route('/risk_parameters', methods=['POST'])
+def set_risk_parameters():
+    """修改风险参数（JSON：{"set": ["alpha.GDPR=1.3", ...]}），只重算受影响的行"""
+    assignments = (request.get_json(silent=True) or {}).get("set") or request.form.getlist("set")
+    if not assignments:
+        return jsonify({"error": "缺少参数修改（set）"}), 400
+    try:
+        return jsonify(update_risk_parameters(assignments))
+    except FileNotFoundError:
+        return jsonify({"error": "暂无风险分析或量化结果，请先执行风险分析与风险量化"}), 404
+    except IncompatibleArtifacts as e:  # 已发布的结果不是当前风险分析 / 量化流程的输出
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 # ------------------------- 前端模板 -------------------------
 GRADING_HTML = """
 <!DOCTYPE html>
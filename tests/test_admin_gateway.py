@@ -0,0 +1,66 @@
+# tests/test_admin_gateway.py
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src" / "core"))
+import artifact_store
+import admin_gateway
+from artifact_store import ArtifactStore
+
+def _relocate(value, tmp_path):
+    """把仓库 data/ 下（或仓库根目录）的路径映射到 tmp_path 下的同名位置"""
+    if isinstance(value, Path):
+        if value == ROOT:
+            return tmp_path
+        try:
+            return tmp_path / "data" / value.relative_to(ROOT / "data")
+        except ValueError:
+            return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(_relocate(v, tmp_path) for v in value)
+    if isinstance(value, dict):
+        return {k: _relocate(v, tmp_path) for k, v in value.items()}
+    return value
+
+@pytest.fixture
+def isolated_data(tmp_path, monkeypatch):
+    """各模块的模块级数据路径全部指向 tmp_path，测试不会读写仓库中的 data/"""
+    names = ["admin_gateway", "admin_store", "grading_generator"] + [m[1] for m in admin_gateway.MODULES]
+    for name in names:
+        module = importlib.import_module(name)
+        for attr, value in list(vars(module).items()):
+            if attr.isupper() and _relocate(value, tmp_path) != value:
+                monkeypatch.setattr(module, attr, _relocate(value, tmp_path))
+    monkeypatch.setattr(artifact_store, "_registry", None)
+    return tmp_path
+
+def test_gateway_mounts_modules_over_shared_registry(isolated_data):
+    modules = [m for m in admin_gateway.MODULES if m[0] in ("grading", "protection")]
+    app = admin_gateway.create_app(modules)
+    client = app.test_client()
+    # 模块内的 url_for 解析到所在蓝图
+    assert client.get("/grading/").headers["Location"] == "/grading/grading"
+    assert client.get("/grading/history").status_code == 200
+
+    # 上一阶段发布的结果在同一进程内直接复用，不再读盘解析
+    registry = app.extensions["dataset_registry"]
+    store = ArtifactStore(isolated_data / "published")
+    store.publish("risk_analysis.csv", pd.DataFrame({"attribute_code": ["A001"], "P_risk": [0.5]}))
+    df = store.pin().read_csv("risk_analysis.csv")
+    cached = store.pin().read_csv("risk_analysis.csv")
+    assert np.shares_memory(df["P_risk"].to_numpy(), cached["P_risk"].to_numpy())  # 只读视图，不复制
+    try:
+        df.loc[0, "P_risk"] = 0.0  # 写时复制下只改调用方的视图，否则只读数组直接报错
+    except ValueError:
+        pass
+    assert store.pin().read_csv("risk_analysis.csv")["P_risk"].tolist() == [0.5]
+    assert registry.stats()["hits"] == 3 and registry.stats()["misses"] == 0
+    # 日志等运行时文件只写入临时目录
+    assert (isolated_data / "data/grading/history/changelog.db").exists()
+    assert not (ROOT / "data/grading/history/changelog.db").exists()
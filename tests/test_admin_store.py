@@ -0,0 +1,92 @@
+# tests/test_admin_store.py
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from admin_store import AdminStore, VersionConflict
+
+def test_versioned_updates_and_export(tmp_path):
+    csv = tmp_path / "inital_grading.csv"
+    pd.DataFrame({
+        "attribute_code": ["A001", "A002", "A003"],
+        "sensitivity_level": ["RT01", "RT02", "RT03"],
+        "category_id": [1, 2, 2],
+    }).to_csv(csv, index=False)
+    store = AdminStore(tmp_path / "admin.db", {"grading": csv})
+    assert store.sync_from_csv("grading") and not store.sync_from_csv("grading")
+    assert list(store.query("grading", category_id=2)["attribute_code"]) == ["A002", "A003"]
+
+    row = store.update("grading", "A002", {"sensitivity_level": "RT01"}, expected_version=1, changed_by="alice")
+    assert row["row_version"] == 2 and row["updated_by"] == "alice"
+    # 基于过期版本的修改被拒绝
+    with pytest.raises(VersionConflict):
+        store.update("grading", "A002", {"sensitivity_level": "RT03"}, expected_version=1)
+
+    # 批量修改中有一行冲突时整批回滚
+    bulk = pd.DataFrame({"attribute_code": ["A001", "A002"], "row_version": [1, 1], "category_id": [9, 9]})
+    with pytest.raises(VersionConflict) as e:
+        store.bulk_update("grading", bulk)
+    assert [c["attribute_code"] for c in e.value.conflicts] == ["A002"]
+    assert store.get("grading", "A001")["category_id"] == 1
+
+    store.export_csv("grading")
+    exported = pd.read_csv(csv)
+    assert list(exported.columns) == ["attribute_code", "sensitivity_level", "category_id"]
+    assert list(exported["sensitivity_level"]) == ["RT01", "RT01", "RT03"]
+    assert not store.sync_from_csv("grading")
+
+def test_resync_merges_by_key_and_keeps_adjustments(tmp_path):
+    csv = tmp_path / "inital_grading.csv"
+    frame = pd.DataFrame({
+        "attribute_code": ["A001", "A002", "A003", "A004"],
+        "sensitivity_level": ["RT01", "RT02", "RT03", "RT03"],
+        "category_id": [1, 2, 2, 3],
+    })
+    frame.to_csv(csv, index=False)
+    store = AdminStore(tmp_path / "admin.db", {"grading": csv})
+    store.sync_from_csv("grading")
+    store.update("grading", "A002", {"sensitivity_level": "RT01"}, expected_version=1)  # 与流水线冲突
+    store.update("grading", "A003", {"sensitivity_level": "RT01"}, expected_version=1)  # 流水线未改动
+    store.update("grading", "A004", {"sensitivity_level": "RT01"}, expected_version=1)  # 流水线删除
+
+    regenerated = pd.DataFrame({
+        "attribute_code": ["A001", "A002", "A003", "A005"],
+        "sensitivity_level": ["RT02", "RT03", "RT03", "RT02"],
+        "category_id": [1, 2, 2, 4],
+    })
+    regenerated.to_csv(csv, index=False)
+    assert store.import_frame("grading", pd.read_csv(csv, dtype={"attribute_code": str})) == \
+        {"inserted": 1, "updated": 1, "deleted": 0, "conflicts": 2}
+
+    rows = store.query("grading").set_index("attribute_code")
+    assert rows.loc["A001", ["sensitivity_level", "row_version"]].tolist() == ["RT02", 2]  # 流水线变更递增版本
+    assert rows.loc[["A002", "A003", "A004"], "sensitivity_level"].tolist() == ["RT01"] * 3  # 人工调整保留
+    assert rows.loc[["A002", "A003", "A004"], "row_version"].tolist() == [2, 2, 2]
+    assert rows.loc["A005", "row_version"] == 1
+    conflicts = {c["attribute_code"]: c["pipeline"] for c in store.conflicts("grading")}
+    assert conflicts["A002"]["sensitivity_level"] == "RT03" and conflicts["A004"] is None
+
+    # 采纳流水线的值，或保留人工调整
+    store.resolve_conflict("grading", "A002", 2, accept_pipeline=True)
+    store.resolve_conflict("grading", "A004", 2, accept_pipeline=True)
+    assert store.get("grading", "A002")["sensitivity_level"] == "RT03"
+    with pytest.raises(KeyError):
+        store.get("grading", "A004")
+    assert store.conflicts("grading") == []
+
+def test_updates_require_row_version(tmp_path):
+    csv = tmp_path / "inital_grading.csv"
+    pd.DataFrame({"attribute_code": ["A001"], "category_id": [1]}).to_csv(csv, index=False)
+    store = AdminStore(tmp_path / "admin.db", {"grading": csv})
+    store.sync_from_csv("grading")
+    with pytest.raises(ValueError):
+        store.update("grading", "A001", {"category_id": 2}, expected_version=None)
+    with pytest.raises(ValueError):
+        store.bulk_update("grading", pd.DataFrame({"attribute_code": ["A001"], "category_id": [2]}))
+    with pytest.raises(ValueError):
+        store.bulk_update("grading", pd.DataFrame({"attribute_code": ["A001"], "row_version": [None],
+                                                   "category_id": [2]}))
+    assert store.get("grading", "A001")["row_version"] == 1
@@ -0,0 +1,47 @@
+# tests/test_api_executor.py
+import asyncio
+import pytest
+from api.executor import ExecutorLayer, BatchCoalescer, Overloaded
+from src.core.classification import process_batch, process_request
+
+def test_batch_matches_single():
+    records = [{"risk_factor": 0.7}, {"risk_factor": 0.2}, {}]
+    assert process_batch(records) == [process_request(r) for r in records]
+
+def test_coalescer_groups_requests_and_applies_backpressure():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(len(items))
+        return process_batch(items)
+
+    async def scenario():
+        layer = ExecutorLayer(process_workers=0, thread_workers=2, max_pending_heavy=1)
+        batcher = BatchCoalescer(batch_fn, layer.run_heavy, max_batch=10, max_delay=0.01)
+        results = await asyncio.gather(*[batcher.submit({"risk_factor": i / 10}) for i in range(10)])
+        # 队列已满时立即拒绝
+        layer._pending["heavy"] = 1
+        with pytest.raises(Overloaded):
+            await layer.run_heavy(len, [])
+        layer.shutdown()
+        return results
+
+    results = asyncio.run(scenario())
+    assert calls == [10]
+    assert results[:6] == ["Low Risk"] * 6 and results[6:] == ["High Risk"] * 4
+
+def test_invalid_record_fails_only_its_own_request():
+    async def scenario():
+        layer = ExecutorLayer(process_workers=0, thread_workers=1)
+        batcher = BatchCoalescer(process_batch, layer.run_heavy, max_batch=3, max_delay=0.01)
+        results = await asyncio.gather(
+            batcher.submit({"risk_factor": 0.9}), batcher.submit({"risk_factor": "high"}), batcher.submit({}),
+            return_exceptions=True,
+        )
+        layer.shutdown()
+        return results, batcher._tasks
+
+    (good, bad, missing), tasks = asyncio.run(scenario())
+    assert good == "High Risk" and missing == "Low Risk"
+    assert isinstance(bad, TypeError)
+    assert not tasks
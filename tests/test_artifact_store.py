@@ -0,0 +1,74 @@
+# tests/test_artifact_store.py
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from artifact_store import ArtifactStore, PinExpired
+
+def _frame(version, rows=2000):
+    return pd.DataFrame({"attribute_code": [f"A{i:05d}" for i in range(rows)], "version": version})
+
+def test_pinned_reads_see_complete_consistent_versions(tmp_path):
+    store = ArtifactStore(tmp_path, keep=3)
+    store.publish_all({"risk_quantification.csv": _frame(0), "risk_weights.json": {"version": 0}})
+    errors = []
+
+    def writer():
+        for v in range(1, 30):
+            store.publish_all({"risk_quantification.csv": _frame(v), "risk_weights.json": {"version": v}})
+
+    def read(pinned):
+        return pinned.read_csv("risk_quantification.csv"), pinned.read_json("risk_weights.json")
+
+    def reader():
+        for _ in range(60):
+            try:
+                df, weights = store.read_pinned(read, attempts=10)
+            except Exception as e:
+                errors.append(e)
+                continue
+            if len(df) != 2000 or df["version"].nunique() != 1 or df["version"][0] != weights["version"]:
+                errors.append((len(df), weights))
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    # 原路径始终是最新完整版本，旧版本只保留 keep 个
+    assert pd.read_csv(tmp_path / "risk_quantification.csv")["version"].eq(29).all()
+    assert len(list((tmp_path / ".artifacts").glob("risk_quantification.csv.v*"))) == 3
+    assert not list(tmp_path.glob(".*.tmp"))
+
+def test_pruned_pin_raises_instead_of_falling_back(tmp_path):
+    store = ArtifactStore(tmp_path, keep=2)
+    store.publish("risk_weights.json", {"version": 1})
+    pinned = store.pin()
+    for v in range(2, 5):
+        store.publish("risk_weights.json", {"version": v})
+    with pytest.raises(PinExpired):
+        pinned.read_json("risk_weights.json")  # 不会悄悄读到原路径上的 v4
+    assert store.read_pinned(lambda p: p.read_json("risk_weights.json")) == {"version": 4}
+    # 未经发布器写入的文件仍按原路径读取
+    (tmp_path / "legacy.csv").write_text("a\n1\n")
+    assert store.pin().read_csv("legacy.csv")["a"].tolist() == [1]
+
+def test_publish_returns_the_version_it_wrote(tmp_path, monkeypatch):
+    store = ArtifactStore(tmp_path)
+    commit = store._commit
+
+    def commit_then_concurrent_publish(staged):
+        manifest = commit(staged)
+        # 锁释放后、返回前另一个写入方又发布了一次
+        monkeypatch.setattr(store, "_commit", commit)
+        store.publish("risk_weights.json", {"version": 2})
+        return manifest
+
+    monkeypatch.setattr(store, "_commit", commit_then_concurrent_publish)
+    assert store.publish("risk_weights.json", {"version": 1})["version"] == 1
+    assert store.manifest()["risk_weights.json"]["version"] == 2
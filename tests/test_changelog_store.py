@@ -0,0 +1,34 @@
+# tests/test_changelog_store.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from changelog_store import ChangeLog
+
+def test_buffered_append_and_range_query(tmp_path):
+    legacy = tmp_path / "changelog.csv"
+    legacy.write_text("timestamp,action,changed_by\n2025-03-01T10:00:00,auto_generate,system\n")
+    log = ChangeLog(tmp_path / "changelog.db", batch_size=10, flush_interval=3600, legacy_csv=legacy)
+    for day in range(2, 6):
+        log.append("manual_adjust", "alice", timestamp=f"2025-03-0{day}T09:00:00", attribute_code=f"A00{day}")
+    log.append("auto_sync", timestamp="2025-03-06T09:00:00", backup_file="snapshots@v2")
+
+    events = log.query(start="2025-03-03", end="2025-03-05", action_type="manual_adjust")
+    assert [e["attribute_code"] for e in events] == ["A004", "A003"]
+    assert log.query(changed_by="system", limit=1)[0]["backup_file"] == "snapshots@v2"
+    assert log.count() == 6
+    log.close()
+    # 重新打开后不会重复导入旧日志
+    assert ChangeLog(tmp_path / "changelog.db", legacy_csv=legacy).count() == 6
+
+def test_idle_buffer_is_flushed_by_timer(tmp_path):
+    import time
+    log = ChangeLog(tmp_path / "changelog.db", batch_size=100, flush_interval=0.05)
+    log.append("manual_adjust", "alice", attribute_code="A001")
+    reader = ChangeLog(tmp_path / "changelog.db")  # 另一个进程的视角：只看已落盘的事件
+    deadline = time.monotonic() + 5
+    while reader.count() == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reader.count() == 1
+    log.close()
+    reader.close()
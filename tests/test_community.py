@@ -0,0 +1,56 @@
+# tests/test_community.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.community import CommunityDetector, modularity, symmetric_adjacency
+from ucap.memory_graph import InMemoryGraph
+
+def _two_cliques():
+    codes = [f"A{i}" for i in range(5)] + [f"B{i}" for i in range(5)]
+    pairs = [(f"{g}{i}", f"{g}{j}") for g in "AB" for i in range(5) for j in range(i + 1, 5)]
+    pairs.append(("A0", "B0"))  # 两组之间只有一条弱关联
+    nodes = pd.DataFrame({"code": codes, "category": ["C1"] * 4 + ["C2"] + ["C2"] * 5, "risk": 0.5})
+    edges = pd.DataFrame(pairs, columns=["source", "target"]).assign(strength=1.0)
+    edges.loc[edges.index[-1], "strength"] = 0.1
+    return InMemoryGraph.from_edges(nodes, edges)
+
+def test_finds_cliques_and_reports_modularity():
+    graph = _two_cliques()
+    communities, report = CommunityDetector(seed=0, workers=2).detect(graph)
+    groups = communities.groupby("community")["code"].apply(lambda c: "".join(sorted({x[0] for x in c})))
+    assert sorted(groups) == ["A", "B"]
+    assert report["communities"] == 2 and report["edges"] == 21
+    assert 0.45 < report["modularity"] < 0.5
+
+    suggestions = CommunityDetector.suggest_categories(communities)
+    assert suggestions.to_dict("records") == [{"code": "A4", "category": "C2", "suggested_category": "C1"}]
+
+def test_modularity_matches_definition():
+    rng = np.random.default_rng(1)
+    n = 30
+    graph = InMemoryGraph.from_edges(
+        pd.DataFrame({"code": np.arange(n).astype(str), "risk": 0.1}),
+        pd.DataFrame({"source": rng.integers(n, size=80).astype(str), "target": rng.integers(n, size=80).astype(str),
+                      "strength": rng.random(80)}),
+    )
+    adjacency = symmetric_adjacency(graph.indptr, graph.indices, graph.strength, n)
+    labels = rng.integers(3, size=n)
+    a = adjacency.toarray()
+    k, two_m = a.sum(axis=1), a.sum()
+    expected = sum(a[i, j] - k[i] * k[j] / two_m for i in range(n) for j in range(n) if labels[i] == labels[j])
+    assert np.isclose(modularity(adjacency, labels), expected / two_m)
+
+def test_graph_exports_category_suggestions(tmp_path):
+    graph = _two_cliques()
+    output = tmp_path / "suggestions.csv"
+    suggestions = graph.suggest_categories(output, detector=CommunityDetector(seed=0, workers=1))
+    assert suggestions.to_dict("records") == [{"code": "A4", "category": "C2", "suggested_category": "C1"}]
+    assert pd.read_csv(output).equals(suggestions)
+    assert len(set(graph.community[:5])) == 1 and graph.community[0] != graph.community[5]
+    # 增量更新后社区编号失效
+    graph.apply_delta([("A5", "C1", 0.5)], [], ["A5"], [("A5", "A0", 1.0)])
+    assert (graph.community == -1).all()
@@ -0,0 +1,69 @@
+# tests/test_driver_manager.py
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.driver_manager import run_read_queries
+
+class _FakeAsyncDriver:
+    """每个查询耗时 0.1 秒的异步驱动替身"""
+
+    def session(self, database=None):
+        return _FakeAsyncSession()
+
+class _FakeAsyncSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        await asyncio.sleep(0.1)
+        return _FakeResult([{"query": query, **params}])
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def data(self):
+        return self.rows
+
+def test_independent_reads_run_concurrently():
+    queries = [(f"RETURN {i}", {"i": i}) for i in range(5)]
+    start = time.perf_counter()
+    results = asyncio.run(run_read_queries(queries, driver=_FakeAsyncDriver()))
+    assert time.perf_counter() - start < 0.4
+    assert [r[0]["i"] for r in results] == list(range(5))
+
+def test_sync_reads_reuse_one_async_driver(monkeypatch):
+    import ucap.driver_manager as dm
+
+    created = []
+
+    class _Factory:
+        @staticmethod
+        def driver(uri, auth=None, **kwargs):
+            driver = _FakeAsyncDriver()
+            driver.closed = False
+
+            async def close():
+                driver.closed = True
+
+            driver.close = close
+            created.append(driver)
+            return driver
+
+    monkeypatch.setattr(dm, "AsyncGraphDatabase", _Factory)
+    assert dm.read_concurrently([("RETURN 1", {"i": 1})])[0][0]["i"] == 1
+    assert dm.read_concurrently([("RETURN 2", {"i": 2}), ("RETURN 3", {"i": 3})])[1][0]["i"] == 3
+    assert len(created) == 1  # 同一个连接池跨调用复用
+    thread = dm._loop_thread
+    dm.close_all()
+    assert created[0].closed and not thread.is_alive() and not dm._async_drivers
+    # 关闭后再次读取会重新创建
+    dm.read_concurrently([("RETURN 4", {})])
+    assert len(created) == 2
+    dm.close_all()
@@ -0,0 +1,61 @@
+# tests/test_graph_builder.py
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.graph_builder import KnowledgeGraph
+
+class _FakeSession:
+    """记录语句的 Neo4j 会话替身：run 返回预设记录，execute_write 记录批次"""
+
+    def __init__(self, calls, records=()):
+        self.calls = calls
+        self.records = list(records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.calls.append((query, params))
+        counters = SimpleNamespace(properties_set=3)
+        return _Result(self.records, counters)
+
+    def execute_write(self, fn, query, rows):
+        self.calls.append((query, rows))
+
+class _Result(list):
+    def __init__(self, records, counters):
+        super().__init__(records)
+        self.counters = counters
+
+    def consume(self):
+        return SimpleNamespace(counters=self.counters)
+
+def _knowledge_graph(calls, records=()):
+    kg = KnowledgeGraph.__new__(KnowledgeGraph)
+    kg.driver = SimpleNamespace(session=lambda **kw: _FakeSession(calls, records))
+    return kg
+
+def test_risk_scores_use_one_set_based_statement():
+    calls = []
+    assert _knowledge_graph(calls).calculate_risk_scores(edge_coefficient=0.3) == 3
+    assert len(calls) == 1 and calls[0][1] == {"coefficient": 0.3}
+    assert "IN TRANSACTIONS" in calls[0][0]
+
+def test_perturbation_is_batched_and_reproducible():
+    edge_ids = [{"id": f"5:r:{i}"} for i in range(1000)]
+    reports, writes = [], []
+    for _ in range(2):
+        calls = []
+        reports.append(_knowledge_graph(calls, edge_ids).apply_differential_privacy(epsilon=0.2, seed=11, batch_size=40))
+        writes.append(calls[1:])  # 第一条为读取边 id
+    report = reports[0]
+    assert reports[0] == reports[1] and writes[0] == writes[1]
+    assert report["perturbed"] == report["deleted"] + report["updated"] and 100 < report["perturbed"] < 300
+    # 每批最多 batch_size 行，总行数与报告一致
+    assert all(len(rows) <= 40 for _, rows in writes[0])
+    assert sum(len(rows) for _, rows in writes[0]) == report["perturbed"]
@@ -0,0 +1,41 @@
+# tests/test_graph_sync.py
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.graph_sync import Debouncer, GraphSynchronizer
+from ucap.memory_graph import InMemoryGraph
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=["属性代码", "类别", "隐私风险L", "关联属性"]).to_csv(path, index=False)
+
+def _structure(graph):
+    nodes = graph.nodes().set_index("code")["risk"].to_dict()
+    edges = sorted(zip(graph.edges()["source"], graph.edges()["target"]))
+    return nodes, edges
+
+def test_incremental_sync_matches_full_rebuild(tmp_path):
+    csv = tmp_path / "risk_data.csv"
+    _write(csv, [("A", "C1", 0.9, "B;NEW"), ("B", "C1", 0.5, "C"), ("C", "C2", 0.3, None), ("D", "C2", 0.1, "A")])
+    graph = InMemoryGraph()
+    sync = GraphSynchronizer(graph, csv, drop_prob=0.0, seed=0)
+    assert sync.sync()["mode"] == "full"
+
+    # 修改 B、删除 D、新增被 A 引用的 NEW
+    _write(csv, [("A", "C1", 0.9, "B;NEW"), ("B", "C1", 0.7, "A"), ("C", "C2", 0.3, None), ("NEW", "C3", 0.4, "C")])
+    summary = sync.sync()
+    assert summary == {"mode": "incremental", "added": 1, "changed": 1, "deleted": 1, "relinked": 3, "edges": 4}
+    assert _structure(graph) == _structure(InMemoryGraph().build_graph(csv, drop_prob=0.0))
+    assert sync.sync()["relinked"] == 0
+
+def test_debouncer_coalesces_bursts():
+    calls = []
+    debouncer = Debouncer(0.05, lambda: calls.append(threading.get_ident()))
+    for _ in range(5):
+        debouncer.trigger()
+    time.sleep(0.2)
+    assert len(calls) == 1
@@ -0,0 +1,78 @@
+# tests/test_incremental_grading.py
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+import grading_generator
+
+RULES = {"rules": [{"category_id": 1, "sensitivity_level": "RT01"},
+                   {"category_id": 2, "sensitivity_level": "RT02"},
+                   {"category_id": 3, "sensitivity_level": "RT03"}]}
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    (tmp_path / "original_data").mkdir()
+    (tmp_path / "classification").mkdir()
+    (tmp_path / "grading/config").mkdir(parents=True)
+    monkeypatch.setattr(grading_generator, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(grading_generator, "GRADING_DIR", tmp_path / "grading")
+    monkeypatch.setattr(grading_generator, "CONFIG_DIR", tmp_path / "grading/config")
+    return tmp_path
+
+def _write_inputs(data_dir, cross, detail, rules):
+    cross.to_csv(data_dir / "original_data/cross_attributes.csv", index=False)
+    detail.to_csv(data_dir / "classification/attribute_category_detail.csv", index=False)
+    with open(data_dir / "grading/config/grading_rules.yaml", "w") as f:
+        yaml.dump(rules, f)
+
+def test_incremental_matches_full_regrade(data_dir):
+    codes = [f"A{i:03d}" for i in range(1, 41)]
+    cross = pd.DataFrame({"attribute_code": codes, "attribute_chinese": [f"属性{i}" for i in range(40)]})
+    detail = pd.DataFrame({"attribute_code": codes, "category_id": [i % 4 + 1 for i in range(40)]})
+    _write_inputs(data_dir, cross, detail, RULES)
+    assert grading_generator.generate_grading()["mode"] == "full"
+    assert grading_generator.generate_grading(incremental=True)["regraded"] == 0
+
+    # 改名、改类别、删除、插入，并调整类别 3 的分级规则
+    cross.loc[0, "attribute_chinese"] = "改名"
+    detail.loc[1, "category_id"] = 1
+    cross = pd.concat([cross.drop(index=[5]).iloc[:10], pd.DataFrame({"attribute_code": ["B001"], "attribute_chinese": ["新"]}),
+                       cross.drop(index=[5]).iloc[10:]], ignore_index=True)
+    detail = pd.concat([detail, pd.DataFrame({"attribute_code": ["B001"], "category_id": [2]})], ignore_index=True)
+    rules = {"rules": RULES["rules"][:2] + [{"category_id": 3, "sensitivity_level": "RT01"}]}
+    _write_inputs(data_dir, cross, detail, rules)
+
+    summary = grading_generator.generate_grading(incremental=True)
+    # 改名 1 行 + 改类别 1 行 + 新增 1 行 + 类别 3 的 10 行
+    assert summary == {"mode": "incremental", "regraded": 13, "deleted": 1}
+    incremental = (data_dir / "grading/inital_grading.csv").read_bytes()
+    grading_generator.generate_grading()
+    assert incremental == (data_dir / "grading/inital_grading.csv").read_bytes()
+
+def test_incremental_commits_row_delta(data_dir):
+    codes = [f"A{i:03d}" for i in range(1, 31)]
+    cross = pd.DataFrame({"attribute_code": codes, "attribute_chinese": [f"属性{i}" for i in range(30)]})
+    detail = pd.DataFrame({"attribute_code": codes, "category_id": [i % 3 + 1 for i in range(30)]})
+    _write_inputs(data_dir, cross, detail, RULES)
+    grading_generator.generate_grading()
+
+    # 原位修改、删除、末尾追加：快照库只提交变化的行
+    cross.loc[3, "attribute_chinese"] = "改名"
+    cross = pd.concat([cross.drop(index=[7]), pd.DataFrame({"attribute_code": ["B001"], "attribute_chinese": ["新"]})],
+                      ignore_index=True)
+    detail = pd.concat([detail, pd.DataFrame({"attribute_code": ["B001"], "category_id": [1]})], ignore_index=True)
+    _write_inputs(data_dir, cross, detail, RULES)
+    assert grading_generator.generate_grading(incremental=True) == {"mode": "incremental", "regraded": 2, "deleted": 1}
+
+    output = pd.read_csv(data_dir / "grading/inital_grading.csv")
+    head = grading_generator.grading_store().versions()[-1]
+    assert (head["kind"], head["changed"], head["deleted"]) == ("delta", 2, 1)
+    pd.testing.assert_frame_equal(grading_generator.grading_store().load(head["version"]), output, check_dtype=False)
+
+    # 输出被其他发布覆盖后不再增量
+    grading_generator.publish_bytes(data_dir / "grading/inital_grading.csv", b"attribute_code\n")
+    assert grading_generator.generate_grading(incremental=True)["mode"] == "full"
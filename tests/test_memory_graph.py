@@ -0,0 +1,63 @@
+# tests/test_memory_graph.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.graph_builder import create_knowledge_graph, edge_records
+from ucap.memory_graph import InMemoryGraph
+from ucap.policy_mapper import PolicyGenerator
+
+def _risk_csv(tmp_path):
+    path = tmp_path / "risk_data.csv"
+    pd.DataFrame({
+        "属性代码": ["ID_CARD", "NAME", "PHONE", "ADDR"],
+        "类别": ["C1", "C1", "C2", None],
+        "隐私风险L": [0.9, 0.5, 0.6, 0.2],
+        "关联属性": ["NAME;PHONE", "ADDR", "ID_CARD;MISSING", None],
+    }).to_csv(path, index=False)
+    return path
+
+class _RecordingGraph:
+    def load_graph(self, node_chunks, edge_chunks, batch_size):
+        self.nodes = [r for chunk in node_chunks for r in chunk]
+        self.edges = [r for chunk in edge_chunks for r in chunk]
+
+def test_memory_backend_matches_neo4j_semantics(tmp_path, monkeypatch):
+    monkeypatch.delenv("NEO4J_URI", raising=False)
+    monkeypatch.delenv("UCAP_GRAPH_BACKEND", raising=False)
+    csv = _risk_csv(tmp_path)
+    graph = create_knowledge_graph().build_graph(csv, drop_prob=0.0, seed=7)
+    assert isinstance(graph, InMemoryGraph)
+    # 端点不存在的关联（MISSING）被忽略
+    assert graph.n_nodes == 4 and graph.n_edges == 4
+    assert list(graph.neighbors("ID_CARD")[0]) == ["NAME", "PHONE"]
+
+    # 与 Neo4j 导入使用相同的扰动决策
+    expected = edge_records(pd.read_csv(csv), np.random.default_rng(7), drop_prob=0.0)
+    strength = {(e["source"], e["target"]): e["strength"] for e in expected}
+    edges = graph.edges()
+    assert np.allclose(edges["strength"], [strength[(s, t)] for s, t in zip(edges["source"], edges["target"])])
+
+    weights = graph.calculate_risk_scores()
+    assert np.isclose(weights[0], 0.9 + 0.1 * graph.neighbors("ID_CARD")[1].sum())
+    assert weights[3] == 0.2
+    assert np.isclose(graph.calculate_risk_scores(edge_coefficient=0.5)[1], 0.5 + 0.5 * graph.neighbors("NAME")[1].sum())
+
+    matrix = PolicyGenerator(graph).generate_lsss()
+    assert matrix[0, 0] == 9.0 and matrix[0, 1] == 1 and matrix[0, 2] == 1 and matrix[0, 3] == 0
+
+    recorder = _RecordingGraph()
+    graph.sync_to(recorder)
+    assert len(recorder.nodes) == 4 and recorder.nodes[3]["category"] is None and len(recorder.edges) == 4
+
+def test_seeded_perturbation_is_reproducible(tmp_path):
+    csv = _risk_csv(tmp_path)
+    runs = []
+    for _ in range(2):
+        graph = InMemoryGraph().build_graph(csv, drop_prob=0.0, seed=1)
+        graph.apply_differential_privacy(epsilon=0.9, seed=3)
+        runs.append(graph.edges())
+    pd.testing.assert_frame_equal(runs[0], runs[1])
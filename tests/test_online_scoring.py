@@ -0,0 +1,115 @@
+# tests/test_online_scoring.py
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+import pandas as pd
+import yaml
+from src.core.online_scoring import OnlineScorer, ScoringSnapshot, UnknownJurisdiction
+
+def _write_inputs(tmp_path):
+    pd.DataFrame({
+        "attribute_code": ["ID_CARD", "POSTAL_CODE"],
+        "sensitivity_level": ["RT01", "RT03"],
+        "v1": [0.9, 0.1], "v2": [1.0, 0.2], "v3": [0.8, 0.1],
+    }).to_csv(tmp_path / "quant.csv", index=False)
+    (tmp_path / "weights.json").write_text(json.dumps({"weights": [0.4, 0.4, 0.2]}))
+    (tmp_path / "params.yaml").write_text(yaml.dump({"alpha": {"GDPR": 1.2}, "beta": {"POSTAL_CODE_GDPR": 0.5}}))
+    (tmp_path / "thresholds.yaml").write_text(yaml.dump({
+        "theta_high": 1.0, "theta_low": 0.3,
+        "measures": {"high": ["加密"], "mid": ["匿名化"], "low": ["訪問控制"]},
+    }))
+
+def test_snapshot_score(tmp_path):
+    _write_inputs(tmp_path)
+    snapshot = ScoringSnapshot.load(tmp_path / "quant.csv", tmp_path / "weights.json",
+                                    tmp_path / "params.yaml", tmp_path / "thresholds.yaml")
+
+    result = snapshot.score("ID_CARD")
+    assert abs(result["L"] - (0.36 + 0.4 + 0.16 + 0.3)) < 1e-9
+    assert result["protection_measures"] == ["加密"]
+    # 与批量 L 相同，不做司法管辖区调节；未配置的管辖区被拒绝而不是回退到默认值
+    assert snapshot.score("ID_CARD", "GDPR")["L"] == result["L"]
+    assert snapshot.score("POSTAL_CODE", "GDPR")["protection_level"] == "low"
+    with pytest.raises(UnknownJurisdiction):
+        snapshot.score("POSTAL_CODE", "UNKNOWN")
+    with pytest.raises(UnknownJurisdiction):
+        snapshot.score_frame(None, "UNKNOWN")
+
+def test_online_scores_match_batch_quantify(tmp_path, monkeypatch):
+    pytest.importorskip("scipy")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+    import app_routes
+    from artifact_store import ArtifactStore
+
+    rng = np.random.default_rng(2)
+    n = 200
+    codes = [f"A{i:03d}" for i in range(n)]
+    p_risk = rng.random(n)
+    ArtifactStore(tmp_path).publish("risk_analysis.csv", pd.DataFrame({
+        "attribute_code": codes, "attribute_chinese": codes, "sensitivity_level": [f"RT0{i % 3 + 1}" for i in range(n)],
+        "category_id": rng.choice([1, 2, 3], n), "P_base": p_risk, "P_risk": p_risk, "R": 0.0, "H": 0.5,
+    }))
+    (tmp_path / "original_data").mkdir()
+    pd.DataFrame({"attribute_code": codes, "sensitivity_level_ext": rng.random(n).round(1)}).to_csv(
+        tmp_path / "original_data/cross_attributes_extended.csv", index=False)
+    params_path = tmp_path / "risk_parameters.yaml"
+    monkeypatch.setattr(app_routes, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(app_routes, "GRADING_DIR", tmp_path)
+    monkeypatch.setattr(app_routes, "RISK_PARAMS_PATH", params_path)
+    assert app_routes.app.test_client().get("/quantify").status_code == 200
+
+    # 在线快照读取 /quantify 写出的同一个参数文件与量化结果
+    snapshot = ScoringSnapshot.load(tmp_path / "risk_quantification.csv", tmp_path / "risk_weights.json",
+                                    params_path, tmp_path / "thresholds.yaml")
+    batch = pd.read_csv(tmp_path / "risk_quantification.csv")
+    online = [snapshot.score(code)["L"] for code in batch["attribute_code"]]
+    np.testing.assert_allclose(online, batch["L"], rtol=0, atol=1e-12)
+    frame = snapshot.score_frame(batch["attribute_code"].tolist())
+    np.testing.assert_allclose(frame["L"], batch["L"], rtol=0, atol=1e-12)
+
+def test_api_rejects_unknown_jurisdiction(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import api.app as api
+
+    _write_inputs(tmp_path)
+    monkeypatch.setattr(api, "scorer", OnlineScorer(
+        quant_path=tmp_path / "quant.csv", weights_path=tmp_path / "weights.json",
+        params_path=tmp_path / "params.yaml", thresholds_path=tmp_path / "thresholds.yaml"))
+    with TestClient(api.app) as client:
+        assert client.get("/score/ID_CARD", params={"jurisdiction": "GDPR"}).status_code == 200
+        assert client.get("/score/ID_CARD", params={"jurisdiction": "MARS"}).status_code == 400
+        assert client.get("/scores", params={"jurisdiction": "MARS"}).status_code == 400
+        response = client.post("/score", json=[{"attribute_code": "ID_CARD", "jurisdiction": "MARS"}])
+        assert response.status_code == 400 and "MARS" in response.json()["detail"]
+
+def test_background_refresh_keeps_serving_old_snapshot(tmp_path, monkeypatch):
+    _write_inputs(tmp_path)
+    scorer = OnlineScorer(check_interval=0, quant_path=tmp_path / "quant.csv", weights_path=tmp_path / "weights.json",
+                          params_path=tmp_path / "params.yaml", thresholds_path=tmp_path / "thresholds.yaml")
+    assert scorer.refresh(wait=False) is None  # 未加载时不阻塞
+    old = scorer.refresh()
+
+    load = ScoringSnapshot.load.__func__
+    monkeypatch.setattr(ScoringSnapshot, "load", classmethod(lambda cls, **kw: (time.sleep(0.2), load(cls, **kw))[1]))
+    (tmp_path / "weights.json").write_text(json.dumps({"weights": [0.25, 0.4, 0.35]}))
+    assert scorer.refresh(wait=False) is old  # 重建期间继续返回旧快照
+    deadline = time.monotonic() + 5
+    while scorer.snapshot is old and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert scorer.refresh(wait=False) is not old
+
+def test_binary_formats_roundtrip():
+    pa = pytest.importorskip("pyarrow")
+    pytest.importorskip("msgpack")
+    from src.core.serialization import negotiate, encode_frame, decode_msgpack, ARROW_STREAM, MSGPACK, CSV
+    df = pd.DataFrame({"attribute_code": ["A001", "A002"], "L": [0.5, 1.25]})
+    assert negotiate("application/x-msgpack;q=0.5, application/vnd.apache.arrow.stream") == ARROW_STREAM
+    assert negotiate(None, default=CSV) == CSV
+    table = pa.ipc.open_stream(encode_frame(df, ARROW_STREAM)).read_all()
+    assert table.column("L").to_pylist() == [0.5, 1.25]
+    assert decode_msgpack(encode_frame(df, MSGPACK)).equals(df)
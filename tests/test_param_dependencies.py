@@ -0,0 +1,119 @@
+# tests/test_param_dependencies.py
+import copy
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from artifact_store import ArtifactStore
+from param_dependencies import IncompatibleArtifacts, ParameterTuner, dependent_artifacts, risk_factors
+
+pytest.importorskip("scipy")
+import app_routes
+
+def _risk_analysis(codes, categories, base, params):
+    """按 risk_analysis 的公式由 P_base 和参数得到 P_risk / R"""
+    df = pd.DataFrame({"attribute_code": codes, "attribute_chinese": [f"属性{c}" for c in codes],
+                       "sensitivity_level": [f"RT0{i % 3 + 1}" for i in range(len(codes))],
+                       "category_id": categories, "P_base": base, "H": 0.5})
+    df["P_risk"] = df["P_base"] * risk_factors(df, params)
+    df["R"] = df.groupby("category_id")["P_risk"].transform(lambda x: (x - x.min()) / (x.max() - x.min() + 1e-8))
+    return df
+
+@pytest.fixture
+def quantify(tmp_path, monkeypatch):
+    """重新发布风险分析结果并执行 /quantify（完整重算的基准）"""
+    rng = np.random.default_rng(0)
+    n = 300
+    codes = [f"A{i:03d}" for i in range(n)]
+    categories = rng.choice([1, 2, 3, 6], n)
+    base = rng.random(n)
+    (tmp_path / "original_data").mkdir()
+    pd.DataFrame({"attribute_code": codes, "sensitivity_level_ext": rng.random(n).round(1)}).to_csv(
+        tmp_path / "original_data/cross_attributes_extended.csv", index=False)
+    monkeypatch.setattr(app_routes, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(app_routes, "GRADING_DIR", tmp_path)
+    monkeypatch.setattr(app_routes, "RISK_PARAMS_PATH", tmp_path / "quantify_params.yaml")
+    client = app_routes.app.test_client()
+
+    def run(params):
+        ArtifactStore(tmp_path).publish("risk_analysis.csv", _risk_analysis(codes, categories, base, params))
+        assert client.get("/quantify").status_code == 200
+        pinned = ArtifactStore(tmp_path).pin()
+        return (pinned.read_csv("risk_analysis.csv"), pinned.read_csv("risk_quantification.csv"),
+                np.asarray(pinned.read_json("risk_weights.json")["weights"]))
+
+    run.codes = codes
+    return run
+
+def _assert_same(result, expected):
+    result, expected = result.reset_index(drop=True), expected.reset_index(drop=True)
+    assert list(result.columns) == list(expected.columns)
+    assert result["attribute_code"].tolist() == expected["attribute_code"].tolist()
+    for column in ("P_risk", "R", "H", "v1", "v2", "v3", "L"):
+        np.testing.assert_allclose(result[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float))
+
+def test_targeted_recompute_matches_full_quantify(quantify):
+    codes = quantify.codes
+    params = {"lambda": {codes[0]: 0.8}, "alpha": {1: 1.2}, "beta": {f"{codes[3]}_1": 1.5}}
+    analysis, quantification, weights = quantify(params)
+    tuner = ParameterTuner(analysis, quantification, params)
+    _assert_same(tuner.result(), quantification)
+    np.testing.assert_allclose(tuner.weights, weights)
+
+    edits = [("alpha", 2, 0.7), ("lambda", codes[5], 0.05), ("alpha", 6, 40.0), ("beta", f"{codes[3]}_1", 1.0)]
+    for section, key, value in edits:
+        params = copy.deepcopy(params)
+        params[section][key] = value
+        tuner.update(params)
+        analysis, quantification, weights = quantify(params)
+        _assert_same(tuner.result(), quantification)
+        np.testing.assert_allclose(tuner.weights, weights)
+        artifacts = dependent_artifacts(tuner)
+        np.testing.assert_allclose(artifacts["risk_analysis.csv"]["R"], analysis["R"])
+        np.testing.assert_allclose(artifacts["risk_weights.json"]["weights"], weights)
+    # 单个 lambda 只影响一行的 P_risk
+    assert ParameterTuner(analysis, quantification, params).update(
+        {**params, "lambda": {**params["lambda"], codes[7]: 0.9}})["p_rows"] == 1
+
+def test_admin_route_republishes_dependents_and_keeps_comments(quantify, tmp_path, monkeypatch):
+    import sync_risk_analysis_admin_app as admin
+
+    codes = quantify.codes
+    params = {"lambda": {codes[0]: 0.8}, "alpha": {1: 1.2}, "min_R": 0.05}
+    params_path = tmp_path / "params.yaml"
+    params_path.write_text("# 风险计算参数\n" + yaml.dump(params).replace("min_R: 0.05", "min_R: 0.05  # 最小关联强度"))
+    quantify(params)
+    monkeypatch.setattr(admin, "GRADING_DIR", tmp_path)
+    monkeypatch.setattr(admin, "RISK_PARAMS_PATH", params_path)
+    monkeypatch.setattr(admin, "_tuner", None)
+    client = admin.app.test_client()
+
+    assert client.post("/risk_parameters", json={"set": ["alpha.2=0.7"]}).status_code == 200
+    tuner = admin._tuner
+    response = client.post("/risk_parameters", json={"set": [f"lambda.{codes[5]}=0.05"]})
+    assert response.get_json()["p_rows"] == 1
+    assert admin._tuner is tuner  # 同一个常驻 tuner，不重新加载
+    published = ArtifactStore(tmp_path).pin()
+    published = published.read_csv("risk_analysis.csv"), published.read_csv("risk_quantification.csv")
+
+    params["alpha"][2] = 0.7
+    params["lambda"][codes[5]] = 0.05
+    analysis, quantification, weights = quantify(params)
+    np.testing.assert_allclose(published[0]["P_risk"], analysis["P_risk"])
+    _assert_same(published[1], quantification)
+    text = params_path.read_text()
+    assert text.startswith("# 风险计算参数") and "min_R: 0.05  # 最小关联强度" in text
+    assert yaml.safe_load(text) == params
+    assert client.post("/risk_parameters", json={}).status_code == 400
+
+    # 发布的结果不是风险分析 / 量化流程的输出时返回 409，而不是 500
+    ArtifactStore(tmp_path).publish("risk_analysis.csv", analysis.drop(columns=["sensitivity_level"]))
+    response = client.post("/risk_parameters", json={"set": ["alpha.2=0.8"]})
+    assert response.status_code == 409 and "sensitivity_level" in response.get_json()["error"]
+    with pytest.raises(IncompatibleArtifacts):
+        ParameterTuner(analysis, quantification.iloc[1:], params)
@@ -0,0 +1,86 @@
+# tests/test_policy_mapper.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.memory_graph import InMemoryGraph
+from ucap.policy_mapper import PolicyGenerator
+
+def _graph():
+    nodes = pd.DataFrame({"code": ["A", "B", "C", "D"], "risk": [0.9, 0.5, 0.0, 0.2]})
+    edges = pd.DataFrame({"source": ["A", "A", "A", "C", "D"], "target": ["B", "B", "C", "C", "A"],
+                          "strength": [0.6, 0.7, 0.8, 0.9, 0.5]})
+    return InMemoryGraph.from_edges(nodes, edges)
+
+def test_sparse_lsss_matches_dense_and_subsets():
+    generator = PolicyGenerator(_graph())
+    matrix, codes = generator.generate_lsss_sparse()
+    assert list(codes) == ["A", "B", "C", "D"]
+    dense = np.diag([9.0, 5.0, 0.0, 2.0])
+    dense[[0, 0, 2, 3], [1, 2, 2, 0]] = 1
+    np.testing.assert_array_equal(matrix.toarray(), dense)
+    np.testing.assert_array_equal(generator.generate_lsss(), dense)
+
+    sub, sub_codes = generator.generate_lsss_sparse(["D", "A"])
+    assert list(sub_codes) == ["D", "A"]
+    np.testing.assert_array_equal(sub.toarray(), [[2.0, 1.0], [0.0, 9.0]])
+    with pytest.raises(KeyError):
+        generator.generate_lsss_sparse(["A", "Z"])
+
+def test_propagated_risk_diagonal_uses_resident_propagator():
+    graph = _graph()
+    generator = PolicyGenerator(graph, propagated_risk=True)
+    matrix, codes = generator.generate_lsss_sparse()
+    # 对角线来自扩散风险（C 自身风险为 0，但汇集了 A 的风险）；C 的自环列仍为 1
+    assert graph.propagated_risk[2] > 0
+    expected = np.diag(graph.propagated_risk * 10)
+    expected[graph.edge_sources(), graph.indices] = 1
+    np.testing.assert_allclose(matrix.toarray(), expected)
+    np.testing.assert_allclose(generator.generate_lsss(), expected)
+
+    # 增量更新后重新扩散，复用同一个 RiskPropagator 热启动
+    graph.apply_delta([("E", None, 0.3)], [], ["E"], [("E", "B", 0.4)])
+    assert np.isnan(graph.propagated_risk).all()
+    assert generator.generate_lsss_sparse()[0].shape == (5, 5)
+    assert graph.propagate_risk()["warm_start"]
+    with pytest.raises(ValueError):
+        PolicyGenerator(driver=object(), propagated_risk=True)
+
+def test_subset_includes_indirectly_linked_attributes():
+    graph = _graph()
+    generator = PolicyGenerator(graph)
+    # D→A→C：D 在 2 跳内关联到 C，A 在 1 跳内
+    assert generator.linked_attributes(["C"], hops=1) == ["A"]
+    assert generator.linked_attributes(["C"], hops=2) == ["A", "D"]
+    matrix, codes = generator.generate_lsss_sparse(["C"], linked_hops=2)
+    assert list(codes) == ["C", "A", "D"]
+    np.testing.assert_array_equal(matrix.toarray(), [[1.0, 0.0, 0.0], [1.0, 9.0, 0.0], [0.0, 1.0, 2.0]])
+
+    # 索引随图复用，增量更新后重建
+    index = generator.reachability(2)
+    assert generator.reachability(2) is index
+    graph.apply_delta([("E", None, 0.3)], [], ["E"], [("E", "D", 0.4)])
+    assert generator.linked_attributes(["C"], hops=3) == ["A", "D", "E"]
+    assert generator.reachability(2) is not index
+
+def test_dense_lsss_fetches_all_links_at_once(monkeypatch):
+    import ucap.policy_mapper as pm
+
+    queries = []
+
+    def read(batch):
+        queries.extend(q for q, _ in batch)
+        return [[{"code": "A", "risk": 0.9}, {"code": "B", "risk": 0.5}], [{"source": "A", "target": "B"}]]
+
+    class _NoSessions:
+        def session(self):
+            raise AssertionError("不应逐属性查询")
+
+    monkeypatch.setattr(pm, "read_concurrently", read)
+    matrix = PolicyGenerator(driver=_NoSessions()).generate_lsss()
+    np.testing.assert_array_equal(matrix, [[9.0, 1.0], [0.0, 5.0]])
+    assert queries == [pm.ALL_ATTRIBUTES, pm.ALL_LINKS]
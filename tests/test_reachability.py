@@ -0,0 +1,80 @@
+# tests/test_reachability.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.memory_graph import InMemoryGraph
+from ucap.reachability import ReachabilityIndex
+
+def _bfs(succ, source, max_hops):
+    """逐层广度优先得到各属性的最短跳数（基准实现）"""
+    dist, frontier = {}, {source}
+    for h in range(1, max_hops + 1):
+        frontier = {t for s in frontier for t in succ.get(s, ())} - set(dist)
+        dist.update((t, h) for t in frontier)
+    return dist
+
+def _assert_matches(index, succ):
+    for s in index.codes:
+        dist = _bfs(succ, s, index.max_hops)
+        assert sorted(index.reachable_from(s)) == sorted(dist)
+        for t in index.codes:
+            assert index.distance(s, t) == dist.get(t)
+            chain = index.shortest_chain(s, t)
+            if t in dist:
+                assert len(chain) == dist[t] + 1 and chain[0] == s and chain[-1] == t
+                assert all(b in succ[a] for a, b in zip(chain, chain[1:]))
+            else:
+                assert chain is None
+
+def test_queries_on_chain():
+    nodes = pd.DataFrame({"code": ["ID_CARD", "NAME", "PHONE", "ADDR", "EMAIL"], "risk": 0.5})
+    edges = pd.DataFrame({"source": ["ADDR", "PHONE", "NAME", "EMAIL"],
+                          "target": ["PHONE", "NAME", "ID_CARD", "ADDR"], "strength": 0.5})
+    index = ReachabilityIndex.from_graph(InMemoryGraph.from_edges(nodes, edges), max_hops=3)
+    assert sorted(index.linked_to("ID_CARD")) == ["ADDR", "NAME", "PHONE"]
+    assert index.linked_to("ID_CARD", hops=1) == ["NAME"]
+    assert index.shortest_chain("ADDR", "ID_CARD") == ["ADDR", "PHONE", "NAME", "ID_CARD"]
+    assert not index.reachable("EMAIL", "ID_CARD")
+    assert index.reachable("EMAIL", "NAME")
+    # hops=0 表示 0 跳内（没有任何关联），而不是回退到 max_hops
+    assert not index.reachable("NAME", "ID_CARD", hops=0)
+    assert index.linked_to("ID_CARD", hops=0) == [] and index.reachable_from("ADDR", hops=0) == []
+    with pytest.raises(ValueError):
+        index.reachable_from("ADDR", hops=4)
+
+def test_size_guard_rejects_oversized_index():
+    codes = [f"A{i}" for i in range(64)]
+    edges = pd.DataFrame({"source": codes[:-1], "target": codes[1:]})
+    # 3 跳 × 64 行 × 8 字节 = 1536 字节
+    index = ReachabilityIndex.from_edges(codes, edges, max_hops=3, max_bytes=1536)
+    with pytest.raises(MemoryError, match="max_hops"):
+        index.add_node("NEW")
+    assert index.n_nodes == 64
+    with pytest.raises(MemoryError):
+        ReachabilityIndex.from_edges(codes, edges, max_hops=4, max_bytes=1536)
+
+def test_incremental_updates_match_rebuild():
+    rng = np.random.default_rng(3)
+    codes = [f"A{i}" for i in range(40)]
+    edges = pd.DataFrame({"source": rng.choice(codes, 60), "target": rng.choice(codes, 60)})
+    index = ReachabilityIndex.from_edges(codes, edges, max_hops=3)
+    succ = {}
+    for s, t in zip(edges["source"], edges["target"]):
+        succ.setdefault(s, set()).add(t)
+    for step in range(60):
+        s, t = rng.choice(codes, 2)
+        if step % 3 == 0 and succ.get(s):
+            t = sorted(succ[s])[0]
+            succ[s].discard(t)
+            index.remove_edge(s, t)
+        else:
+            succ.setdefault(s, set()).add(t)
+            index.add_edge(s, t)
+    index.add_edge("A0", "NEW")
+    succ.setdefault("A0", set()).add("NEW")
+    _assert_matches(index, succ)
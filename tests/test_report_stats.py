@@ -0,0 +1,38 @@
+# tests/test_report_stats.py
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from report_stats import StatsCollector, save_stats, load_stats
+
+def test_chunked_collection_matches_full_scan(tmp_path):
+    df = pd.DataFrame({
+        "sensitivity_level": ["RT01", "RT02", None, "RT02", "RT03", "RT02", None],
+        "category_id": [1, 2, 2, 4, 3, 2, 4],
+    })
+    collector = StatsCollector(["sensitivity_level", "category_id"])
+    stats = collector.collect(df, chunk_size=3)
+
+    assert stats["total"] == 7
+    assert stats["counts"]["sensitivity_level"] == {"RT02": 3, "RT01": 1, "RT03": 1}
+    assert stats["missing"]["sensitivity_level"] == 2
+    assert stats["counts"]["category_id"] == {"2": 3, "4": 2, "1": 1, "3": 1}
+    assert load_stats(save_stats(stats, tmp_path / "stats.json")) == stats
+
+def test_admin_page_renders_saved_stats(tmp_path, monkeypatch):
+    import grading_generator
+    import sync_risk_analysis_admin_app as admin
+    from artifact_store import ArtifactStore
+
+    monkeypatch.setattr(grading_generator, "GRADING_DIR", tmp_path)
+    monkeypatch.setattr(admin, "GRADING_DIR", tmp_path)
+    grading = pd.DataFrame({"attribute_code": ["A1", "A2", "A3"], "attribute_chinese": ["甲", "乙", "丙"],
+                            "sensitivity_level": ["RT01", "RT01", "RT03"], "category_id": [1, 1, 3]})
+    ArtifactStore(tmp_path).publish("inital_grading.csv", grading)
+    grading_generator.generate_validation_report(grading)
+    (tmp_path / "validation_report.html").unlink()  # 页面只依赖统计结果 JSON
+
+    page = admin.app.test_client().get("/grading").get_data(as_text=True)
+    assert "高敏感属性: 2" in page and "低敏感属性: 1" in page
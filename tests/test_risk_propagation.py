@@ -0,0 +1,63 @@
+# tests/test_risk_propagation.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cross-border-system" / "src"))
+from ucap.memory_graph import InMemoryGraph
+from ucap.risk_propagation import RiskPropagator, personalized_pagerank, transition_matrix
+
+def _graph(edges):
+    nodes = pd.DataFrame({"code": ["A", "B", "C", "D"], "risk": [0.1, 0.1, 0.1, 0.9]})
+    return InMemoryGraph.from_edges(nodes, pd.DataFrame(edges, columns=["source", "target", "strength"]))
+
+def test_matches_dense_solution_and_conserves_risk():
+    graph = _graph([("A", "B", 0.8), ("B", "C", 0.9), ("D", "C", 0.5), ("D", "A", 0.5)])
+    result, info = RiskPropagator(tol=1e-12).propagate(graph)
+    assert info["converged"]
+
+    # 稠密矩阵直接求解 (I - αM)x = (1-α)p，M 含悬挂节点（C）按 p 重新分配
+    p = graph.risk / graph.risk.sum()
+    strength = np.zeros((4, 4))
+    strength[graph.edge_sources(), graph.indices] = graph.strength
+    rows = strength.sum(axis=1)
+    m = np.where(rows[:, None] > 0, strength / np.where(rows > 0, rows, 1)[:, None], p[None, :]).T
+    expected = np.linalg.solve(np.eye(4) - 0.85 * m, 0.15 * p)
+    assert np.allclose(result["propagated_risk"], expected * graph.risk.sum())
+    assert np.isclose(result["propagated_risk"].sum(), graph.risk.sum())
+    # 低风险链的末端 C 汇集了上游风险
+    assert result.set_index("code").loc["C", "propagated_risk"] > 0.1
+
+def test_warm_start_converges_faster_after_small_change():
+    rng = np.random.default_rng(0)
+    n, m = 2000, 20000
+    codes = np.array([f"N{i}" for i in range(n)], dtype=object)
+    nodes = pd.DataFrame({"code": codes, "risk": rng.random(n)})
+    edges = pd.DataFrame({"source": codes[rng.integers(n, size=m)], "target": codes[rng.integers(n, size=m)],
+                          "strength": rng.random(m)})
+    propagator = RiskPropagator(tol=1e-10)
+    _, cold = propagator.propagate(InMemoryGraph.from_edges(nodes, edges))
+
+    edges.loc[:10, "strength"] = 0.01
+    nodes = pd.concat([nodes, pd.DataFrame({"code": ["NEW"], "risk": [0.5]})], ignore_index=True)
+    result, warm = propagator.propagate(InMemoryGraph.from_edges(nodes, edges))
+    assert warm["warm_start"] and warm["converged"]
+    assert warm["iterations"] < cold["iterations"]
+    assert len(result) == n + 1
+
+def test_zero_risk_falls_back_to_uniform():
+    t, dangling = transition_matrix(np.array([0, 1, 1]), np.array([1]), np.array([1.0]), 2)
+    x, _, _ = personalized_pagerank(t, dangling, np.zeros(2))
+    assert np.isclose(x.sum(), 1.0) and x[1] > x[0]
+
+def test_empty_graph_returns_empty_vector():
+    transition_t, dangling = transition_matrix(np.zeros(1, dtype=int), np.zeros(0, dtype=int), [], 0)
+    x, iterations, residual = personalized_pagerank(transition_t, dangling, [])
+    assert x.shape == (0,) and iterations == 0 and residual == 0.0
+
+    graph = InMemoryGraph.from_edges(pd.DataFrame({"code": [], "risk": []}),
+                                     pd.DataFrame(columns=["source", "target", "strength"]))
+    result, info = RiskPropagator().propagate(graph)
+    assert result.empty and info["converged"]
@@ -0,0 +1,26 @@
+# tests/test_rule_index.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from rule_index import RuleIndex
+
+def test_rule_kinds_and_precedence():
+    rules = [
+        {"code_ranges": ["A069-A100"], "category_id": 2},
+        {"attribute_codes": ["A070", "A058"], "category_id": 1},
+        {"code_prefixes": ["B", "B12"], "category_id": 6},
+        {"code_prefixes": ["B1"], "category_id": 7},
+        {"code_patterns": [r"^C\d{3}$"], "category_id": 3},
+        {"attribute_codes": ["A058"], "category_id": 10},
+    ]
+    index = RuleIndex(rules, default_category=4)
+    codes = ["A069", "A070", "A100", "A101", "A058", "B123", "B135", "B9", "C001", "C01", "X1"]
+    assert index.classify(codes).tolist() == [2, 1, 2, 4, 10, 6, 7, 6, 3, 4, 4]
+
+def test_overlapping_ranges_later_rule_wins():
+    index = RuleIndex([
+        {"code_ranges": ["A001-A050"], "category_id": 1},
+        {"code_ranges": ["A020-A030"], "category_id": 2},
+    ], default_category=4)
+    assert index.classify(["A019", "A020", "A030", "A031", "A051"]).tolist() == [1, 2, 2, 1, 4]
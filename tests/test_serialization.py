@@ -0,0 +1,100 @@
+# tests/test_serialization.py
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from serialization import (ARROW_STREAM, CSV, JSON, MSGPACK, UnsupportedFormat, decode_msgpack, encode_frame,
+                           negotiate)
+
+def _frame():
+    return pd.DataFrame({"attribute_code": ["A001", "A002", None], "L": [0.5, 1.25, np.nan],
+                         "tier": np.array([0, 2, 1], dtype=np.int8), "count": [3, 4, 5]})
+
+def test_arrow_roundtrip():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(encode_frame(_frame(), ARROW_STREAM)).read_all()
+    assert table.column_names == ["attribute_code", "L", "tier", "count"]
+    assert table.column("attribute_code").to_pylist() == ["A001", "A002", None]
+    assert table.column("tier").type == pa.int8()
+    pd.testing.assert_frame_equal(table.to_pandas(), _frame(), check_dtype=False)
+
+def test_msgpack_roundtrip_keeps_numeric_dtypes():
+    pytest.importorskip("msgpack")
+    decoded = decode_msgpack(encode_frame(_frame(), MSGPACK))
+    assert decoded["tier"].dtype == np.int8 and decoded["count"].dtype == np.int64
+    assert decoded["attribute_code"].tolist()[:2] == ["A001", "A002"] and decoded["attribute_code"].isna()[2]
+    np.testing.assert_array_equal(decoded["L"], [0.5, 1.25, np.nan])
+
+def test_json_and_csv_fallback():
+    df = _frame().iloc[:2]
+    assert json.loads(encode_frame(df, JSON)) == df.to_dict("records")
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(encode_frame(df, CSV))), df, check_dtype=False)
+
+def test_negotiation_defaults_and_q_values():
+    assert negotiate(None) == JSON
+    assert negotiate("", default=CSV) == CSV
+    assert negotiate("*/*", default=CSV) == CSV
+    assert negotiate("application/x-msgpack;q=0.5, application/vnd.apache.arrow.stream") == ARROW_STREAM
+    assert negotiate("text/csv;q=0.2, application/vnd.msgpack;q=0.9") == MSGPACK
+    with pytest.raises(UnsupportedFormat):
+        negotiate("text/html")
+    with pytest.raises(UnsupportedFormat):
+        negotiate("application/json;q=0")
+
+def test_missing_optional_dependency_degrades(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)  # 模拟未安装 pyarrow
+    assert negotiate(f"{ARROW_STREAM}, {JSON};q=0.5") == JSON
+    with pytest.raises(UnsupportedFormat):
+        negotiate(ARROW_STREAM)
+    with pytest.raises(UnsupportedFormat, match="pip install pyarrow"):
+        encode_frame(_frame(), ARROW_STREAM)
+
+def test_quantify_export_negotiates(tmp_path, monkeypatch):
+    import app_routes
+    from artifact_store import ArtifactStore
+
+    monkeypatch.setattr(app_routes, "GRADING_DIR", tmp_path)
+    client = app_routes.app.test_client()
+    assert client.get("/quantify/export").status_code == 404
+    ArtifactStore(tmp_path).publish("risk_quantification.csv", _frame())
+
+    response = client.get("/quantify/export")  # 未指定 Accept：默认 CSV
+    assert response.status_code == 200 and response.mimetype == CSV
+    assert pd.read_csv(io.BytesIO(response.data))["L"].tolist()[:2] == [0.5, 1.25]
+    assert client.get("/quantify/export", headers={"Accept": "text/html"}).status_code == 406
+    response = client.get("/quantify/export", headers={"Accept": JSON})
+    assert response.get_json()[1]["attribute_code"] == "A002"
+    pytest.importorskip("msgpack")
+    response = client.get("/quantify/export", headers={"Accept": MSGPACK})
+    assert decode_msgpack(response.data)["count"].tolist() == [3, 4, 5]
+
+def test_scores_endpoint_negotiates(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    pytest.importorskip("msgpack")
+    import yaml
+    from fastapi.testclient import TestClient
+    import api.app as api
+    from src.core.online_scoring import OnlineScorer
+
+    pd.DataFrame({"attribute_code": ["ID_CARD", "POSTAL_CODE"], "sensitivity_level": ["RT01", "RT03"],
+                  "v1": [0.9, 0.1], "v2": [1.0, 0.2], "v3": [0.8, 0.1]}).to_csv(tmp_path / "quant.csv", index=False)
+    (tmp_path / "weights.json").write_text(json.dumps({"weights": [0.4, 0.4, 0.2]}))
+    (tmp_path / "thresholds.yaml").write_text(yaml.dump({"theta_high": 1.0, "theta_low": 0.3}))
+    monkeypatch.setattr(api, "scorer", OnlineScorer(
+        quant_path=tmp_path / "quant.csv", weights_path=tmp_path / "weights.json",
+        params_path=tmp_path / "params.yaml", thresholds_path=tmp_path / "thresholds.yaml"))
+    with TestClient(api.app) as client:
+        response = client.get("/scores")  # 默认 JSON
+        assert response.status_code == 200 and response.headers["content-type"].startswith(JSON)
+        assert [r["attribute_code"] for r in response.json()] == ["ID_CARD", "POSTAL_CODE"]
+        assert client.get("/scores", headers={"Accept": "text/html"}).status_code == 406
+        decoded = decode_msgpack(client.get("/scores", headers={"Accept": MSGPACK}).content)
+        np.testing.assert_allclose(decoded["L"], [0.36 + 0.4 + 0.16 + 0.3, 0.04 + 0.08 + 0.02])
+        response = client.post("/score", json=[{"attribute_code": "ID_CARD"}], headers={"Accept": "text/csv"})
+        assert response.text.splitlines()[0].startswith("attribute_code,L")
@@ -0,0 +1,53 @@
+# tests/test_snapshot_store.py
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from snapshot_store import SnapshotStore
+
+def _frame(n):
+    return pd.DataFrame({
+        "attribute_code": [f"A{i:03d}" for i in range(1, n + 1)],
+        "category_id": [i % 5 for i in range(1, n + 1)],
+    })
+
+def test_delta_versions_round_trip(tmp_path):
+    store = SnapshotStore(tmp_path, checkpoint_every=3)
+    v1 = _frame(100)
+    v2 = v1.copy()
+    v2.loc[5, "category_id"] = 9
+    v3 = pd.concat([v2.drop(index=[10, 11]), _frame(102).tail(2)], ignore_index=True)
+    frames = [v1, v2, v3]
+    for i, df in enumerate(frames):
+        store.commit(df, timestamp=datetime(2025, 3, 12, 10 + i))
+
+    assert [v["kind"] for v in store.versions()] == ["full", "delta", "delta"]
+    assert store.commit(v3)["version"] == 3  # 内容未变化不新增版本
+    for i, df in enumerate(frames, start=1):
+        pd.testing.assert_frame_equal(store.load(i), df, check_dtype=False)
+
+    pd.testing.assert_frame_equal(store.as_of("2025-03-12T11:30"), v2, check_dtype=False)
+    assert store.as_of("2025-03-12T09:00") is None
+    diff = store.diff(1, 3)
+    assert diff["changed"]["attribute_code"].tolist() == ["A006"]
+    assert diff["removed"]["attribute_code"].tolist() == ["A011", "A012"]
+    assert diff["added"]["attribute_code"].tolist() == ["A101", "A102"]
+
+def test_concurrent_commits_get_distinct_versions(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    frames = []
+    for i in range(8):
+        df = _frame(50)
+        df.loc[i, "category_id"] = 100 + i
+        frames.append(df)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        entries = list(pool.map(lambda df: SnapshotStore(tmp_path).commit(df), frames))
+    versions = SnapshotStore(tmp_path).versions()
+    assert sorted(e["version"] for e in entries) == list(range(1, 9))
+    assert [v["version"] for v in versions] == list(range(1, 9))
+    by_sha = {e["sha"]: df for e, df in zip(entries, frames)}
+    for v in versions:
+        pd.testing.assert_frame_equal(SnapshotStore(tmp_path).load(v["version"]), by_sha[v["sha"]], check_dtype=False)
@@ -0,0 +1,12 @@
+# tests/test_startup_profile.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "core"))
+from startup_profile import profile_import, check_budget
+
+def test_admin_modules_do_not_import_heavy_dependencies_at_startup():
+    results = [profile_import(m) for m in ("sync_risk_analysis_admin_app", "app_routes")]
+    assert all(r["import_ms"] > 0 and "pandas" in r["packages"] for r in results)
+    # 不检查耗时（与机器相关），只检查 scipy / pgmpy 等是否被延迟导入
+    assert check_budget(results, budget_ms=float("inf")) == []
@@ -0,0 +1,19 @@
+# tests/test_ucap_scripts.py
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+UCAP_DIR = Path(__file__).resolve().parent.parent / "cross-border-system" / "src" / "ucap"
+
+@pytest.mark.parametrize("script, requires", [
+    ("graph_builder.py", None), ("policy_mapper.py", "scipy"), ("dynamic_sync.py", "watchdog"),
+])
+def test_scripts_import_when_run_directly(script, requires, tmp_path):
+    """以脚本方式（不设置 PYTHONPATH、不用 -m）加载时包内相对导入可用"""
+    if requires:
+        pytest.importorskip(requires)
+    code = f"import runpy; runpy.run_path({str(UCAP_DIR / script)!r}, run_name='smoke')"
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr